@@ -0,0 +1,124 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from typing import Optional
+from app.core.loop_monitor import loop_monitor
+from app.core.query_log import query_log
+from app.core.profiling import SamplingProfiler, memory_tracker, profile_store
+from app.core.log import get_logger
+from app.core.tracing import current_request_id
+import asyncio
+import hmac
+import os
+
+logger = get_logger("admin")
+
+router = APIRouter(prefix="/admin", include_in_schema=False)
+
+# Admin hooks are disabled unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000
+PROFILED_PATHS = ("/api/chat/",)
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+async def profile_requests(request: Request, call_next):
+    """Run a chat request under the sampling profiler when an admin sends `X-Profile: 1`"""
+    if (
+        request.headers.get("x-profile") != "1"
+        or request.url.path not in PROFILED_PATHS
+        or not is_admin(request.headers.get("x-admin-token"))
+    ):
+        return await call_next(request)
+
+    profiler = SamplingProfiler(interval=PROFILE_SAMPLE_INTERVAL)
+    profiler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        profiler.stop()
+
+    profile_id = current_request_id() or os.urandom(8).hex()
+    profile_store.add(profile_id, profiler)
+    logger.info("Profiled %s: %d samples", request.url.path, profiler.samples,
+                extra={"fields": {"profile_id": profile_id}})
+    response.headers["X-Profile-Id"] = profile_id
+    response.headers["X-Profile-Samples"] = str(profiler.samples)
+    return response
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Recently captured request profiles"""
+    return {"profiles": profile_store.list()}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str):
+    """Collapsed stacks for one profiled request (feed to flamegraph.pl or speedscope)"""
+    profiler = profile_store.get(profile_id)
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=profiler.collapsed(), media_type="text/plain")
+
+
+@router.post("/tracemalloc/start", dependencies=[Depends(require_admin)])
+async def start_tracemalloc(frames: int = 10):
+    """Start tracing allocations, keeping `frames` frames per allocation site"""
+    memory_tracker.start(frames)
+    return memory_tracker.status()
+
+
+@router.post("/tracemalloc/stop", dependencies=[Depends(require_admin)])
+async def stop_tracemalloc():
+    memory_tracker.stop()
+    return memory_tracker.status()
+
+
+@router.get("/tracemalloc", dependencies=[Depends(require_admin)])
+async def tracemalloc_status():
+    return memory_tracker.status()
+
+
+@router.post("/tracemalloc/snapshot", dependencies=[Depends(require_admin)])
+async def take_snapshot():
+    """Take a snapshot to diff against later"""
+    try:
+        # Snapshots walk every traced block; keep that off the event loop
+        return {"snapshot_id": await asyncio.to_thread(memory_tracker.snapshot)}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/tracemalloc/diff", dependencies=[Depends(require_admin)])
+async def diff_snapshots(base: str, target: Optional[str] = None, key_type: str = "lineno", limit: int = 25):
+    """Allocation growth by site between two snapshots (or `base` and now)"""
+    if key_type not in ("lineno", "filename", "traceback"):
+        raise HTTPException(status_code=400, detail="key_type must be lineno, filename or traceback")
+    try:
+        stats = await asyncio.to_thread(memory_tracker.diff, base, target, key_type, limit)
+        return {"base": base, "stats": stats}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown snapshot {e}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/loop", dependencies=[Depends(require_admin)])
+async def loop_status():
+    """Event-loop lag percentiles and stacks captured while the loop was blocked"""
+    return loop_monitor.status()
+
+
+@router.get("/query-log", dependencies=[Depends(require_admin)])
+async def query_log_status():
+    """Chat request capture counters (recorded, written, dropped) and the current log file"""
+    return query_log.stats()
@@ -1,79 +1,100 @@
 from fastapi import APIRouter, HTTPException
 from app.models.chat import ChatRequest, ChatResponse
 from app.services.rag_service import rag_service
+from app.services.session_service import session_store
+from app.services.memory_service import conversation_memory
+from app.core.query_log import query_log
+from app.core.tracing import current_trace, tracer
+from app.core.log import get_logger
+from typing import Any, Dict
 import datetime
-from typing import Dict, List
+import time
+import uuid
+
+logger = get_logger("api")
 
 router = APIRouter()
 
-# Store conversation history in memory (for testing)
-# In production, use Redis or database
-conversation_history: Dict[str, List[Dict]] = {}
+
+def _query_record(started: float, session_id: str, turn: int, question: str,
+                  history_text: str, rag_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Replayable record of one chat request: what was asked, where time went, what was reused"""
+    trace = current_trace()
+    spans = trace.spans if trace else []
+    searches = [span.attributes["cached"] for span in spans
+                if span.name == "vector.search" and "cached" in span.attributes]
+    context_info = rag_result["context_info"]
+    return {
+        "ts": started,
+        "request_id": trace.request_id if trace else None,
+        "session_id": session_id,
+        "turn": turn,
+        "question": question,
+        "history_chars": len(history_text),
+        "total_ms": round((time.time() - started) * 1000, 2),
+        "stages_ms": {name: round(ms, 2) for name, ms in trace.stage_timings().items()} if trace else {},
+        "retrieved_ids": [source["doc_id"] for source in context_info.get("sources", [])],
+        "cache": {
+            "answer": context_info.get("cache"),
+            "retrieval": ("hit" if all(searches) else "miss") if searches else None,
+            "coalesced": any(span.attributes.get("coalesced") for span in spans if span.name == "rag.query"),
+        },
+        "error": context_info.get("error"),
+    }
 
 
 @router.post("/chat/", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Process chat message and return RAG-enhanced AI response"""
+    # Clients echo back the session_id from the previous response to continue a conversation
+    session_id = request.session_id or str(uuid.uuid4())
+    started = time.time()
     try:
-        # Get or create conversation history for this session
-        # Using a default session ID for now - in production, use actual session management
-        session_id = "default_session"
-        
-        if session_id not in conversation_history:
-            conversation_history[session_id] = []
-        
-        # Add user message to history
-        conversation_history[session_id].append({
-            "role": "user",
-            "content": request.message
-        })
-        
-        # Build context-aware message including recent history
-        context_message = request.message
-        if len(conversation_history[session_id]) > 1:
-            # Include last 2 exchanges (4 messages) for context
-            recent_history = conversation_history[session_id][-5:-1]  # Exclude current message
-            if recent_history:
-                history_text = "\n".join([
-                    f"{msg['role'].capitalize()}: {msg['content']}" 
-                    for msg in recent_history
-                ])
-                # Format context more naturally without explicit labels
-                context_message = f"""Previous conversation:
-{history_text}
-
-User: {request.message}"""
-        
-        # Use RAG service with context-aware message
-        rag_result = await rag_service.query_with_rag(context_message)
-        
-        # Add AI response to history
-        conversation_history[session_id].append({
-            "role": "assistant",
-            "content": rag_result["response"]
-        })
+        # Serialize requests within one conversation so turns stay in order
+        async with session_store.lock(session_id):
+            with tracer.span("chat.history", server_timing="history", session_id=session_id):
+                # Pick up turns another worker may have persisted for this session
+                await session_store.refresh(session_id)
+                
+                # Rolling summary of older turns plus recent turns, within a token budget
+                history_text = conversation_memory.build_history(session_id)
+            
+            # Retrieval embeds only the current question; generation also sees the history
+            rag_result = await rag_service.query_with_rag(
+                request.message,
+                history=history_text,
+                prior_query_vector=session_store.get(session_id).query_vector
+            )
+            session_store.set_query_vector(session_id, rag_result.get("query_embedding"))
+            turn = session_store.get(session_id).turn_count // 2
+            
+            # Record the exchange (the store keeps only the most recent turns)
+            session_store.append(session_id, "user", request.message)
+            session_store.append(session_id, "assistant", rag_result["response"])
+            conversation_memory.schedule_refresh(session_id)
         
-        # Keep conversation history limited to last 10 exchanges
-        if len(conversation_history[session_id]) > 20:
-            conversation_history[session_id] = conversation_history[session_id][-20:]
+        if query_log.enabled:
+            query_log.record(_query_record(started, session_id, turn, request.message, history_text, rag_result))
         
         id = int(datetime.datetime.now().timestamp())
         response = ChatResponse(
             id=id,
             role="assistant",
             content=rag_result["response"],
-            timestamp=datetime.datetime.now()
+            timestamp=datetime.datetime.now(),
+            session_id=session_id
         )
         return response
         
     except Exception as e:
-        print(f"Chat endpoint error: {e}")
+        logger.exception("Chat endpoint error: %s", e)
         # Fallback response
         id = int(datetime.datetime.now().timestamp())
         response = ChatResponse(
             id=id,
             role="assistant",
             content="I'm experiencing technical difficulties. Please try again later.",
-            timestamp=datetime.datetime.now()
+            timestamp=datetime.datetime.now(),
+            session_id=session_id
         )
         return response
@@ -2,8 +2,11 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from app.services.rag_service import rag_service
+from app.core.log import get_logger
 import datetime
 
+logger = get_logger("api")
+
 router = APIRouter()
 
 class DocumentIngestionRequest(BaseModel):
@@ -24,6 +27,7 @@ class SystemStatusResponse(BaseModel):
     embedding_model: str
     text_generation_model: str
     configuration: Dict[str, Any]
+    corpus_version: Optional[Dict[str, Any]] = None
     timestamp: datetime.datetime
 
 @router.post("/ingest", response_model=DocumentIngestionResponse)
@@ -51,7 +55,7 @@ async def ingest_documents(request: DocumentIngestionRequest):
             )
             
     except Exception as e:
-        print(f"Document ingestion endpoint error: {e}")
+        logger.error("Document ingestion endpoint error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to ingest documents: {str(e)}"
@@ -69,11 +73,12 @@ async def get_system_status():
             embedding_model=status.get("embedding_model", "unknown"),
             text_generation_model=status.get("text_generation_model", "unknown"),
             configuration=status.get("configuration", {}),
+            corpus_version=status.get("corpus_version"),
             timestamp=datetime.datetime.now()
         )
         
     except Exception as e:
-        print(f"System status endpoint error: {e}")
+        logger.error("System status endpoint error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get system status: {str(e)}"
@@ -0,0 +1,108 @@
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+from app.core.executors import embedding_executor, generation_executor
+from app.core.log import get_logger
+
+logger = get_logger("aws")
+
+_clients: Dict[Tuple[Any, ...], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def bedrock_client_config():
+    """
+    botocore Config shared by every bedrock-runtime client.
+
+    The pool is sized to the threads that can call Bedrock at once (generation plus
+    embedding executors) so no call waits on connection checkout. Retries belong
+    to app.core.resilience, so the SDK makes a single attempt by default; adaptive
+    mode still rate-limits the client when Bedrock starts throttling. The read
+    timeout matches the generation attempt timeout so abandoned calls free their
+    connection and thread.
+    """
+    from botocore.config import Config
+
+    default_pool = generation_executor.max_workers + embedding_executor.max_workers
+    return Config(
+        max_pool_connections=int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", str(default_pool))),
+        connect_timeout=float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "3")),
+        read_timeout=float(os.getenv("BEDROCK_READ_TIMEOUT", "30")),
+        tcp_keepalive=os.getenv("BEDROCK_TCP_KEEPALIVE", "true").lower() == "true",
+        retries={
+            "mode": os.getenv("BEDROCK_RETRY_MODE", "adaptive"),
+            "total_max_attempts": int(os.getenv("BEDROCK_SDK_MAX_ATTEMPTS", "1")),
+        },
+    )
+
+
+def get_bedrock_client(region_name: str, endpoint_url: Optional[str] = None,
+                       aws_access_key_id: Optional[str] = None, aws_secret_access_key: Optional[str] = None):
+    """Shared, thread-safe bedrock-runtime client for the given region, endpoint and credentials"""
+    key = (region_name, endpoint_url, aws_access_key_id)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            import boto3  # Deferred: importing boto3 dominates app import time
+            config = bedrock_client_config()
+            client = boto3.client(
+                service_name='bedrock-runtime',
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                # The emulator accepts any signature
+                aws_access_key_id=aws_access_key_id or "emulator",
+                aws_secret_access_key=aws_secret_access_key or "emulator",
+                config=config,
+            )
+            _clients[key] = client
+            logger.info("Created bedrock-runtime client (pool %d, retry mode %s)",
+                        config.max_pool_connections, config.retries["mode"])
+    return client
+
+
+_async_clients: Dict[Tuple[Any, ...], Any] = {}
+
+
+def get_async_bedrock_client(region_name: str, endpoint_url: Optional[str] = None,
+                             aws_access_key_id: Optional[str] = None, aws_secret_access_key: Optional[str] = None):
+    """Shared asyncio-native bedrock-runtime client (BEDROCK_TRANSPORT=aio)"""
+    key = (region_name, endpoint_url, aws_access_key_id)
+    client = _async_clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _async_clients.get(key)
+        if client is None:
+            from botocore.credentials import Credentials
+            from app.core.bedrock_async import AsyncBedrockRuntime
+
+            if aws_access_key_id and aws_secret_access_key:
+                credentials = Credentials(aws_access_key_id, aws_secret_access_key)
+            elif endpoint_url:
+                credentials = Credentials("emulator", "emulator")
+            else:
+                import botocore.session
+                credentials = botocore.session.get_session().get_credentials()
+
+            client = AsyncBedrockRuntime(
+                region_name,
+                credentials,
+                endpoint_url=endpoint_url,
+                # Connections, not threads, bound concurrency on this path
+                max_connections=int(os.getenv("BEDROCK_AIO_MAX_CONNECTIONS", "1000")),
+                max_keepalive=int(os.getenv("BEDROCK_AIO_MAX_KEEPALIVE", "100")),
+                connect_timeout=float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "3")),
+                read_timeout=float(os.getenv("BEDROCK_READ_TIMEOUT", "30")),
+            )
+            _async_clients[key] = client
+            logger.info("Created asyncio bedrock-runtime client for %s", client.endpoint_url)
+    return client
+
+
+async def close_async_clients():
+    for client in list(_async_clients.values()):
+        await client.aclose()
+    _async_clients.clear()
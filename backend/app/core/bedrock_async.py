@@ -0,0 +1,107 @@
+import json
+import base64
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import quote
+import httpx
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.eventstream import EventStreamBuffer
+from botocore.exceptions import ClientError
+
+
+class AsyncBedrockRuntime:
+    """
+    asyncio-native bedrock-runtime client for InvokeModel and InvokeModelWithResponseStream.
+
+    Requests are SigV4-signed with botocore and sent with httpx, so an in-flight
+    call is a coroutine waiting on a socket rather than an executor thread blocked
+    for the whole generation. Errors surface as botocore ClientError (HTTP errors)
+    or ConnectionError/TimeoutError (transport failures) so the resilience layer
+    classifies them exactly as it does for boto3.
+    """
+
+    def __init__(self, region_name: str, credentials, endpoint_url: Optional[str] = None,
+                 max_connections: int = 1000, max_keepalive: int = 100,
+                 connect_timeout: float = 3.0, read_timeout: float = 30.0):
+        self.region_name = region_name
+        self.endpoint_url = (endpoint_url or f"https://bedrock-runtime.{region_name}.amazonaws.com").rstrip("/")
+        self._credentials = credentials
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        )
+
+    def _signed_headers(self, url: str, body: bytes, accept: str, content_type: str) -> Dict[str, str]:
+        request = AWSRequest(method="POST", url=url, data=body,
+                             headers={"Accept": accept, "Content-Type": content_type})
+        # Frozen per request so refreshed (e.g. STS/instance role) credentials are picked up
+        SigV4Auth(self._credentials.get_frozen_credentials(), "bedrock", self.region_name).add_auth(request)
+        return dict(request.headers.items())
+
+    def _url(self, model_id: str, operation: str) -> str:
+        return f"{self.endpoint_url}/model/{quote(model_id, safe='')}/{operation}"
+
+    @staticmethod
+    def _client_error(response: httpx.Response, body: bytes, operation: str) -> ClientError:
+        code = response.headers.get("x-amzn-errortype", "").split(":", 1)[0]
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            payload = {}
+        message = payload.get("message") or payload.get("Message") or body.decode("utf-8", "replace")
+        return ClientError({
+            "Error": {"Code": code or payload.get("__type", str(response.status_code)), "Message": message},
+            "ResponseMetadata": {"HTTPStatusCode": response.status_code,
+                                 "RequestId": response.headers.get("x-amzn-requestid", "")},
+        }, operation)
+
+    async def invoke_model(self, modelId: str, body: str, accept: str = "application/json",
+                           contentType: str = "application/json") -> Dict[str, Any]:
+        """Invoke a model and return the parsed JSON response body"""
+        url = self._url(modelId, "invoke")
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        try:
+            response = await self._client.post(url, content=data,
+                                               headers=self._signed_headers(url, data, accept, contentType))
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f"Bedrock InvokeModel timed out: {e}") from e
+        except httpx.TransportError as e:
+            raise ConnectionError(f"Bedrock InvokeModel failed: {e}") from e
+        if response.status_code >= 300:
+            raise self._client_error(response, response.content, "InvokeModel")
+        return response.json()
+
+    async def invoke_model_with_response_stream(self, modelId: str, body: str,
+                                                accept: str = "application/json",
+                                                contentType: str = "application/json") -> AsyncIterator[Dict[str, Any]]:
+        """Invoke a model and yield each decoded response chunk as it arrives"""
+        url = self._url(modelId, "invoke-with-response-stream")
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        try:
+            async with self._client.stream("POST", url, content=data,
+                                           headers=self._signed_headers(url, data, accept, contentType)) as response:
+                if response.status_code >= 300:
+                    raise self._client_error(response, await response.aread(), "InvokeModelWithResponseStream")
+                buffer = EventStreamBuffer()
+                async for raw in response.aiter_bytes():
+                    buffer.add_data(raw)
+                    for message in buffer:
+                        headers = message.headers
+                        payload = json.loads(message.payload or b"{}")
+                        if headers.get(":message-type") == "event":
+                            if headers.get(":event-type") == "chunk":
+                                yield json.loads(base64.b64decode(payload["bytes"]))
+                            continue
+                        error_type = headers.get(":exception-type") or headers.get(":error-code") or "UnknownError"
+                        raise ClientError({
+                            "Error": {"Code": error_type[:1].upper() + error_type[1:],
+                                      "Message": payload.get("message", headers.get(":error-message", ""))},
+                            "ResponseMetadata": {"HTTPStatusCode": response.status_code},
+                        }, "InvokeModelWithResponseStream")
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f"Bedrock InvokeModelWithResponseStream timed out: {e}") from e
+        except httpx.TransportError as e:
+            raise ConnectionError(f"Bedrock InvokeModelWithResponseStream failed: {e}") from e
+
+    async def aclose(self):
+        await self._client.aclose()
@@ -0,0 +1,109 @@
+import os
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List
+from app.core.metrics import (
+    EXECUTOR_ACTIVE, EXECUTOR_QUEUED, EXECUTOR_QUEUE_WAIT, EXECUTOR_REJECTED,
+    EXECUTOR_UTILIZATION, EXECUTOR_WORKERS
+)
+
+THREAD_NAME_PREFIX = "executor-"
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when a bounded executor's queue is full"""
+
+    def __init__(self, name: str, queued: int):
+        super().__init__(f"Executor {name} is saturated ({queued} calls queued)")
+        self.name = name
+
+
+class BoundedExecutor:
+    """
+    Named, sized thread pool for one dependency's blocking calls (a bulkhead).
+
+    Unlike asyncio.to_thread, which shares the loop's default executor with every
+    other blocking call, each dependency gets its own threads, so a burst on one
+    cannot starve another. `max_queue` bounds how many calls may wait for a thread
+    (0 = unbounded); beyond that `run` fails fast with ExecutorSaturatedError.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int = 0):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max_queue
+        self.active = 0
+        self.queued = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix=f"{THREAD_NAME_PREFIX}{name}")
+
+        EXECUTOR_WORKERS.labels(name).set(self.max_workers)
+        EXECUTOR_ACTIVE.labels(name).set_function(lambda: self.active)
+        EXECUTOR_QUEUED.labels(name).set_function(lambda: self.queued)
+        EXECUTOR_UTILIZATION.labels(name).set_function(lambda: self.active / self.max_workers)
+        self._queue_wait = EXECUTOR_QUEUE_WAIT.labels(name)
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str, max_workers: int, max_queue: int = 0) -> "BoundedExecutor":
+        """Build from {PREFIX}_WORKERS and {PREFIX}_MAX_QUEUE, falling back to the given defaults"""
+        return cls(
+            name,
+            max_workers=int(os.getenv(f"{prefix}_WORKERS", str(max_workers))),
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", str(max_queue))),
+        )
+
+    async def run(self, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking call on this executor, carrying over context (trace, request ID)"""
+        with self._lock:
+            if self.max_queue and self.queued >= self.max_queue:
+                EXECUTOR_REJECTED.labels(self.name).inc()
+                raise ExecutorSaturatedError(self.name, self.queued)
+            self.queued += 1
+
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+
+        def work():
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+            self._queue_wait.observe(time.perf_counter() - submitted)
+            try:
+                return context.run(functools.partial(function, *args, **kwargs))
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+        future = self._pool.submit(work)
+        # A call cancelled (e.g. timed out) before it started never runs `work`
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, future):
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def stats(self) -> dict:
+        return {"workers": self.max_workers, "active": self.active, "queued": self.queued}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# One executor per dependency
+generation_executor = BoundedExecutor.from_env("generation", "EXECUTOR_GENERATION", max_workers=16)
+embedding_executor = BoundedExecutor.from_env("embedding", "EXECUTOR_EMBEDDING", max_workers=8)
+vector_executor = BoundedExecutor.from_env("vector", "EXECUTOR_VECTOR", max_workers=8)
+
+EXECUTORS: List[BoundedExecutor] = [generation_executor, embedding_executor, vector_executor]
+
+
+def shutdown_executors():
+    for executor in EXECUTORS:
+        executor.shutdown()
@@ -0,0 +1,136 @@
+import os
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from typing import Any, Dict, Optional
+from app.core.tracing import current_request_id
+
+_ROOT = "app"
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, category, message, request ID and fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "category": record.name[len(_ROOT) + 1:] if record.name.startswith(_ROOT + ".") else record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Drop a configured fraction of records per category before they are queued.
+
+    Rates come from LOG_SAMPLE_RATES, e.g. "rag.debug=0.01,vector=0.1"; the most
+    specific matching category prefix wins. Warnings and errors are never sampled.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._cache: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            category = name[len(_ROOT) + 1:] if name.startswith(_ROOT + ".") else name
+            while category:
+                if category in self.rates:
+                    rate = self.rates[category]
+                    break
+                category = category.rpartition(".")[0]
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request ID while still on the caller's context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = current_request_id()
+        return True
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the writer falls behind"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message now (args may change later) but keep fields for the formatter
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _parse_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        category, _, rate = item.partition("=")
+        try:
+            rates[category.strip()] = max(0.0, min(1.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging():
+    """Route the `app` logger through a bounded queue to a background stdout writer"""
+    global _listener
+    if _listener is not None:
+        return
+
+    logger = logging.getLogger(_ROOT)
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    queue_handler = _DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(_parse_rates(os.getenv("LOG_SAMPLE_RATES", ""))))
+    queue_handler.addFilter(RequestContextFilter())
+    logger.addHandler(queue_handler)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(category: str) -> logging.Logger:
+    """Logger for a category such as "rag" or "rag.debug" (configured on first use)"""
+    setup_logging()
+    return logging.getLogger(f"{_ROOT}.{category}")
@@ -0,0 +1,160 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional
+from app.core.log import get_logger
+from app.core.metrics import LOOP_BLOCKED, LOOP_LAG, LOOP_LAG_QUANTILE
+from app.core.profiling import format_stack
+
+logger = get_logger("loop")
+
+LAG_QUANTILES = (0.5, 0.9, 0.99, 1.0)
+
+
+class _BlockingEvent:
+    """One stretch of time during which the event loop did not get to run"""
+
+    __slots__ = ("detected_at", "blocked_ms", "stacks")
+
+    def __init__(self):
+        self.detected_at = time.time()
+        self.blocked_ms = 0.0
+        self.stacks: Counter = Counter()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "detected_at": self.detected_at,
+            "blocked_ms": round(self.blocked_ms, 1),
+            "stacks": [{"stack": stack, "samples": count} for stack, count in self.stacks.most_common()],
+        }
+
+
+class LoopLagMonitor:
+    """
+    Continuously measures event-loop scheduling lag and catches blocking calls.
+
+    A heartbeat task sleeps for `interval` and records how late it woke up. A
+    watchdog thread watches that heartbeat; when the loop has not run for longer
+    than `block_threshold` it samples the loop thread's stack until the loop
+    recovers, so the blocking code shows up by name instead of as a p99 spike.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+        self.interval = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50")) / 1000
+        self.block_threshold = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100")) / 1000
+        self.max_depth = int(os.getenv("LOOP_BLOCK_STACK_DEPTH", "64"))
+
+        # Rolling window for the percentile gauges (~1 minute at the default interval)
+        self._lags: Deque[float] = deque(maxlen=int(os.getenv("LOOP_LAG_WINDOW", "1200")))
+        self.events: Deque[_BlockingEvent] = deque(maxlen=50)
+        self._heartbeat = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        for q in LAG_QUANTILES:
+            LOOP_LAG_QUANTILE.labels(str(q)).set_function(lambda q=q: self.lag_quantile(q))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start monitoring the running loop (call from the loop thread)"""
+        if not self.enabled or self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info("Event-loop monitor started (interval %.0f ms, block threshold %.0f ms)",
+                    self.interval * 1000, self.block_threshold * 1000)
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _measure(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._heartbeat = time.monotonic()
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - due)
+            self._lags.append(lag)
+            LOOP_LAG.observe(lag)
+
+    def _watch(self):
+        poll = max(self.block_threshold / 4, 0.005)
+        event: Optional[_BlockingEvent] = None
+        event_heartbeat = 0.0
+        while not self._stop.wait(poll):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.block_threshold:
+                if event is not None:
+                    self._finish(event)
+                    event = None
+                continue
+
+            if event is None or heartbeat != event_heartbeat:
+                if event is not None:
+                    self._finish(event)
+                event, event_heartbeat = _BlockingEvent(), heartbeat
+                self.events.append(event)
+                LOOP_BLOCKED.inc()
+                stack = self._sample(event)
+                logger.warning("Event loop blocked for over %.0f ms", self.block_threshold * 1000,
+                               extra={"fields": {"stack": stack}})
+            else:
+                self._sample(event)
+            event.blocked_ms = (blocked_for + self.interval) * 1000
+
+    def _sample(self, event: _BlockingEvent) -> List[str]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = format_stack(frame, self.max_depth) if frame is not None else []
+        if stack:
+            event.stacks[";".join(stack)] += 1
+        return stack
+
+    def _finish(self, event: _BlockingEvent):
+        logger.info("Event loop recovered after %.0f ms", event.blocked_ms,
+                    extra={"fields": {"blocked_ms": round(event.blocked_ms, 1)}})
+
+    def lag_quantile(self, q: float) -> float:
+        lags = sorted(self._lags)
+        if not lags:
+            return 0.0
+        return lags[min(len(lags) - 1, int(q * len(lags)))]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "block_threshold_ms": self.block_threshold * 1000,
+            "lag_ms": {
+                ("max" if q == 1.0 else f"p{round(q * 100)}"): round(self.lag_quantile(q) * 1000, 2)
+                for q in LAG_QUANTILES
+            },
+            "blocked_events": [event.to_dict() for event in reversed(self.events)],
+        }
+
+
+# Global instance
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,357 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from app.core.tracing import tracer
+
+# Latency buckets in seconds, from sub-millisecond CPU stages to multi-second generations
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class: a named metric family with fixed label names and one child per label set"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), registry: "Registry" = None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values: str, **kwargs: str):
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.label_names)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        # Label-less metrics act as their own single child
+        return self.labels()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in sorted(children):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(child.value)}"]
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """Evaluate `function` at scrape time instead of storing a value"""
+        self.function = function
+
+    @contextmanager
+    def track_inprogress(self) -> Iterator[None]:
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def get(self) -> float:
+        return float(self.function()) if self.function else self.value
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default().set_function(function)
+
+    def _render_child(self, key, child):
+        try:
+            value = child.get()
+        except Exception:
+            value = math.nan
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds: Sequence[float]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation within buckets"""
+        total = sum(self.counts)
+        if not total:
+            return math.nan
+        rank = q * total
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(list(self.upper_bounds) + [math.inf], self.counts):
+            if cumulative + count >= rank and count:
+                if bound == math.inf:
+                    return lower
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound
+        return lower
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: "Registry" = None):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labels, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _render_child(self, key, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(list(self.upper_bounds) + [math.inf], child.counts):
+            cumulative += count
+            labels = _format_labels(self.label_names, key, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metric families rendered together in text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Pipeline metrics shared across services
+STAGE_DURATION = Histogram(
+    "rag_stage_duration_seconds",
+    "Duration of each stage of the query and ingest pipelines",
+    labels=("pipeline", "stage")
+)
+PIPELINE_REQUESTS = Counter(
+    "rag_pipeline_requests_total",
+    "Pipeline executions by outcome",
+    labels=("pipeline", "outcome")
+)
+INFLIGHT_REQUESTS = Gauge(
+    "rag_inflight_requests",
+    "Pipeline executions currently in progress",
+    labels=("pipeline",)
+)
+CACHE_REQUESTS = Counter(
+    "rag_cache_requests_total",
+    "Cache lookups by cache and outcome (hit/miss)",
+    labels=("cache", "outcome")
+)
+CACHE_HIT_RATIO = Gauge(
+    "rag_cache_hit_ratio",
+    "Fraction of lookups served from the cache since startup",
+    labels=("cache",)
+)
+CACHE_SAVED_SECONDS = Counter(
+    "rag_cache_saved_seconds_total",
+    "Latency avoided by cache hits, estimated from the original call's duration",
+    labels=("cache",)
+)
+DEPENDENCY_ERRORS = Counter(
+    "rag_dependency_errors_total",
+    "Errors from external dependencies (Bedrock, Pinecone) by kind",
+    labels=("dependency", "kind")
+)
+DEPENDENCY_RETRIES = Counter(
+    "rag_dependency_retries_total",
+    "Retries issued against external dependencies",
+    labels=("dependency",)
+)
+CIRCUIT_STATE = Gauge(
+    "rag_circuit_state",
+    "Circuit breaker state per dependency (0 closed, 1 half-open, 2 open)",
+    labels=("dependency",)
+)
+EXECUTOR_WORKERS = Gauge(
+    "rag_executor_workers",
+    "Thread count of each dependency executor",
+    labels=("executor",)
+)
+EXECUTOR_ACTIVE = Gauge(
+    "rag_executor_active",
+    "Calls currently running on each dependency executor",
+    labels=("executor",)
+)
+EXECUTOR_QUEUED = Gauge(
+    "rag_executor_queue_depth",
+    "Calls waiting for a thread on each dependency executor",
+    labels=("executor",)
+)
+EXECUTOR_UTILIZATION = Gauge(
+    "rag_executor_utilization",
+    "Fraction of each dependency executor's threads that are busy",
+    labels=("executor",)
+)
+EXECUTOR_QUEUE_WAIT = Histogram(
+    "rag_executor_queue_wait_seconds",
+    "Time calls spent queued before a dependency executor thread picked them up",
+    labels=("executor",)
+)
+EXECUTOR_REJECTED = Counter(
+    "rag_executor_rejected_total",
+    "Calls rejected because a dependency executor's queue was full",
+    labels=("executor",)
+)
+LOOP_LAG = Histogram(
+    "rag_event_loop_lag_seconds",
+    "Delay between when an event-loop callback was due and when it ran",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+LOOP_LAG_QUANTILE = Gauge(
+    "rag_event_loop_lag_quantile_seconds",
+    "Event-loop lag percentiles over the recent window",
+    labels=("quantile",)
+)
+LOOP_BLOCKED = Counter(
+    "rag_event_loop_blocked_total",
+    "Times the event loop was blocked longer than the blocking threshold"
+)
+
+
+@contextmanager
+def stage_timer(pipeline: str, stage: str) -> Iterator[None]:
+    """Time one pipeline stage into STAGE_DURATION and record it as a Server-Timing span"""
+    histogram = STAGE_DURATION.labels(pipeline, stage)
+    # A pipeline's own total is reported under the pipeline name, e.g. "query;dur=..."
+    with tracer.span(f"{pipeline}.{stage}", server_timing=pipeline if stage == "total" else stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - started)
@@ -0,0 +1,10 @@
+import os
+
+# backend/: relative data paths are anchored here, so the server and the scripts
+# next to it share the same files whatever directory they are started from
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def backend_path(path: str) -> str:
+    """`path` as an absolute path, taking a relative one as relative to backend/"""
+    return path if os.path.isabs(path) else os.path.join(BACKEND_DIR, path)
@@ -0,0 +1,178 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+
+def format_stack(frame, max_depth: int = 128) -> List[str]:
+    """Frame labels from the outermost caller down to `frame`"""
+    stack: List[str] = []
+    while frame is not None and len(stack) < max_depth:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class SamplingProfiler:
+    """
+    Wall-clock stack sampler producing collapsed stacks (flamegraph.pl / speedscope input).
+
+    Samples the event-loop thread plus worker threads whose names start with one of
+    `thread_prefixes` (asyncio.to_thread and dependency executor workers by default). The event loop is shared
+    by every in-flight request, so a per-request profile also contains whatever
+    else the worker was doing at the time; profile during quiet periods or read it
+    alongside the request's Server-Timing header.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_prefixes=("asyncio_", "executor-"), max_depth: int = 128):
+        self.interval = interval
+        self.thread_prefixes = tuple(thread_prefixes)
+        self.max_depth = max_depth
+        self.target_thread_id = threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _sampled_threads(self) -> Dict[int, str]:
+        threads = {self.target_thread_id: "event-loop"}
+        for thread in threading.enumerate():
+            if thread.ident and thread.name.startswith(self.thread_prefixes):
+                threads[thread.ident] = thread.name
+        return threads
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, thread_name in self._sampled_threads().items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = [thread_name] + format_stack(frame, self.max_depth)
+                self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Render as `frame;frame;frame count` lines"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class ProfileStore:
+    """Keeps the most recent request profiles for retrieval by ID"""
+
+    def __init__(self, max_profiles: int = 20):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, SamplingProfiler]" = OrderedDict()
+
+    def add(self, profile_id: str, profiler: SamplingProfiler):
+        self._profiles[profile_id] = profiler
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[SamplingProfiler]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, object]]:
+        return [
+            {"id": profile_id, "samples": p.samples, "duration_ms": round(p.duration * 1000, 1)}
+            for profile_id, p in self._profiles.items()
+        ]
+
+
+class MemoryTracker:
+    """tracemalloc control with named snapshots diffed by allocation site"""
+
+    def __init__(self, max_snapshots: int = 10):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+        self._counter = 0
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 10):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self):
+        tracemalloc.stop()
+        self._snapshots.clear()
+
+    def snapshot(self) -> str:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        self._counter += 1
+        snapshot_id = f"s{self._counter}"
+        self._snapshots[snapshot_id] = snapshot
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def snapshot_ids(self) -> List[str]:
+        return list(self._snapshots)
+
+    def diff(self, base_id: str, target_id: Optional[str] = None, key_type: str = "lineno",
+             limit: int = 25) -> List[Dict[str, object]]:
+        """Top allocation sites by size growth from `base_id` to `target_id` (or a fresh snapshot)"""
+        base = self._snapshots.get(base_id)
+        if base is None:
+            raise KeyError(base_id)
+        if target_id is None:
+            target_id = self.snapshot()
+        target = self._snapshots.get(target_id)
+        if target is None:
+            raise KeyError(target_id)
+
+        stats = target.compare_to(base, key_type)
+        return [
+            {
+                "site": str(stat.traceback[0]) if stat.traceback else "?",
+                "traceback": [str(frame) for frame in stat.traceback] if key_type == "traceback" else None,
+                "size_diff_bytes": stat.size_diff,
+                "size_bytes": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+            }
+            for stat in stats[:limit]
+        ]
+
+    def status(self) -> Dict[str, object]:
+        current, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        return {
+            "tracing": self.tracing,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "snapshots": self.snapshot_ids(),
+        }
+
+
+# Global instances
+profile_store = ProfileStore()
+memory_tracker = MemoryTracker()
@@ -0,0 +1,120 @@
+import os
+import json
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from app.core.log import get_logger
+from app.core.paths import backend_path
+
+logger = get_logger("query_log")
+
+
+class QueryLog:
+    """
+    Low-overhead capture of chat requests for replay (benchmarks/replay.py).
+
+    `record` only appends a dict to a bounded ring buffer on the event loop; when
+    the buffer is full the oldest unflushed record is dropped rather than
+    blocking a request. A background task drains the buffer every
+    QUERY_LOG_FLUSH_MS and serializes and appends the batch to a JSONL file in a
+    worker thread, rotating it at QUERY_LOG_MAX_MB into QUERY_LOG_BACKUPS
+    numbered files. "{pid}" in QUERY_LOG_PATH gives each worker its own file.
+
+    Records contain question text, so capture is off unless QUERY_LOG_ENABLED=true.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("QUERY_LOG_ENABLED", "false").lower() == "true"
+        # Relative to backend/, like the other data files
+        self.path = backend_path(os.getenv("QUERY_LOG_PATH", "data/query_log.jsonl").replace("{pid}", str(os.getpid())))
+        self.capacity = int(os.getenv("QUERY_LOG_BUFFER", "10000"))
+        self.flush_interval = float(os.getenv("QUERY_LOG_FLUSH_MS", "1000")) / 1000
+        self.max_bytes = int(float(os.getenv("QUERY_LOG_MAX_MB", "64")) * 1024 * 1024)
+        self.backups = int(os.getenv("QUERY_LOG_BACKUPS", "5"))
+
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=self.capacity)
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.rotations = 0
+
+    def record(self, entry: Dict[str, Any]):
+        """Queue one record; never blocks and never raises"""
+        if not self.enabled:
+            return
+        if len(self._buffer) == self.capacity:
+            self.dropped += 1
+        self._buffer.append(entry)
+        self.recorded += 1
+
+    def start(self):
+        if self.enabled and (self._task is None or self._task.done()):
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+            logger.info("Capturing chat requests to %s", self.path)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Query log flush failed: %s", e)
+
+    async def flush(self):
+        """Write everything buffered so far"""
+        batch: List[Dict[str, Any]] = []
+        while self._buffer:
+            batch.append(self._buffer.popleft())
+        if batch:
+            await asyncio.to_thread(self._write, batch)
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        data = "".join(json.dumps(entry, default=str) + "\n" for entry in batch).encode("utf-8")
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size and size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as f:
+            f.write(data)
+        self.written += len(batch)
+
+    def _rotate(self):
+        """query_log.jsonl -> .1 -> .2 ... keeping `backups` old files"""
+        if self.backups <= 0:
+            os.remove(self.path)
+        else:
+            for index in range(self.backups - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self.rotations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "buffered": len(self._buffer),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+        }
+
+
+# Global instance
+query_log = QueryLog()
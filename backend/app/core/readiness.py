@@ -0,0 +1,76 @@
+import os
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+from app.core.log import get_logger
+
+logger = get_logger("readiness")
+
+
+class Readiness:
+    """
+    Background warm-up of external clients, reported separately from liveness.
+
+    Each component registers a blocking `connect` callable. They run concurrently
+    in worker threads once the app has started; failures are retried every
+    READINESS_RETRY_INTERVAL seconds until every component is ready.
+    """
+
+    def __init__(self):
+        self.retry_interval = float(os.getenv("READINESS_RETRY_INTERVAL", "5"))
+        self._components: Dict[str, Callable[[], None]] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, connect: Callable[[], None]):
+        self._components[name] = connect
+        self._status[name] = {"state": "pending", "attempts": 0}
+
+    @property
+    def ready(self) -> bool:
+        return all(status["state"] == "ready" for status in self._status.values())
+
+    def start(self):
+        """Start warm-up on the running loop without waiting for it"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._warm_up())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _warm_up(self):
+        started = time.perf_counter()
+        pending = list(self._components)
+        while pending:
+            results = await asyncio.gather(*(self._connect(name) for name in pending))
+            pending = [name for name, ok in zip(pending, results) if not ok]
+            if pending:
+                await asyncio.sleep(self.retry_interval)
+        logger.info("All components ready after %.0f ms", (time.perf_counter() - started) * 1000)
+
+    async def _connect(self, name: str) -> bool:
+        status = self._status[name]
+        status["attempts"] += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._components[name])
+        except Exception as e:
+            status.update(state="failed", error=str(e))
+            logger.warning("%s not ready (attempt %d): %s", name, status["attempts"], e)
+            return False
+        status.update(state="ready", connect_ms=round((time.perf_counter() - started) * 1000, 1))
+        status.pop("error", None)
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "components": {name: dict(status) for name, status in self._status.items()}}
+
+
+# Global instance
+readiness = Readiness()
@@ -0,0 +1,260 @@
+import os
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError, HTTPClientError
+from app.core.metrics import CIRCUIT_STATE, DEPENDENCY_ERRORS, DEPENDENCY_RETRIES
+from app.core.log import get_logger
+
+logger = get_logger("resilience")
+
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+T = TypeVar("T")
+
+# Bedrock / AWS error codes that indicate a transient condition worth retrying
+RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "InternalFailure",
+    "ModelTimeoutException",
+    "ModelNotReadyException",
+    "RequestTimeout",
+    "RequestTimeoutException",
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the dependency's circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Classify an exception as transient (retry) or permanent (fail immediately)"""
+    if isinstance(error, ClientError):
+        error_info = error.response.get("Error", {})
+        if error_info.get("Code") in RETRYABLE_ERROR_CODES:
+            return True
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return status == 429 or status >= 500
+    if isinstance(error, (BotocoreConnectionError, HTTPClientError)):
+        return True
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    # Pinecone (and most HTTP SDKs) expose the HTTP status on the exception
+    status = getattr(error, "status", None) or getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return False
+
+
+class RetryBudget:
+    """
+    Token bucket that caps retries at a fraction of recent traffic.
+
+    Every first attempt deposits `ratio` tokens and every retry withdraws one, so
+    during an outage retries stop multiplying load once the bucket is drained.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min_tokens
+
+    def deposit(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_at = 0.0
+        self.half_open_calls = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must be rejected"""
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            elapsed = now - self.opened_at
+            if elapsed < self.reset_timeout:
+                raise CircuitOpenError(self.name, self.reset_timeout - elapsed)
+            self.state = self.HALF_OPEN
+            self.half_open_at = now
+            self.half_open_calls = 0
+
+        if self.state == self.HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                if now - self.half_open_at >= self.reset_timeout:
+                    # The probe has hung for a whole reset period; count it as failed
+                    logger.warning("Circuit '%s' probe timed out; reopening", self.name)
+                    self.state = self.OPEN
+                    self.opened_at = now
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self.half_open_calls += 1
+
+    def release_call(self):
+        """Give back a half-open probe slot whose call ended without an outcome (cancelled)"""
+        if self.state == self.HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.half_open_calls = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("Circuit '%s' opened after %d consecutive failures", self.name, self.consecutive_failures)
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by attempts, a deadline and a budget"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0,
+                 attempt_timeout: Optional[float] = None, deadline: Optional[float] = None,
+                 budget: Optional[RetryBudget] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.budget = budget
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class Dependency:
+    """Retry policy and circuit breaker guarding calls to one external backend"""
+
+    def __init__(self, name: str, policy: RetryPolicy, breaker: CircuitBreaker,
+                 classify: Callable[[BaseException], bool] = is_retryable):
+        self.name = name
+        self.policy = policy
+        self.breaker = breaker
+        self.classify = classify
+        CIRCUIT_STATE.labels(name).set_function(lambda: _CIRCUIT_STATE_VALUES[self.breaker.state])
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str, **defaults) -> "Dependency":
+        """Build a dependency guard from `<PREFIX>_*` environment variables"""
+        def setting(key: str, default: Any, cast: Callable[[str], Any] = float) -> Any:
+            return cast(os.getenv(f"{prefix}_{key}", str(defaults.get(key.lower(), default))))
+
+        policy = RetryPolicy(
+            max_attempts=setting("MAX_ATTEMPTS", 3, int),
+            base_delay=setting("BACKOFF_BASE", 0.2),
+            max_delay=setting("BACKOFF_MAX", 2.0),
+            attempt_timeout=setting("ATTEMPT_TIMEOUT", 30.0) or None,
+            deadline=setting("DEADLINE", 45.0) or None,
+            budget=RetryBudget(ratio=setting("RETRY_BUDGET_RATIO", 0.2)),
+        )
+        breaker = CircuitBreaker(
+            name=name,
+            failure_threshold=setting("BREAKER_THRESHOLD", 5, int),
+            reset_timeout=setting("BREAKER_RESET", 30.0),
+        )
+        return cls(name, policy, breaker)
+
+    async def call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """Run `operation` with retries, failing fast while the circuit is open"""
+        policy = self.policy
+        started = time.monotonic()
+        if policy.budget:
+            policy.budget.deposit()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                DEPENDENCY_ERRORS.labels(self.name, "circuit_open").inc()
+                raise
+
+            timeout = policy.attempt_timeout
+            if policy.deadline is not None:
+                remaining = policy.deadline - (time.monotonic() - started)
+                timeout = remaining if timeout is None else min(timeout, remaining)
+
+            try:
+                if timeout is not None:
+                    result = await asyncio.wait_for(operation(), timeout=max(timeout, 0.001))
+                else:
+                    result = await operation()
+            except Exception as e:
+                retryable = self.classify(e)
+                kind = "timeout" if isinstance(e, asyncio.TimeoutError) else ("retryable" if retryable else "permanent")
+                DEPENDENCY_ERRORS.labels(self.name, kind).inc()
+                if not retryable:
+                    # Permanent errors (bad request, auth) mean the backend answered, so
+                    # they close a half-open circuit rather than count as an outage
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+
+                if attempt >= policy.max_attempts:
+                    raise
+                if policy.budget and not policy.budget.try_withdraw():
+                    logger.warning("[%s] Retry budget exhausted, giving up after attempt %d", self.name, attempt)
+                    raise
+
+                delay = policy.backoff(attempt)
+                if policy.deadline is not None and (time.monotonic() - started) + delay >= policy.deadline:
+                    raise
+                logger.info("[%s] Attempt %d failed (%s), retrying in %.2fs", self.name, attempt, type(e).__name__, delay)
+                DEPENDENCY_RETRIES.labels(self.name).inc()
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (client disconnect, shutdown): no verdict on the backend,
+                # but the probe slot must not stay taken or the circuit never closes
+                self.breaker.release_call()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+
+# Per-dependency guards, shared by every service that talks to the backend
+bedrock_embedding = Dependency.from_env("bedrock-embedding", "BEDROCK_EMBEDDING", attempt_timeout=10.0, deadline=20.0)
+bedrock_generation = Dependency.from_env("bedrock-generation", "BEDROCK_GENERATION", max_attempts=2)
+pinecone_index = Dependency.from_env("pinecone", "PINECONE", attempt_timeout=5.0, deadline=10.0)
@@ -0,0 +1,185 @@
+import os
+import asyncio
+import atexit
+import contextvars
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, List, Optional
+
+
+class Span:
+    """One timed operation within a request trace"""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "status", "server_timing")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str],
+                 attributes: Dict[str, Any], server_timing: Optional[str]):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.status = "ok"
+        self.server_timing = server_timing
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """OTLP-style JSON representation"""
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": {"request.id": self.trace.request_id, **self.attributes},
+            "status": self.status,
+        }
+
+
+class Trace:
+    """Spans recorded for one request, identified by its request ID"""
+
+    def __init__(self, request_id: str, sampled: bool):
+        self.request_id = request_id
+        self.trace_id = uuid.uuid5(uuid.NAMESPACE_OID, request_id).hex
+        self.sampled = sampled
+        self.spans: List[Span] = []
+
+    def stage_timings(self) -> Dict[str, float]:
+        """Milliseconds per Server-Timing stage across the spans finished so far"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            if span.server_timing and span.end_ns:
+                totals[span.server_timing] = totals.get(span.server_timing, 0.0) + span.duration_ms
+        return totals
+
+    def server_timing(self) -> str:
+        """Render the per-stage breakdown as a Server-Timing header value"""
+        return ", ".join(f"{name};dur={duration:.1f}" for name, duration in self.stage_timings().items())
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+class JSONLSpanExporter:
+    """Append finished traces to a JSONL file from a background thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._queue: "queue.Queue[Optional[List[Dict[str, Any]]]]" = queue.Queue(maxsize=10000)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def export(self, spans: List[Span]):
+        try:
+            self._queue.put_nowait([span.to_dict() for span in spans])
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                batch = self._queue.get()
+                if batch is None:
+                    break
+                for span in batch:
+                    f.write(json.dumps(span, default=str) + "\n")
+                if self._queue.empty():
+                    f.flush()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5.0)
+
+
+class Tracer:
+    """Creates request traces and spans; exports sampled traces when configured"""
+
+    def __init__(self):
+        self.sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+        export_path = os.getenv("TRACE_EXPORT_PATH")
+        self.exporter = JSONLSpanExporter(export_path) if export_path else None
+
+    @contextmanager
+    def request(self, request_id: Optional[str] = None, name: str = "request",
+                **attributes: Any) -> Iterator[Trace]:
+        """Start a new trace (and its root span) for the current request"""
+        trace = Trace(request_id or uuid.uuid4().hex, sampled=random.random() < self.sample_rate)
+        token = _current_trace.set(trace)
+        try:
+            with self.span(name, **attributes):
+                yield trace
+        finally:
+            _current_trace.reset(token)
+            if self.exporter and trace.sampled:
+                self.exporter.export(trace.spans)
+
+    @contextmanager
+    def span(self, name: str, server_timing: Optional[str] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Record a child span of the current span; a no-op outside a request trace"""
+        trace = _current_trace.get()
+        if trace is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(trace, name, parent.span_id if parent else None, attributes, server_timing)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            trace.spans.append(span)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+def start_background_task(coro: Awaitable[Any]) -> asyncio.Task:
+    """
+    Schedule work that outlives the current request in a fresh context.
+
+    A task copies its creator's context, so background work started by a request
+    would otherwise add spans to (and stamp log lines with) that request's trace
+    after it has been exported.
+    """
+    return contextvars.Context().run(asyncio.ensure_future, coro)
+
+
+# Global instance
+tracer = Tracer()
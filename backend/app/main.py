@@ -1,8 +1,47 @@
-from fastapi import FastAPI
+import uuid
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import chat, documents
+from app.api import admin, chat, documents
+from app.core.aws import close_async_clients
+from app.core.executors import shutdown_executors
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import REGISTRY, CONTENT_TYPE
+from app.core.query_log import query_log
+from app.core.readiness import readiness
+from app.core.tracing import tracer
+from app.services.ai_service import ai_service
+from app.services.corpus_version import corpus_version_store
+from app.services.session_service import session_store
+from app.services.embedding_service import embedding_service
+from app.services.vector_service import vector_service
 
-app = FastAPI(title="PrivateGPT UI Backend", version="1.0.0")
+# Clients are built off the event loop after startup, not at import time
+readiness.register("bedrock-generation", ai_service.connect)
+readiness.register("bedrock-embedding", embedding_service.connect)
+readiness.register("vector-store", vector_service.connect)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_monitor.start()
+    readiness.start()
+    query_log.start()
+    await corpus_version_store.start()
+    await asyncio.to_thread(session_store.start)
+    yield
+    await asyncio.to_thread(session_store.stop)
+    await corpus_version_store.stop()
+    await query_log.stop()
+    await readiness.stop()
+    await loop_monitor.stop()
+    shutdown_executors()
+    await close_async_clients()
+
+
+app = FastAPI(title="PrivateGPT UI Backend", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -11,11 +50,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID", "X-Profile-Id"],
 )
 
+# Admin-only per-request profiling (runs inside the tracing middleware below)
+app.middleware("http")(admin.profile_requests)
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Trace each request and report its per-stage timings in a Server-Timing header"""
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    with tracer.request(request_id, name=f"{request.method} {request.url.path}",
+                        method=request.method, path=request.url.path) as trace:
+        response = await call_next(request)
+    
+    root = trace.spans[-1]
+    server_timing = trace.server_timing()
+    total = f"total;dur={root.duration_ms:.1f}"
+    response.headers["Server-Timing"] = f"{server_timing}, {total}" if server_timing else total
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # Include API routers
 app.include_router(chat.router, prefix="/api")
 app.include_router(documents.router, prefix="/api")
+app.include_router(admin.router)
 
 @app.get("/")
 async def root():
@@ -23,4 +83,16 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    """Liveness: the process is up and serving"""
     return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: external clients are connected and the instance can take traffic"""
+    status = readiness.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of pipeline, cache and dependency metrics"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ChatMessage(BaseModel):
@@ -12,6 +12,8 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
+    # Omit to start a new conversation; UUIDs and similar opaque IDs only, since it keys the session store
+    session_id: Optional[str] = Field(None, min_length=1, max_length=128, pattern=r"^[A-Za-z0-9._:-]+$")
 
 
 class ChatResponse(BaseModel):
@@ -19,3 +21,4 @@ class ChatResponse(BaseModel):
     role: str
     content: str
     timestamp: datetime
+    session_id: Optional[str] = None
@@ -1,32 +1,56 @@
 import os
 import asyncio
 from typing import Optional
-import boto3
 import json
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
+from app.core.resilience import CircuitOpenError, bedrock_generation
+from app.core.executors import generation_executor
+from app.core.aws import get_async_bedrock_client, get_bedrock_client
+from app.core.metrics import stage_timer
+from app.core.tracing import tracer
+from app.core.log import get_logger
 
 # Load environment variables
 load_dotenv()
 
+logger = get_logger("ai")
+
 class AIService:
     def __init__(self):
         self.region_name = os.getenv("AWS_REGION", "us-east-1")
         self.aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
         self.aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
+        # Override for a local emulator (python -m emulators.bedrock)
+        self.endpoint_url = os.getenv("BEDROCK_ENDPOINT_URL")
         self.model_id = os.getenv("BEDROCK_MODEL_ID", "amazon.titan-text-express-v1")
+        # "boto3" (executor threads) or "aio" (asyncio-native, no thread per in-flight call)
+        self.transport = os.getenv("BEDROCK_TRANSPORT", "boto3").lower()
 
-        self.test_mode = not all([self.aws_access_key_id, self.aws_secret_access_key])
+        self.test_mode = not self.endpoint_url and not all([self.aws_access_key_id, self.aws_secret_access_key])
 
-        if not self.test_mode:
-            self.bedrock_client = boto3.client(
-                service_name='bedrock-runtime',
-                region_name=self.region_name,
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key
-            )
+    @property
+    def bedrock_client(self):
+        """Shared bedrock-runtime client, created on first use or by connect() during warm-up"""
+        if self.test_mode:
+            return None
+        return get_bedrock_client(self.region_name, self.endpoint_url,
+                                  self.aws_access_key_id, self.aws_secret_access_key)
+
+    @property
+    def async_client(self):
+        """Shared asyncio-native client, used instead of bedrock_client when BEDROCK_TRANSPORT=aio"""
+        if self.test_mode:
+            return None
+        return get_async_bedrock_client(self.region_name, self.endpoint_url,
+                                        self.aws_access_key_id, self.aws_secret_access_key)
+
+    def connect(self):
+        """Create the Bedrock client ahead of the first request (blocking)"""
+        if self.transport == "aio":
+            self.async_client
         else:
-            self.bedrock_client = None
+            self.bedrock_client
 
     async def _generate_test_response(self, message: str) -> str:
         """Generate test response when AWS credentials are not available"""
@@ -36,8 +60,12 @@ class AIService:
         else:
             return f"This is a test response for your message: '{message}'."
 
-    async def generate_response(self, message: str, system_prompt: Optional[str] = None) -> str:
-        """Generate AI response using AWS Bedrock or test mode"""
+    async def complete(self, message: str, system_prompt: Optional[str] = None) -> str:
+        """Generate a completion, raising on Bedrock errors instead of returning a message"""
+        with tracer.span("ai.complete", model=self.model_id, prompt_chars=len(message)):
+            return await self._complete(message, system_prompt)
+
+    async def _complete(self, message: str, system_prompt: Optional[str] = None) -> str:
         if self.test_mode:
             return await self._generate_test_response(message)
 
@@ -53,70 +81,95 @@ class AIService:
             }
         })
 
-        try:
-            response = await asyncio.to_thread(
-                self.bedrock_client.invoke_model,
-                modelId=self.model_id,
-                body=body,
-                accept='application/json',
-                contentType='application/json'
+        if self.transport == "aio":
+            response_body = await bedrock_generation.call(
+                lambda: self.async_client.invoke_model(modelId=self.model_id, body=body)
             )
+        else:
+            response_body = await bedrock_generation.call(lambda: generation_executor.run(self._invoke_model, body))
+        with stage_timer("query", "post_process"):
+            return self._post_process(response_body)
+
+    def _invoke_model(self, body: str) -> dict:
+        """Invoke the model and read its response on the calling (executor) thread"""
+        response = self.bedrock_client.invoke_model(
+            modelId=self.model_id,
+            body=body,
+            accept='application/json',
+            contentType='application/json'
+        )
+        # Reading the body releases the pooled connection; keep that off the event loop
+        return json.loads(response['body'].read())
 
-            response_body = json.loads(response.get('body').read())
-            
-            # Try different response formats for different models
-            text_response = ""
-            if 'results' in response_body:
-                text_response = response_body['results'][0]['outputText']
-            elif 'outputText' in response_body:
-                text_response = response_body['outputText']
-            elif 'content' in response_body:
-                text_response = response_body['content'][0]['text']
-            else:
-                text_response = str(response_body)
-            
-            # Clean up response - remove duplicate patterns
-            text_response = text_response.strip()
-            
-            # Remove any trailing incomplete sentences after stop sequences
-            stop_sequences = [
-                "\n\nUser:", "\n\nAssistant:", "\n\nQuestion:", "\n\nAnswer:", 
-                "\n\nBot:", "\n\nClient:", "\n\nCurrent question:", "\nUser:",
-                "Based on the following information", "--- CONTEXT START ---",
-                "IMPORTANT:", "Answer (based ONLY on the context provided):"
-            ]
-            for stop_seq in stop_sequences:
-                if stop_seq in text_response:
-                    text_response = text_response.split(stop_seq)[0]
-            
-            # Remove duplicate assistant responses and role prefixes
-            if "Assistant:" in text_response:
-                parts = text_response.split("Assistant:")
-                text_response = parts[-1].strip()  # Take the last part after Assistant:
-            
-            # Remove any question echoing patterns
-            if text_response.startswith("Based on"):
-                # Find where the actual answer starts
-                answer_markers = ["\n\n", ". ", ":\n"]
-                for marker in answer_markers:
-                    if marker in text_response:
-                        parts = text_response.split(marker, 1)
-                        if len(parts) > 1 and len(parts[1]) > 20:  # Ensure we have a substantial answer
-                            text_response = parts[1]
-                            break
-            
-            # Clean up any remaining formatting artifacts
-            text_response = text_response.replace("Answer:", "").strip()
-            text_response = text_response.replace("Response:", "").strip()
-            
-            return text_response.strip()
-
-        except ClientError as e:
-            print(f"Bedrock API Error: {e}")
+    def _post_process(self, response_body: dict) -> str:
+        """Extract the generated text and strip echoed prompts and role prefixes"""
+        # Try different response formats for different models
+        text_response = ""
+        if 'results' in response_body:
+            text_response = response_body['results'][0]['outputText']
+        elif 'outputText' in response_body:
+            text_response = response_body['outputText']
+        elif 'content' in response_body:
+            text_response = response_body['content'][0]['text']
+        else:
+            text_response = str(response_body)
+        
+        # Clean up response - remove duplicate patterns
+        text_response = text_response.strip()
+        
+        # Remove any trailing incomplete sentences after stop sequences
+        stop_sequences = [
+            "\n\nUser:", "\n\nAssistant:", "\n\nQuestion:", "\n\nAnswer:", 
+            "\n\nBot:", "\n\nClient:", "\n\nCurrent question:", "\nUser:",
+            "Based on the following information", "--- CONTEXT START ---",
+            "IMPORTANT:", "Answer (based ONLY on the context provided):"
+        ]
+        for stop_seq in stop_sequences:
+            if stop_seq in text_response:
+                text_response = text_response.split(stop_seq)[0]
+        
+        # Remove duplicate assistant responses and role prefixes
+        if "Assistant:" in text_response:
+            parts = text_response.split("Assistant:")
+            text_response = parts[-1].strip()  # Take the last part after Assistant:
+        
+        # Remove any question echoing patterns
+        if text_response.startswith("Based on"):
+            # Find where the actual answer starts
+            answer_markers = ["\n\n", ". ", ":\n"]
+            for marker in answer_markers:
+                if marker in text_response:
+                    parts = text_response.split(marker, 1)
+                    if len(parts) > 1 and len(parts[1]) > 20:  # Ensure we have a substantial answer
+                        text_response = parts[1]
+                        break
+        
+        # Clean up any remaining formatting artifacts
+        text_response = text_response.replace("Answer:", "").strip()
+        text_response = text_response.replace("Response:", "").strip()
+        
+        return text_response.strip()
+
+    def error_response(self, e: Exception) -> str:
+        """Log a generation failure and return the message shown to the user in its place"""
+        if isinstance(e, CircuitOpenError):
+            logger.warning("Bedrock generation rejected: %s", e)
+            return "The AI service is temporarily unavailable. Please try again in a few moments."
+        if isinstance(e, asyncio.TimeoutError):
+            logger.error("Bedrock generation timed out")
+            return "The AI service took too long to respond. Please try again in a few moments."
+        if isinstance(e, ClientError):
+            logger.error("Bedrock API error: %s", e)
             return f"Error communicating with AWS Bedrock: {e.response['Error']['Message']}"
+        logger.error("Unexpected generation error: %s", e, exc_info=e)
+        return "An unexpected error occurred. Please check the server logs."
+
+    async def generate_response(self, message: str, system_prompt: Optional[str] = None) -> str:
+        """Generate AI response using AWS Bedrock or test mode"""
+        try:
+            return await self.complete(message, system_prompt)
         except Exception as e:
-            print(f"An unexpected error occurred: {e}")
-            return "An unexpected error occurred. Please check the server logs."
+            return self.error_response(e)
     
     async def generate_legal_response(self, message: str) -> str:
         """
@@ -0,0 +1,147 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.services.local_vector_index import LocalVectorIndex
+from app.core.log import get_logger
+
+logger = get_logger("rag.cache")
+
+
+class CachedAnswer:
+    """A generated answer plus the retrieval that produced it"""
+
+    __slots__ = ("question", "response", "context_info", "query_embedding", "chunk_ids", "created", "hits")
+
+    def __init__(self, question: str, response: str, context_info: Dict[str, Any],
+                 query_embedding: Optional[List[float]]):
+        self.question = question
+        self.response = response
+        self.context_info = context_info
+        self.query_embedding = query_embedding
+        self.chunk_ids = [source["doc_id"] for source in context_info.get("sources", [])]
+        self.created = time.monotonic()
+        self.hits = 0
+
+
+class AnswerCache:
+    """
+    Two-layer cache of generated answers for standalone (history-free) questions.
+
+    An exact layer keyed by the normalized question text answers repeats without
+    any Bedrock call. Behind it, a semantic layer holds the question embeddings of
+    cached answers in a LocalVectorIndex, so a reworded question whose embedding
+    is within `similarity_threshold` (cosine) of a cached one reuses that answer
+    and skips retrieval and generation.
+
+    Entries belong to one corpus version; the first lookup or store under a newer
+    version drops everything, so an answer never outlives the chunks it was built
+    from. Eviction is LRU by entry count plus a TTL.
+    """
+
+    def __init__(self):
+        self.max_entries = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+        self.ttl = float(os.getenv("ANSWER_CACHE_TTL", "3600"))  # seconds
+        # Deliberately strict: a near miss serves an answer to a different question
+        self.similarity_threshold = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+        self.semantic_enabled = os.getenv("ANSWER_CACHE_SEMANTIC", "true").lower() == "true"
+
+        self.corpus_version = 0
+        self._entries: "OrderedDict[Tuple[str, bool], CachedAnswer]" = OrderedDict()
+        self._index: Optional[LocalVectorIndex] = None
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sync_version(self, corpus_version: int) -> bool:
+        """Adopt a newer corpus version (dropping every entry); False if the caller's is stale"""
+        if corpus_version < self.corpus_version:
+            return False
+        if corpus_version > self.corpus_version:
+            if self._entries:
+                logger.info("Corpus changed (v%d -> v%d); dropping %d cached answers",
+                            self.corpus_version, corpus_version, len(self._entries))
+                self.invalidations += 1
+            self.clear()
+            self.corpus_version = corpus_version
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self._index = None
+
+    def _expired(self, entry: CachedAnswer, now: float) -> bool:
+        return self.ttl > 0 and now - entry.created > self.ttl
+
+    def _touch(self, key: Tuple[str, bool], entry: CachedAnswer) -> CachedAnswer:
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        return entry
+
+    def _remove(self, key: Tuple[str, bool]):
+        self._entries.pop(key, None)
+        if key[1] and self._index is not None:
+            self._index.delete([key[0]])
+
+    def get(self, normalized_question: str, use_rag: bool, corpus_version: int) -> Optional[CachedAnswer]:
+        """Exact lookup by normalized question text"""
+        if not self._sync_version(corpus_version):
+            return None
+        key = (normalized_question, use_rag)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry, time.monotonic()):
+            self._remove(key)
+            return None
+        return self._touch(key, entry)
+
+    def get_similar(self, query_embedding: List[float], corpus_version: int) -> Optional[CachedAnswer]:
+        """Nearest cached RAG answer whose question embedding clears the similarity threshold"""
+        # Sync first: adopting a newer corpus version drops the index
+        if not self.semantic_enabled or not self._sync_version(corpus_version) or self._index is None:
+            return None
+        if len(query_embedding) != self._index.dimension:
+            return None
+        matches = self._index.query(query_embedding, top_k=1)
+        if not matches:
+            return None
+        normalized_question, score, _ = matches[0]
+        if score < self.similarity_threshold:
+            return None
+        key = (normalized_question, True)
+        entry = self._entries.get(key)
+        if entry is None or self._expired(entry, time.monotonic()):
+            self._remove(key)
+            return None
+        logger.debug("Semantic answer cache hit (%.3f) for %r", score, normalized_question)
+        return self._touch(key, entry)
+
+    def put(self, normalized_question: str, use_rag: bool, corpus_version: int, entry: CachedAnswer):
+        """Store an answer generated against the given corpus version"""
+        if not self._sync_version(corpus_version):
+            return  # The corpus changed while this answer was being generated
+        key = (normalized_question, use_rag)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        # Only RAG answers join the semantic layer; their embedding is the retrieval query
+        if use_rag and self.semantic_enabled and entry.query_embedding:
+            if self._index is None:
+                self._index = LocalVectorIndex(dimension=len(entry.query_embedding))
+            if len(entry.query_embedding) == self._index.dimension:
+                self._index.upsert([{"id": normalized_question, "values": entry.query_embedding}])
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "semantic": self.semantic_enabled,
+            "similarity_threshold": self.similarity_threshold,
+            "corpus_version": self.corpus_version,
+            "invalidations": self.invalidations,
+        }
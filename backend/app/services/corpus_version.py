@@ -0,0 +1,188 @@
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+from app.core.log import get_logger
+from app.core.paths import backend_path
+
+logger = get_logger("vector.version")
+
+
+def _next_version(current: int) -> int:
+    # Millisecond epochs keep versions increasing even if the store is wiped and recreated
+    return max(current + 1, int(time.time() * 1000))
+
+
+class CorpusVersionStore:
+    """
+    Monotonic version of the indexed corpus, bumped by every write to the vector store.
+
+    Caches tag entries with the version they were built under and drop them when
+    it moves, so after an ingest, delete or reset no worker serves results built
+    from the old corpus. This in-process store is only visible to one worker.
+    """
+
+    def __init__(self):
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> int:
+        return self._version
+
+    def bump(self, reason: str) -> int:
+        with self._lock:
+            self._version = _next_version(self._version)
+            version = self._version
+        logger.info("Corpus version bumped to %d (%s)", version, reason)
+        return version
+
+    async def start(self):
+        """Begin background refresh (nothing to refresh in process)"""
+
+    async def stop(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "version": self.current}
+
+
+class SQLiteCorpusVersionStore(CorpusVersionStore):
+    """
+    Corpus version kept in a one-row SQLite (WAL mode) table shared by every worker on the host.
+
+    While started (the server lifespan), the version is read in a worker thread
+    every CORPUS_VERSION_POLL_MS and `current` returns the cached value, so the
+    event loop never touches SQLite; a bump by another worker (or by
+    reset_vector_db.py) is seen within one poll, and this worker's own bumps at
+    once. Scripts that never start the poller read on every access instead.
+
+    Reads and writes use separate connections and locks: WAL readers never wait
+    for a writer, so a bump stuck behind another process's write lock (up to the
+    busy timeout) cannot delay `current`. The database is opened on first use,
+    not at import.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        super().__init__()
+        self.path = backend_path(path)
+        self.timeout = timeout
+        self.poll_interval = float(os.getenv("CORPUS_VERSION_POLL_MS", "250")) / 1000
+
+        self._last_change = "created"
+        self._updated_at = 0.0
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()  # self._lock serializes bumps
+        self._task: Optional[asyncio.Task] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS corpus_version (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                version INTEGER NOT NULL,
+                reason TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            INSERT OR IGNORE INTO corpus_version (id, version, reason, updated_at) VALUES (0, 0, 'created', 0);
+        ''')
+        return conn
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def current(self) -> int:
+        if not self.running:
+            self.refresh()
+        return self._version
+
+    def refresh(self):
+        """Read the shared version (blocking); keeps the last value read if SQLite fails"""
+        try:
+            with self._read_lock:
+                if self._read_conn is None:
+                    self._read_conn = self._connect()
+                version, reason, updated_at = self._read_conn.execute(
+                    "SELECT version, reason, updated_at FROM corpus_version WHERE id = 0"
+                ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logger.error("Reading corpus version failed: %s", e)
+            return
+        # A read that raced one of this worker's bumps must not move the version back
+        if version >= self._version:
+            self._version, self._last_change, self._updated_at = version, reason, updated_at
+
+    def bump(self, reason: str) -> int:
+        with self._lock:
+            if self._write_conn is None:
+                self._write_conn = self._connect()
+            conn = self._write_conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = conn.execute("SELECT version FROM corpus_version WHERE id = 0").fetchone()[0]
+                version = _next_version(current)
+                updated_at = time.time()
+                conn.execute(
+                    "UPDATE corpus_version SET version = ?, reason = ?, updated_at = ? WHERE id = 0",
+                    (version, reason, updated_at)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if version > self._version:
+            self._version, self._last_change, self._updated_at = version, reason, updated_at
+        logger.info("Corpus version bumped to %d (%s)", version, reason)
+        return version
+
+    async def start(self):
+        """Read the version once, then keep it fresh in the background (call from the loop)"""
+        if self.running:
+            return
+        await asyncio.to_thread(self.refresh)
+        self._task = asyncio.get_running_loop().create_task(self._poll())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error("Corpus version poll failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        version = self.current
+        return {"backend": "sqlite", "version": version, "last_change": self._last_change,
+                "updated_at": self._updated_at}
+
+
+def _build_store() -> CorpusVersionStore:
+    """Select the corpus version store from CORPUS_VERSION_BACKEND ("sqlite" or "memory")
+
+    CORPUS_VERSION_DB_PATH, if relative, is taken relative to backend/.
+    """
+    backend = os.getenv("CORPUS_VERSION_BACKEND", "sqlite").lower()
+    if backend == "sqlite":
+        return SQLiteCorpusVersionStore(os.getenv("CORPUS_VERSION_DB_PATH", "data/corpus.db"))
+    return CorpusVersionStore()
+
+
+# Global instance
+corpus_version_store = _build_store()
@@ -1,72 +1,174 @@
 import os
 import asyncio
-import boto3
 import json
+import math
+import re
+import zlib
 from typing import List, Optional
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
+from app.core.resilience import CircuitOpenError, bedrock_embedding
+from app.core.executors import embedding_executor
+from app.core.aws import get_async_bedrock_client, get_bedrock_client
+from app.core.tracing import tracer
+from app.core.log import get_logger
 
 load_dotenv()
 
+logger = get_logger("embedding")
+
+
+class EmbeddingError(Exception):
+    """Raised when an embedding could not be generated"""
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedding engine based on feature hashing.
+
+    Words and word bigrams are hashed into a fixed number of signed buckets and
+    the result is L2-normalized, so texts sharing vocabulary score high on cosine
+    similarity. Needs no network and embeds a whole batch in one call.
+    """
+
+    _token_pattern = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, dimension: int = 1024):
+        self.dimension = dimension
+
+    def embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        tokens = self._token_pattern.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dimension] += sign
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else vector
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed(text) for text in texts]
+
+
 class EmbeddingService:
     def __init__(self):
         self.region_name = os.getenv("AWS_REGION", "us-east-1")
         self.aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
         self.aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
+        # Override for a local emulator (python -m emulators.bedrock)
+        self.endpoint_url = os.getenv("BEDROCK_ENDPOINT_URL")
         self.embedding_model_id = os.getenv("BEDROCK_EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2")
+        # "bedrock" (Titan) or "local" (offline feature-hashing engine)
+        self.provider = os.getenv("EMBEDDING_PROVIDER", "bedrock").lower()
+        # "boto3" (executor threads) or "aio" (asyncio-native, no thread per in-flight call)
+        self.transport = os.getenv("BEDROCK_TRANSPORT", "boto3").lower()
+        # Titan has no batch API, so batches fan out to this many concurrent calls
+        self.max_concurrency = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
         
-        self.test_mode = not all([self.aws_access_key_id, self.aws_secret_access_key])
+        self.test_mode = not self.endpoint_url and not all([self.aws_access_key_id, self.aws_secret_access_key])
+        self.local_engine = HashingEmbedder(dimension=1024) if self.provider == "local" else None
+        if self.local_engine:
+            self.embedding_model_id = "local-hashing-1024"
         
-        if not self.test_mode:
-            self.bedrock_client = boto3.client(
-                service_name='bedrock-runtime',
-                region_name=self.region_name,
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key
-            )
+    @property
+    def mock_embeddings(self) -> bool:
+        """True when every text gets the same placeholder vector (no Bedrock, no local engine)"""
+        return self.test_mode and self.local_engine is None
+    
+    @property
+    def bedrock_client(self):
+        """Shared bedrock-runtime client, created on first use or by connect() during warm-up"""
+        if self.test_mode or self.local_engine:
+            return None
+        return get_bedrock_client(self.region_name, self.endpoint_url,
+                                  self.aws_access_key_id, self.aws_secret_access_key)
+    
+    @property
+    def async_client(self):
+        """Shared asyncio-native client, used instead of bedrock_client when BEDROCK_TRANSPORT=aio"""
+        if self.test_mode or self.local_engine:
+            return None
+        return get_async_bedrock_client(self.region_name, self.endpoint_url,
+                                        self.aws_access_key_id, self.aws_secret_access_key)
+    
+    def connect(self):
+        """Create the Bedrock client ahead of the first request (blocking)"""
+        if self.transport == "aio":
+            self.async_client
         else:
-            self.bedrock_client = None
+            self.bedrock_client
+    
+    async def generate_embeddings(self, texts: List[str], return_exceptions: bool = False) -> List[List[float]]:
+        """
+        Generate embeddings for a list of texts using Titan Embeddings or the local engine.
+        
+        With `return_exceptions`, a text that fails to embed yields its exception in
+        place of a vector instead of failing the whole list.
+        """
+        with tracer.span("embedding.generate", provider=self.provider, texts=len(texts)):
+            return await self._generate_embeddings(texts, return_exceptions)
     
-    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts using Titan Embeddings"""
+    async def _generate_embeddings(self, texts: List[str], return_exceptions: bool = False) -> List[List[float]]:
+        if self.local_engine:
+            return self.local_engine.embed_batch(texts)
+        
         if self.test_mode:
             # Return mock embeddings for testing
             return [[0.1] * 1024 for _ in texts]  # Titan v2 uses 1024 dimensions
         
-        embeddings = []
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        
+        async def embed(text: str) -> List[float]:
+            async with semaphore:
+                return await self._generate_bedrock_embedding(text)
         
-        for text in texts:
-            try:
-                body = json.dumps({
-                    "inputText": text
-                })
-                
-                response = await asyncio.to_thread(
-                    self.bedrock_client.invoke_model,
-                    modelId=self.embedding_model_id,
-                    body=body,
-                    accept='application/json',
-                    contentType='application/json'
+        return list(await asyncio.gather(*[embed(text) for text in texts], return_exceptions=return_exceptions))
+    
+    async def _generate_bedrock_embedding(self, text: str) -> List[float]:
+        """Embed one text with Titan, raising EmbeddingError on failure"""
+        body = json.dumps({
+            "inputText": text
+        })
+        
+        try:
+            if self.transport == "aio":
+                response_body = await bedrock_embedding.call(
+                    lambda: self.async_client.invoke_model(modelId=self.embedding_model_id, body=body)
                 )
-                
-                response_body = json.loads(response.get('body').read())
-                embedding = response_body.get('embedding', [])
-                embeddings.append(embedding)
-                
-            except ClientError as e:
-                print(f"Bedrock Embedding Error: {e}")
-                # Return zero vector on error
-                embeddings.append([0.0] * 1024)
-            except Exception as e:
-                print(f"Embedding generation error: {e}")
-                embeddings.append([0.0] * 1024)
+            else:
+                response_body = await bedrock_embedding.call(lambda: embedding_executor.run(self._invoke_model, body))
+            embedding = response_body.get('embedding', [])
+            
+        except CircuitOpenError:
+            # Fail fast unwrapped so callers can answer with "temporarily unavailable"
+            raise
+        except ClientError as e:
+            logger.error("Bedrock embedding error: %s", e)
+            # Never store a zero vector: it silently corrupts the index and search
+            raise EmbeddingError(f"Bedrock embedding failed: {e.response['Error']['Message']}") from e
+        except Exception as e:
+            logger.error("Embedding generation error: %s", e)
+            raise EmbeddingError(f"Embedding generation failed: {e}") from e
         
-        return embeddings
+        if not embedding:
+            raise EmbeddingError("Bedrock returned an empty embedding")
+        return embedding
+    
+    def _invoke_model(self, body: str) -> dict:
+        """Invoke the embedding model and read its response on the calling (executor) thread"""
+        response = self.bedrock_client.invoke_model(
+            modelId=self.embedding_model_id,
+            body=body,
+            accept='application/json',
+            contentType='application/json'
+        )
+        return json.loads(response['body'].read())
     
     async def generate_single_embedding(self, text: str) -> List[float]:
         """Generate embedding for a single text"""
         embeddings = await self.generate_embeddings([text])
-        return embeddings[0] if embeddings else [0.0] * 1024
+        return embeddings[0]
 
 # Global instance
 embedding_service = EmbeddingService()
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.services.answer_cache import CachedAnswer
+from app.services.local_vector_index import LocalVectorIndex
+from app.core.log import get_logger
+
+logger = get_logger("rag.faq")
+
+
+def load_questions(path: str) -> List[str]:
+    """Curated FAQ questions, one per line; blank lines and # comments are skipped"""
+    with open(path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+class FAQIndex:
+    """
+    Precomputed answers to frequent questions, built offline by running the full pipeline.
+
+    The index is a JSON file of (question, answer, sources, query embedding) entries
+    stamped with the corpus version and embedding model it was built against.
+    Every worker reloads it when the file changes and serves from it only while
+    that corpus version is current, so answers are never older than the corpus.
+    Lookups mirror AnswerCache: exact normalized text first, then the nearest
+    question embedding above `similarity_threshold`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.similarity_threshold = float(os.getenv("FAQ_SIMILARITY", "0.95"))
+        self.semantic_enabled = True
+        self.reload_interval = float(os.getenv("FAQ_RELOAD_INTERVAL", "1"))  # seconds between stat() calls
+
+        self.corpus_version: Optional[int] = None
+        self.embedding_model: Optional[str] = None
+        self.built_at: Optional[float] = None
+        self._entries: Dict[str, CachedAnswer] = {}
+        self._index: Optional[LocalVectorIndex] = None
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        self._stale_logged: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def refresh(self):
+        """Reload the index file off the event loop if another process rewrote it"""
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval:
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            try:
+                await asyncio.to_thread(self._load, mtime)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error("Could not load FAQ index %s: %s", self.path, e)
+
+    def _load(self, mtime: float):
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        entries: Dict[str, CachedAnswer] = {}
+        index = None
+        for item in data["entries"]:
+            entry = CachedAnswer(item["question"], item["response"], item["context_info"], item["query_embedding"])
+            entries[item["normalized"]] = entry
+            if entry.query_embedding:
+                if index is None:
+                    index = LocalVectorIndex(dimension=len(entry.query_embedding))
+                index.upsert([{"id": item["normalized"], "values": entry.query_embedding}])
+        self._entries, self._index = entries, index
+        self.corpus_version = data["corpus_version"]
+        self.embedding_model = data.get("embedding_model")
+        self.built_at = data.get("built_at")
+        self._mtime = mtime
+        logger.info("Loaded FAQ index with %d answers (corpus version %s)", len(entries), self.corpus_version)
+
+    def _usable(self, corpus_version: int) -> bool:
+        if not self._entries:
+            return False
+        if self.corpus_version != corpus_version:
+            if self._stale_logged != corpus_version:
+                logger.warning("FAQ index built for corpus version %s, current is %s; not serving it",
+                               self.corpus_version, corpus_version)
+                self._stale_logged = corpus_version
+            return False
+        return True
+
+    def lookup(self, normalized_question: str, corpus_version: int) -> Optional[CachedAnswer]:
+        if not self._usable(corpus_version):
+            return None
+        return self._entries.get(normalized_question)
+
+    def lookup_similar(self, query_embedding: List[float], corpus_version: int,
+                       embedding_model: str) -> Optional[CachedAnswer]:
+        if not self.semantic_enabled or self._index is None or not self._usable(corpus_version):
+            return None
+        if embedding_model != self.embedding_model or len(query_embedding) != self._index.dimension:
+            return None
+        matches = self._index.query(query_embedding, top_k=1)
+        if not matches or matches[0][1] < self.similarity_threshold:
+            return None
+        return self._entries.get(matches[0][0])
+
+    def save(self, entries: Dict[str, CachedAnswer], corpus_version: int, embedding_model: str):
+        """Atomically replace the index file and load it into this process"""
+        data = {
+            "corpus_version": corpus_version,
+            "embedding_model": embedding_model,
+            "built_at": time.time(),
+            "entries": [
+                {
+                    "normalized": normalized,
+                    "question": entry.question,
+                    "response": entry.response,
+                    "context_info": entry.context_info,
+                    "query_embedding": entry.query_embedding,
+                }
+                for normalized, entry in entries.items()
+            ],
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.path)
+        self._load(os.stat(self.path).st_mtime)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "entries": len(self._entries),
+            "corpus_version": self.corpus_version,
+            "embedding_model": self.embedding_model,
+            "built_at": self.built_at,
+            "similarity_threshold": self.similarity_threshold,
+        }
+
+
+async def build_entries(questions: List[str], answer: Callable[[str], Awaitable[Dict[str, Any]]],
+                        normalize: Callable[[str], str], concurrency: int = 4) -> Dict[str, CachedAnswer]:
+    """Answer each question with the full pipeline, keeping only successful RAG answers"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(question: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            return await answer(question)
+
+    results = await asyncio.gather(*(run(question) for question in questions))
+    entries: Dict[str, CachedAnswer] = {}
+    for question, result in zip(questions, results):
+        if "error" in result["context_info"] or not result.get("query_embedding"):
+            logger.warning("Skipping FAQ question %r: %s", question,
+                           result["context_info"].get("error", "no retrieval"))
+            continue
+        entries[normalize(question)] = CachedAnswer(
+            question, result["response"], result["context_info"], list(result["query_embedding"])
+        )
+    return entries
@@ -0,0 +1,180 @@
+import math
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; fall back to pure Python scoring
+    np = None
+
+
+_COMPARATORS = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: value is not None and value > operand,
+    "$gte": lambda value, operand: value is not None and value >= operand,
+    "$lt": lambda value, operand: value is not None and value < operand,
+    "$lte": lambda value, operand: value is not None and value <= operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+}
+
+
+def matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Pinecone-style metadata filter ($eq, $in, $gt, $and, $or, ...) against metadata"""
+    if not filter:
+        return True
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, clause) for clause in condition):
+                return False
+        else:
+            value = metadata.get(key)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for operator, operand in condition.items():
+                if operator == "$exists":
+                    if (key in metadata) != bool(operand):
+                        return False
+                elif operator not in _COMPARATORS:
+                    raise ValueError(f"Unsupported filter operator {operator}")
+                elif not _COMPARATORS[operator](value, operand):
+                    return False
+    return True
+
+
+class LocalVectorIndex:
+    """
+    In-process cosine-similarity index with the same shape of results as Pinecone.
+
+    Vectors are stored L2-normalized so a query is a single matrix product; a batch
+    of queries is one matrix-matrix product followed by a per-row top-k.
+    """
+
+    def __init__(self, dimension: int = 1024):
+        self.dimension = dimension
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._metadata: List[Dict[str, Any]] = []
+        self._rows: List[List[float]] = []
+        self._matrix = None  # Lazily rebuilt numpy matrix of self._rows
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> List[float]:
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else list(vector)
+
+    def upsert(self, vectors: List[Dict[str, Any]]):
+        """Insert or replace vectors given as {"id", "values", "metadata"} dicts"""
+        # Validate and normalize the whole batch first so a bad vector leaves the index untouched
+        prepared = []
+        for vector in vectors:
+            values = vector["values"]
+            if len(values) != self.dimension:
+                raise ValueError(f"Vector dimension {len(values)} does not match index dimension {self.dimension}")
+            prepared.append((vector["id"], self._normalize(values), dict(vector.get("metadata") or {})))
+
+        with self._lock:
+            try:
+                for doc_id, row, metadata in prepared:
+                    position = self._positions.get(doc_id)
+                    if position is None:
+                        self._positions[doc_id] = len(self._ids)
+                        self._ids.append(doc_id)
+                        self._rows.append(row)
+                        self._metadata.append(metadata)
+                    else:
+                        self._rows[position] = row
+                        self._metadata[position] = metadata
+            finally:
+                self._matrix = None
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: bool = False):
+        """Delete vectors by ID, or everything"""
+        with self._lock:
+            if delete_all:
+                doomed = set(self._ids)
+            else:
+                doomed = set(ids or []) & set(self._positions)
+            if not doomed:
+                return
+            keep = [i for i, doc_id in enumerate(self._ids) if doc_id not in doomed]
+            self._ids = [self._ids[i] for i in keep]
+            self._rows = [self._rows[i] for i in keep]
+            self._metadata = [self._metadata[i] for i in keep]
+            self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+            self._matrix = None
+
+    def fetch(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored (normalized) values and metadata for the given IDs"""
+        with self._lock:
+            return {
+                doc_id: {"id": doc_id, "values": self._rows[position], "metadata": self._metadata[position]}
+                for doc_id, position in ((doc_id, self._positions.get(doc_id)) for doc_id in ids)
+                if position is not None
+            }
+
+    def query(self, vector: List[float], top_k: int = 5,
+              filter: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Return the top_k (id, score, metadata) matches for one query vector"""
+        return self.query_batch([vector], top_k, filter)[0]
+
+    def query_batch(self, vectors: List[List[float]], top_k: int = 5,
+                    filter: Optional[Dict[str, Any]] = None) -> List[List[Tuple[str, float, Dict[str, Any]]]]:
+        """Score every query against the index at once and return per-query top_k matches"""
+        with self._lock:
+            if not self._ids or not vectors:
+                return [[] for _ in vectors]
+            allowed = None
+            if filter:
+                allowed = [i for i, metadata in enumerate(self._metadata) if matches_filter(metadata, filter)]
+                if not allowed:
+                    return [[] for _ in vectors]
+            top_k = min(top_k, len(self._ids) if allowed is None else len(allowed))
+            if np is not None:
+                return self._query_batch_numpy(vectors, top_k, allowed)
+            return self._query_batch_python(vectors, top_k, allowed)
+
+    def _query_batch_numpy(self, vectors, top_k, allowed=None):
+        if self._matrix is None:
+            self._matrix = np.asarray(self._rows, dtype=np.float32)
+        matrix = self._matrix if allowed is None else self._matrix[allowed]
+        queries = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+        scores = queries @ matrix.T
+
+        results = []
+        for row in scores:
+            candidates = np.argpartition(-row, top_k - 1)[:top_k]
+            ordered = candidates[np.argsort(-row[candidates])]
+            positions = ordered if allowed is None else [allowed[i] for i in ordered]
+            results.append([(self._ids[p], float(row[i]), self._metadata[p]) for i, p in zip(ordered, positions)])
+        return results
+
+    def _query_batch_python(self, vectors, top_k, allowed=None):
+        positions = range(len(self._rows)) if allowed is None else allowed
+        results = []
+        for vector in vectors:
+            query = self._normalize(vector)
+            scored = [
+                (sum(q * r for q, r in zip(query, self._rows[i])), i)
+                for i in positions
+            ]
+            scored.sort(reverse=True)
+            results.append([(self._ids[i], score, self._metadata[i]) for score, i in scored[:top_k]])
+        return results
+
+    def describe_index_stats(self) -> Dict[str, Any]:
+        return {
+            "total_vectors": len(self._ids),
+            "dimension": self.dimension,
+            "index_fullness": 0.0,
+        }
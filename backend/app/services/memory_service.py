@@ -0,0 +1,136 @@
+import os
+import asyncio
+import re
+from typing import Dict, List, Tuple
+from app.services.ai_service import ai_service
+from app.services.session_service import session_store
+from app.core.tracing import start_background_task
+from app.core.log import get_logger
+
+logger = get_logger("memory")
+
+_FIRST_SENTENCE = re.compile(r"^(.+?[.!?])(\s|$)", re.S)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English prose)"""
+    return (len(text) + 3) // 4
+
+
+def _truncate_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    if keep_end:
+        return "..." + text[-max_chars:]
+    return text[:max_chars].rstrip() + "..."
+
+
+class ConversationMemory:
+    """
+    Session memory for prompts: a rolling summary of older turns plus recent turns verbatim.
+
+    `build_history` runs on the request path and only reads what is cached, so its
+    cost and output size are bounded by the token budgets. Folding turns that
+    leave the verbatim window into the summary happens in a background task
+    scheduled after each response.
+    """
+
+    def __init__(self):
+        self.session_store = session_store
+        self.ai_service = ai_service
+
+        self.recent_turns = int(os.getenv("MEMORY_RECENT_TURNS", "4"))
+        self.recent_token_budget = int(os.getenv("MEMORY_RECENT_TOKENS", "400"))
+        self.summary_token_budget = int(os.getenv("MEMORY_SUMMARY_TOKENS", "200"))
+        # "llm" summarizes with Bedrock; "extractive" keeps questions and first sentences
+        self.summarizer = os.getenv("MEMORY_SUMMARIZER", "llm").lower()
+
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+
+    def build_history(self, session_id: str) -> str:
+        """Return the prompt-ready history for a session, or "" for a new conversation"""
+        session = self.session_store.get(session_id)
+        if not session.turns:
+            return ""
+
+        # Walk back from the newest turn until the verbatim budget is spent
+        lines: List[str] = []
+        budget = self.recent_token_budget
+        for role, content in reversed(list(session.turns)[-self.recent_turns:]):
+            line = f"{role.capitalize()}: {content}"
+            tokens = estimate_tokens(line)
+            if tokens > budget:
+                if budget > 20:
+                    lines.append(_truncate_tokens(line, budget))
+                break
+            lines.append(line)
+            budget -= tokens
+        lines.reverse()
+
+        if session.summary:
+            summary = _truncate_tokens(session.summary, self.summary_token_budget, keep_end=True)
+            lines.insert(0, f"Summary of earlier conversation: {summary}")
+        return "\n".join(lines)
+
+    def schedule_refresh(self, session_id: str):
+        """Fold turns that left the verbatim window into the summary, off the request path"""
+        session = self.session_store.get(session_id)
+        fold_upto = session.turn_count - self.recent_turns
+        if fold_upto <= session.summary_upto or session_id in self._refresh_tasks:
+            return
+        task = start_background_task(self._refresh_summary(session_id))
+        self._refresh_tasks[session_id] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(session_id, None))
+
+    async def _refresh_summary(self, session_id: str):
+        session = self.session_store.peek(session_id)
+        if session is None:
+            return
+        fold_upto = session.turn_count - self.recent_turns
+        first_cached = session.turn_count - len(session.turns)
+        start = max(session.summary_upto, first_cached)
+        if fold_upto <= start:
+            return
+
+        turns = list(session.turns)[start - first_cached:fold_upto - first_cached]
+        try:
+            if self.summarizer == "llm" and not self.ai_service.test_mode:
+                summary = await self._summarize_with_llm(session.summary, turns)
+            else:
+                summary = self._summarize_extractive(session.summary, turns)
+        except Exception as e:
+            logger.warning("Conversation summary error: %s", e)
+            summary = self._summarize_extractive(session.summary, turns)
+
+        self.session_store.set_summary(
+            session_id, _truncate_tokens(summary, self.summary_token_budget, keep_end=True), fold_upto
+        )
+
+    async def _summarize_with_llm(self, summary: str, turns: List[Tuple[str, str]]) -> str:
+        transcript = "\n".join(f"{role.capitalize()}: {content}" for role, content in turns)
+        prompt = f"""Existing summary:
+{summary or "(none)"}
+
+New conversation turns:
+{transcript}
+
+Update the summary to cover the new turns in at most {self.summary_token_budget * 3 // 4} words. Keep names, figures and open questions; drop pleasantries."""
+        return await self.ai_service.complete(
+            message=prompt,
+            system_prompt="You maintain a concise running summary of a conversation between a user and an AI assistant at a law firm."
+        )
+
+    def _summarize_extractive(self, summary: str, turns: List[Tuple[str, str]]) -> str:
+        parts = [summary] if summary else []
+        for role, content in turns:
+            if role == "user":
+                parts.append(f"User asked: {content.strip()}")
+            else:
+                match = _FIRST_SENTENCE.match(content.strip())
+                parts.append(f"Assistant said: {match.group(1) if match else content.strip()}")
+        return " ".join(parts)
+
+
+# Global instance
+conversation_memory = ConversationMemory()
@@ -1,9 +1,33 @@
 import os
-from typing import List, Dict, Any, Optional
+import re
+import math
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from app.services.embedding_service import embedding_service
 from app.services.vector_service import vector_service
 from app.services.ai_service import ai_service
 from app.services.chunking_service import chunking_service
+from app.services.answer_cache import AnswerCache, CachedAnswer
+from app.services.faq_index import FAQIndex, build_entries, load_questions
+from app.core.resilience import CircuitOpenError
+from app.core.singleflight import SingleFlight
+from app.core.batching import MicroBatcher
+from app.core.paths import backend_path
+from app.core.metrics import CACHE_REQUESTS, INFLIGHT_REQUESTS, PIPELINE_REQUESTS, stage_timer
+from app.core.tracing import start_background_task, tracer
+from app.core.log import get_logger
+
+logger = get_logger("rag")
+debug_logger = get_logger("rag.debug")
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question for equality checks (case, whitespace, trailing punctuation)"""
+    return _TRAILING_PUNCTUATION.sub("", " ".join(question.lower().split()))
+
 
 class RAGService:
     def __init__(self):
@@ -15,30 +39,76 @@ class RAGService:
         self.max_context_length = int(os.getenv("RAG_MAX_CONTEXT_LENGTH", "4000"))
         self.similarity_threshold = float(os.getenv("RAG_SIMILARITY_THRESHOLD", "0.3"))  # Lowered for better recall
         self.top_k_results = int(os.getenv("RAG_TOP_K", "7"))  # Increased to get more context
+        
+        # Weight of the previous turn's query vector when embedding a follow-up (0 disables)
+        self.query_blend_weight = float(os.getenv("RAG_QUERY_BLEND_WEIGHT", "0.0"))
+        
+        # Share one pipeline execution between concurrent identical questions
+        self.coalesce_queries = os.getenv("RAG_COALESCE_QUERIES", "true").lower() == "true"
+        self._inflight_queries = SingleFlight()
+        
+        # Reuse answers to repeated and reworded standalone questions
+        self.answer_cache = AnswerCache() if os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true" else None
+        if self.answer_cache is not None and self.embedding_service.mock_embeddings:
+            # Mock embeddings are identical for every text, so every question would match
+            self.answer_cache.semantic_enabled = False
+        
+        # Answers to frequent questions precomputed for the current corpus version
+        # (relative paths are taken from backend/, not the working directory)
+        self.faq_index = None
+        if os.getenv("FAQ_INDEX_ENABLED", "true").lower() == "true":
+            self.faq_index = FAQIndex(backend_path(os.getenv("FAQ_INDEX_PATH", "data/faq_index.json")))
+            self.faq_index.semantic_enabled = not self.embedding_service.mock_embeddings
+        self.faq_questions_path = backend_path(os.getenv("FAQ_QUESTIONS_PATH", "faq_questions.txt"))
+        self.faq_rebuild_on_ingest = os.getenv("FAQ_REBUILD_ON_INGEST", "true").lower() == "true"
+        self.faq_build_concurrency = int(os.getenv("FAQ_BUILD_CONCURRENCY", "4"))
+        self._faq_rebuild: Optional[asyncio.Task] = None
+        self._faq_rebuild_pending = False
+        
+        # Optionally gather concurrent questions into one embed + search round
+        self._retrieval_batcher = None
+        if os.getenv("RAG_MICROBATCH_ENABLED", "false").lower() == "true":
+            self._retrieval_batcher = MicroBatcher(
+                handler=self._retrieve_batch,
+                window=float(os.getenv("RAG_MICROBATCH_WINDOW_MS", "5")) / 1000,
+                max_batch_size=int(os.getenv("RAG_MICROBATCH_MAX_SIZE", "16"))
+            )
     
     async def ingest_documents(self, documents: List[str], metadata: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Ingest documents into the RAG system with intelligent chunking"""
+        with INFLIGHT_REQUESTS.labels("ingest").track_inprogress(), stage_timer("ingest", "total"):
+            result = await self._ingest_documents(documents, metadata)
+        PIPELINE_REQUESTS.labels("ingest", "success" if result["success"] else "error").inc()
+        return result
+    
+    async def _ingest_documents(self, documents: List[str], metadata: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         try:
             # Chunk documents with overlap for better context preservation
-            chunked_texts, chunked_metadata = chunking_service.chunk_documents(
-                documents=documents,
-                metadata_list=metadata
-            )
+            with stage_timer("ingest", "chunk"):
+                chunked_texts, chunked_metadata = chunking_service.chunk_documents(
+                    documents=documents,
+                    metadata_list=metadata
+                )
             
             # Log chunking information
             original_count = len(documents)
             chunk_count = len(chunked_texts)
-            print(f"Chunked {original_count} documents into {chunk_count} chunks")
+            logger.info("Chunked %d documents into %d chunks", original_count, chunk_count)
             
             # Generate embeddings for chunks
-            embeddings = await self.embedding_service.generate_embeddings(chunked_texts)
+            with stage_timer("ingest", "embed"):
+                embeddings = await self.embedding_service.generate_embeddings(chunked_texts)
             
             # Store chunks in vector database
-            doc_ids = await self.vector_service.store_documents(
-                texts=chunked_texts,
-                embeddings=embeddings,
-                metadata=chunked_metadata
-            )
+            with stage_timer("ingest", "upsert"):
+                doc_ids = await self.vector_service.store_documents(
+                    texts=chunked_texts,
+                    embeddings=embeddings,
+                    metadata=chunked_metadata
+                )
+            
+            # The FAQ index now belongs to an older corpus version; recompute it
+            self._schedule_faq_rebuild()
             
             return {
                 "success": True,
@@ -49,37 +119,127 @@ class RAGService:
             }
             
         except Exception as e:
-            print(f"Document ingestion error: {e}")
+            logger.error("Document ingestion error: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "message": "Failed to ingest documents"
             }
     
-    async def query_with_rag(self, question: str, use_rag: bool = True) -> Dict[str, Any]:
+    async def query_with_rag(self, question: str, use_rag: bool = True, history: str = "",
+                             prior_query_vector: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+        """
+        Query the RAG system, coalescing identical concurrent questions
+        
+        Args:
+            question: The current user question; this alone is embedded for retrieval
+            use_rag: Whether to retrieve context from the knowledge base
+            history: Prompt-ready conversation history, passed only to generation
+            prior_query_vector: Query vector of the previous turn, blended into the
+                retrieval vector when RAG_QUERY_BLEND_WEIGHT > 0
+        
+        Returns:
+            Dict with "response", "context_info", "question" and the "query_embedding"
+            used for retrieval (None when retrieval did not run)
+        """
+        standalone = self._is_standalone(history, prior_query_vector)
+        if standalone:
+            normalized = normalize_question(question)
+            corpus_version = self.vector_service.corpus_version
+            if use_rag and self.faq_index is not None:
+                await self.faq_index.refresh()
+                answer = self.faq_index.lookup(normalized, corpus_version)
+                CACHE_REQUESTS.labels("faq_exact", "hit" if answer else "miss").inc()
+                if answer is not None:
+                    return self._cached_result(answer, question, "faq")
+            if self.answer_cache is not None:
+                cached = self.answer_cache.get(normalized, use_rag, corpus_version)
+                CACHE_REQUESTS.labels("answer_exact", "hit" if cached else "miss").inc()
+                if cached is not None:
+                    return self._cached_result(cached, question, "exact")
+        
+        if not self.coalesce_queries:
+            return await self._run_query(question, use_rag, history, prior_query_vector, standalone)
+        
+        key = (normalize_question(question), history, use_rag, self.vector_service.corpus_version)
+        coalesced = key in self._inflight_queries
+        CACHE_REQUESTS.labels("coalesce", "hit" if coalesced else "miss").inc()
+        # A coalesced follower's stage spans are recorded in the leader's trace
+        with tracer.span("rag.query", coalesced=coalesced):
+            result = await self._inflight_queries.do(
+                key, lambda: self._run_query(question, use_rag, history, prior_query_vector, standalone)
+            )
+        # Waiters share one result object; hand each caller its own top-level dict
+        return {**result, "question": question}
+    
+    def _is_standalone(self, history: str, prior_query_vector: Optional[Sequence[float]]) -> bool:
+        """Only standalone questions have answers that depend on nothing but the corpus"""
+        if history:
+            return False
+        return not self.query_blend_weight or prior_query_vector is None
+    
+    def _lookup_similar(self, query_embedding: List[float], corpus_version: int) -> Optional[Tuple[CachedAnswer, str]]:
+        """Precomputed FAQ answer, else cached answer, for a reworded question"""
+        if self.faq_index is not None:
+            answer = self.faq_index.lookup_similar(query_embedding, corpus_version,
+                                                   self.embedding_service.embedding_model_id)
+            CACHE_REQUESTS.labels("faq_semantic", "hit" if answer else "miss").inc()
+            if answer is not None:
+                return answer, "faq"
+        if self.answer_cache is not None and self.answer_cache.semantic_enabled:
+            cached = self.answer_cache.get_similar(query_embedding, corpus_version)
+            CACHE_REQUESTS.labels("answer_semantic", "hit" if cached else "miss").inc()
+            if cached is not None:
+                return cached, "semantic"
+        return None
+    
+    @staticmethod
+    def _cached_result(cached: CachedAnswer, question: str, layer: str,
+                       query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
+        return {
+            "response": cached.response,
+            "context_info": {**cached.context_info, "cache": layer},
+            "question": question,
+            "query_embedding": query_embedding if query_embedding is not None else cached.query_embedding
+        }
+    
+    async def _run_query(self, question: str, use_rag: bool, history: str = "",
+                         prior_query_vector: Optional[Sequence[float]] = None,
+                         standalone: bool = False) -> Dict[str, Any]:
+        """Run the query pipeline once, recording in-flight and end-to-end metrics"""
+        with INFLIGHT_REQUESTS.labels("query").track_inprogress(), stage_timer("query", "total"):
+            result = await self._execute_query(question, use_rag, history, prior_query_vector, standalone)
+        PIPELINE_REQUESTS.labels("query", "error" if "error" in result["context_info"] else "success").inc()
+        return result
+    
+    async def _execute_query(self, question: str, use_rag: bool, history: str = "",
+                             prior_query_vector: Optional[Sequence[float]] = None,
+                             standalone: bool = False) -> Dict[str, Any]:
         """Query the RAG system with context retrieval"""
         try:
             context_documents = []
             context_info = {"used_rag": False, "sources": []}
+            query_embedding = None
+            # Read before retrieval so an answer is never cached under a newer corpus
+            corpus_version = self.vector_service.corpus_version
             
             if use_rag:
-                # Generate embedding for the question
-                query_embedding = await self.embedding_service.generate_single_embedding(question)
+                semantic_lookup = (self.faq_index is not None and self.faq_index.semantic_enabled) or (
+                    self.answer_cache is not None and self.answer_cache.semantic_enabled)
+                if standalone and semantic_lookup:
+                    # Embed first so a reworded FAQ or cached question skips search and generation
+                    with stage_timer("query", "embed"):
+                        query_embedding = await self.embedding_service.generate_single_embedding(question)
+                    with stage_timer("query", "answer_cache"):
+                        found = self._lookup_similar(query_embedding, corpus_version)
+                    if found is not None:
+                        return self._cached_result(found[0], question, found[1], query_embedding)
                 
-                # Search for relevant documents
-                search_results = await self.vector_service.search_similar(
-                    query_embedding=query_embedding,
-                    top_k=self.top_k_results
-                )
+                # Embed only the current question and search for relevant documents
+                search_results, query_embedding = await self._retrieve(question, prior_query_vector, query_embedding)
                 
                 # Filter by similarity threshold and extract context
-                print(f"\n[RAG Debug] Query: {question[:50]}...")
-                print(f"[RAG Debug] Found {len(search_results)} results")
-                
                 for doc_id, score, metadata in search_results:
-                    text_preview = metadata.get("text", "")[:100]
-                    print(f"[RAG Debug] Score: {score:.3f} - Text: {text_preview}...")
-                    
                     if score >= self.similarity_threshold:
                         context_documents.append(metadata.get("text", ""))
                         context_info["sources"].append({
@@ -93,34 +253,162 @@ class RAGService:
                             "preview": metadata.get("text", "")[:100] + "..."
                         })
                 
-                print(f"[RAG Debug] Using {len(context_documents)} documents above threshold {self.similarity_threshold}")
+                # Previews are only built when debug logging is enabled
+                if debug_logger.isEnabledFor(logging.DEBUG):
+                    debug_logger.debug(
+                        "Retrieved %d results, using %d above threshold %s",
+                        len(search_results), len(context_documents), self.similarity_threshold,
+                        extra={"fields": {
+                            "query": question[:50],
+                            "results": [
+                                {"score": round(score, 3), "text": metadata.get("text", "")[:100]}
+                                for _, score, metadata in search_results
+                            ]
+                        }}
+                    )
                 
                 context_info["used_rag"] = len(context_documents) > 0
             
-            # Build enhanced question with context directly embedded
-            enhanced_question = self._build_enhanced_question(context_documents, question)
+            # Build enhanced question with context and conversation history
+            with stage_timer("query", "prompt_build"):
+                enhanced_question = self._build_enhanced_question(context_documents, question, history)
+                system_prompt = self._build_system_prompt()
             
             # Generate AI response with context
-            system_prompt = self._build_system_prompt()
-            ai_response = await self.ai_service.generate_response(
-                message=enhanced_question,
-                system_prompt=system_prompt
-            )
+            with stage_timer("query", "generate"):
+                try:
+                    ai_response = await self.ai_service.complete(enhanced_question, system_prompt)
+                except Exception as e:
+                    ai_response = self.ai_service.error_response(e)
+                    context_info["error"] = str(e)
+            
+            if standalone and self.answer_cache is not None and "error" not in context_info:
+                self.answer_cache.put(normalize_question(question), use_rag, corpus_version,
+                                      CachedAnswer(question, ai_response, context_info, query_embedding))
             
             return {
                 "response": ai_response,
                 "context_info": context_info,
-                "question": question
+                "question": question,
+                "query_embedding": query_embedding
             }
             
+        except CircuitOpenError as e:
+            logger.warning("RAG query rejected: %s", e)
+            return {
+                "response": "The knowledge base is temporarily unavailable. Please try again in a few moments.",
+                "context_info": {"used_rag": False, "sources": [], "error": str(e)},
+                "question": question,
+                "query_embedding": None
+            }
         except Exception as e:
-            print(f"RAG query error: {e}")
+            logger.error("RAG query error: %s", e)
             return {
                 "response": f"I encountered an error processing your question: {str(e)}",
                 "context_info": {"used_rag": False, "sources": [], "error": str(e)},
-                "question": question
+                "question": question,
+                "query_embedding": None
             }
     
+    async def rebuild_faq_index(self, questions: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Answer the FAQ question set with the full pipeline and publish it for the current corpus"""
+        if self.faq_index is None:
+            return {"saved": False, "reason": "FAQ index disabled"}
+        if questions is None:
+            questions = await asyncio.to_thread(load_questions, self.faq_questions_path)
+        
+        corpus_version = self.vector_service.corpus_version
+        # Bypasses the FAQ index and answer cache so every answer is generated fresh
+        entries = await build_entries(
+            questions, lambda question: self._run_query(question, True), normalize_question,
+            concurrency=self.faq_build_concurrency
+        )
+        if self.vector_service.corpus_version != corpus_version:
+            logger.info("Corpus changed while building the FAQ index; discarding it")
+            return {"saved": False, "reason": "corpus changed during build", "questions": len(questions)}
+        
+        await asyncio.to_thread(self.faq_index.save, entries, corpus_version,
+                                self.embedding_service.embedding_model_id)
+        return {"saved": True, "questions": len(questions), "answers": len(entries), "corpus_version": corpus_version}
+    
+    def _schedule_faq_rebuild(self):
+        """Rebuild the FAQ index in the background, once more if another ingest lands meanwhile"""
+        if self.faq_index is None or not self.faq_rebuild_on_ingest:
+            return
+        if not os.path.exists(self.faq_questions_path):
+            logger.warning("FAQ questions file %s not found; FAQ index not rebuilt", self.faq_questions_path)
+            return
+        if self._faq_rebuild is not None and not self._faq_rebuild.done():
+            self._faq_rebuild_pending = True
+            return
+        self._faq_rebuild = start_background_task(self._rebuild_faq_in_background())
+    
+    async def _rebuild_faq_in_background(self):
+        while True:
+            self._faq_rebuild_pending = False
+            try:
+                result = await self.rebuild_faq_index()
+                logger.info("FAQ index rebuild: %s", result)
+            except Exception as e:
+                logger.error("FAQ index rebuild failed: %s", e)
+            if not self._faq_rebuild_pending:
+                return
+    
+    async def _retrieve(self, question: str, prior_query_vector: Optional[Sequence[float]] = None,
+                        query_embedding: Optional[List[float]] = None) -> Tuple[List[Any], List[float]]:
+        """Embed a question (unless already embedded) and return its nearest chunks along with the query vector used"""
+        if query_embedding is None:
+            if self._retrieval_batcher:
+                return await self._retrieval_batcher.submit((question, prior_query_vector))
+            
+            with stage_timer("query", "embed"):
+                query_embedding = await self.embedding_service.generate_single_embedding(question)
+        query_embedding = self._blend_query_vector(query_embedding, prior_query_vector)
+        with stage_timer("query", "search"):
+            search_results = await self.vector_service.search_similar(
+                query_embedding=query_embedding,
+                top_k=self.top_k_results
+            )
+        return search_results, query_embedding
+    
+    async def _retrieve_batch(self, items: List[Tuple[str, Optional[Sequence[float]]]]) -> List[Any]:
+        """
+        Embed a batch of questions and search for all of them in one round.
+        
+        Returns (search results, query vector) per question, or the exception that
+        question hit, so one bad question does not fail the others in its batch.
+        """
+        with stage_timer("query", "embed_batch"):
+            embedded = await self.embedding_service.generate_embeddings(
+                [question for question, _ in items], return_exceptions=True
+            )
+        results: List[Any] = list(embedded)
+        ok = [i for i, embedding in enumerate(embedded) if not isinstance(embedding, BaseException)]
+        if not ok:
+            return results
+        
+        query_embeddings = [self._blend_query_vector(embedded[i], items[i][1]) for i in ok]
+        with stage_timer("query", "search_batch"):
+            search_results = await self.vector_service.search_similar_batch(
+                query_embeddings=query_embeddings,
+                top_k=self.top_k_results,
+                return_exceptions=True
+            )
+        for i, query_embedding, found in zip(ok, query_embeddings, search_results):
+            results[i] = found if isinstance(found, BaseException) else (found, query_embedding)
+        return results
+    
+    def _blend_query_vector(self, query_embedding: List[float],
+                            prior_query_vector: Optional[Sequence[float]]) -> List[float]:
+        """Mix in the previous turn's query vector so terse follow-ups keep their topic"""
+        weight = self.query_blend_weight
+        if not weight or prior_query_vector is None or len(prior_query_vector) != len(query_embedding):
+            return query_embedding
+        
+        blended = [(1 - weight) * q + weight * p for q, p in zip(query_embedding, prior_query_vector)]
+        norm = math.sqrt(sum(v * v for v in blended))
+        return [v / norm for v in blended] if norm else query_embedding
+    
     def _build_context(self, context_documents: List[str], question: str) -> str:
         """Build context string from retrieved documents"""
         if not context_documents:
@@ -149,32 +437,24 @@ class RAGService:
         
         Remember: It's better to admit you don't know than to provide incorrect information."""
     
-    def _build_enhanced_question(self, context_documents: List[str], question: str) -> str:
+    def _build_enhanced_question(self, context_documents: List[str], question: str, history: str = "") -> str:
         """Build an enhanced question with context embedded directly"""
+        history_section = f"""Previous conversation:
+{history}
+
+""" if history else ""
+        
         if not context_documents:
-            return question
+            return f"{history_section}User: {question}" if history else question
         
         # Combine context documents
         context_text = self._build_context(context_documents, question)
         
-        # Clean the question to remove any conversation formatting
-        clean_question = question
-        if "Previous conversation:" in clean_question:
-            # Extract just the actual current question
-            parts = clean_question.split("\n\nUser: ")
-            if len(parts) > 1:
-                clean_question = parts[-1].strip()
-            else:
-                # Try another pattern
-                parts = clean_question.split("\nUser: ")
-                if len(parts) > 1:
-                    clean_question = parts[-1].strip()
-        
         # Create enhanced prompt with context directly in the question
-        enhanced_prompt = f"""Context from knowledge base:
+        enhanced_prompt = f"""{history_section}Context from knowledge base:
 {context_text}
 
-Based on the context above, please answer this question: {clean_question}
+Based on the context above, please answer this question: {question}
 
 Provide a direct answer using only the information from the context. If the information is not available in the context, say so clearly."""
         
@@ -188,6 +468,7 @@ Provide a direct answer using only the information from the context. If the info
             
             return {
                 "status": "operational",
+                "corpus_version": self.vector_service.versions.stats(),
                 "vector_database": vector_stats,
                 "embedding_model": self.embedding_service.embedding_model_id,
                 "text_generation_model": self.ai_service.model_id,
@@ -195,6 +476,17 @@ Provide a direct answer using only the information from the context. If the info
                     "max_context_length": self.max_context_length,
                     "similarity_threshold": self.similarity_threshold,
                     "top_k_results": self.top_k_results,
+                    "coalesce_queries": self.coalesce_queries,
+                    "query_blend_weight": self.query_blend_weight,
+                    "answer_cache": self.answer_cache.stats() if self.answer_cache is not None else {"enabled": False},
+                    "faq_index": self.faq_index.stats() if self.faq_index is not None else {"enabled": False},
+                    "retrieval_cache": (self.vector_service.retrieval_cache.stats()
+                                        if self.vector_service.retrieval_cache is not None else {"enabled": False}),
+                    "microbatch": {
+                        "enabled": self._retrieval_batcher is not None,
+                        "window_ms": self._retrieval_batcher.window * 1000 if self._retrieval_batcher else None,
+                        "max_batch_size": self._retrieval_batcher.max_batch_size if self._retrieval_batcher else None
+                    },
                     "chunking": {
                         "chunk_size": chunking_service.chunk_size,
                         "chunk_overlap": chunking_service.chunk_overlap,
@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.metrics import CACHE_HIT_RATIO, CACHE_REQUESTS, CACHE_SAVED_SECONDS
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; fall back to pure Python quantization
+    np = None
+
+SearchResults = List[Tuple[str, float, Dict[str, Any]]]
+
+
+class RetrievalCache:
+    """
+    Bounded LRU cache of vector search results.
+
+    Keys hash the query vector quantized to `quantum` (so float noise between two
+    embeddings of the same text still hits) together with top_k, the metadata
+    filter and the corpus version. Entries are dropped as soon as a lookup or
+    store sees a newer corpus version. Each entry remembers how long its search
+    took, which is counted as saved latency on every hit.
+    """
+
+    def __init__(self):
+        self.max_entries = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "2048"))
+        self.ttl = float(os.getenv("RETRIEVAL_CACHE_TTL", "600"))  # seconds
+        self.quantum = float(os.getenv("RETRIEVAL_CACHE_QUANTUM", "0.0001"))
+
+        self.corpus_version = 0
+        self._entries: "OrderedDict[str, Tuple[SearchResults, float, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        CACHE_HIT_RATIO.labels("retrieval").set_function(self.hit_ratio)
+        self._saved = CACHE_SAVED_SECONDS.labels("retrieval")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def key(self, query_embedding: List[float], top_k: int, filter: Optional[Dict[str, Any]],
+            corpus_version: int) -> str:
+        """Stable key for a search: quantized vector, top_k, canonical filter and corpus version"""
+        scale = 1.0 / self.quantum
+        if np is not None:
+            quantized = np.rint(np.asarray(query_embedding, dtype=np.float64) * scale).astype(np.int64).tobytes()
+        else:
+            quantized = ",".join(str(round(v * scale)) for v in query_embedding).encode()
+        digest = hashlib.blake2b(quantized, digest_size=16)
+        digest.update(f"|{top_k}|{json.dumps(filter, sort_keys=True, default=str)}|{corpus_version}".encode())
+        return digest.hexdigest()
+
+    def _sync_version(self, corpus_version: int) -> bool:
+        """Adopt a newer corpus version (dropping every entry); False if the caller's is stale"""
+        if corpus_version < self.corpus_version:
+            return False
+        if corpus_version > self.corpus_version:
+            self._entries.clear()
+            self.corpus_version = corpus_version
+        return True
+
+    def get(self, key: str, corpus_version: int) -> Optional[SearchResults]:
+        entry = self._entries.get(key) if self._sync_version(corpus_version) else None
+        if entry is not None and self.ttl > 0 and time.monotonic() - entry[2] > self.ttl:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            CACHE_REQUESTS.labels("retrieval", "miss").inc()
+            return None
+        self._entries.move_to_end(key)
+        results, duration, _ = entry
+        self.hits += 1
+        self.saved_seconds += duration
+        self._saved.inc(duration)
+        CACHE_REQUESTS.labels("retrieval", "hit").inc()
+        return results
+
+    def put(self, key: str, corpus_version: int, results: SearchResults, duration: float):
+        """Store the results of a search that started under `corpus_version` and took `duration` seconds"""
+        if not self._sync_version(corpus_version):
+            return  # The corpus changed while the search was running
+        self._entries[key] = (results, duration, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio(), 4),
+            "saved_ms": round(self.saved_seconds * 1000, 1),
+            "corpus_version": self.corpus_version,
+        }
@@ -0,0 +1,424 @@
+import os
+import asyncio
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+from app.core.log import get_logger
+from app.core.paths import backend_path
+
+logger = get_logger("session")
+
+# Rough per-turn bookkeeping overhead (tuple, deque slot, str headers) in bytes
+_TURN_OVERHEAD = 120
+
+
+class Session:
+    """One conversation: a bounded deque of (role, content) turns plus its lock"""
+
+    __slots__ = ("session_id", "turns", "size_bytes", "last_access", "lock", "version", "appended",
+                 "turn_count", "summary", "summary_upto", "query_vector")
+
+    def __init__(self, session_id: str, max_turns: int):
+        self.session_id = session_id
+        self.turns: Deque[Tuple[str, str]] = deque(maxlen=max_turns)
+        self.size_bytes = 0
+        self.last_access = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.version = 0  # Highest persisted turn sequence this copy reflects
+        self.appended = False  # Turns appended to this copy since it was last loaded
+        self.turn_count = 0  # Turns ever appended (persisted); self.turns holds the newest of them
+        self.summary = ""  # Rolling summary of turns [0, summary_upto)
+        self.summary_upto = 0
+        self.query_vector: Optional[array] = None  # Last retrieval vector, float32
+
+
+class SessionBackend:
+    """Persistent storage behind the in-process SessionStore cache"""
+
+    def load(self, session_id: str, limit: int) -> Tuple[List[Tuple[str, str]], int, int]:
+        """Return the most recent `limit` turns (oldest first), the session version and turn count"""
+        raise NotImplementedError
+
+    def version(self, session_id: str) -> int:
+        """Return the highest stored turn sequence for the session (0 if none)"""
+        raise NotImplementedError
+
+    def append(self, session_id: str, role: str, content: str, turn: int):
+        """Persist a turn; `turn` is its 0-based index in the whole conversation"""
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+    def has_pending(self, session_id: str) -> bool:
+        """True while this process has writes for the session not yet persisted"""
+        return False
+
+    def last_written(self, session_id: str) -> int:
+        """Highest turn sequence this process itself persisted for the session"""
+        return 0
+
+    def close(self):
+        pass
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    SQLite (WAL mode) turn log shared by every worker process on the host.
+
+    Appends are queued and written by a background thread in batched transactions,
+    so the request path never waits on disk. WAL lets readers in other workers
+    proceed while a batch commits.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.02, batch_size: int = 256,
+                 retention: float = 7 * 24 * 3600):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retention = retention
+        self.purge_interval = 3600.0  # seconds between deletes of turns past retention
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._read_conn = self._connect()
+        self._read_conn.executescript('''
+            CREATE TABLE IF NOT EXISTS session_turns (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                turn INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_session_turns_session ON session_turns (session_id, seq);
+        ''')
+        columns = {row[1] for row in self._read_conn.execute("PRAGMA table_info(session_turns)")}
+        if "turn" not in columns:
+            # Databases written before turn indexes were stored
+            self._read_conn.execute("ALTER TABLE session_turns ADD COLUMN turn INTEGER")
+        self._read_lock = threading.Lock()
+
+        self._queue: "queue.Queue[Optional[Tuple[str, str, str, str, int, float]]]" = queue.Queue()
+        self._pending: Dict[str, int] = {}
+        self._written: Dict[str, int] = {}
+        self._state_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name="session-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def load(self, session_id: str, limit: int) -> Tuple[List[Tuple[str, str]], int, int]:
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                "SELECT seq, role, content, turn FROM session_turns WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+                (session_id, limit)
+            ).fetchall()
+        rows.reverse()
+        version = rows[-1][0] if rows else 0
+        # Rows from before turn indexes were stored only tell us how many are left
+        turn_count = rows[-1][3] + 1 if rows and rows[-1][3] is not None else len(rows)
+        return [(role, content) for _, role, content, _ in rows], version, turn_count
+
+    def version(self, session_id: str) -> int:
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT MAX(seq) FROM session_turns WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] or 0
+
+    def append(self, session_id: str, role: str, content: str, turn: int):
+        with self._state_lock:
+            self._pending[session_id] = self._pending.get(session_id, 0) + 1
+        self._queue.put(("append", session_id, role, content, turn, time.time()))
+
+    def delete(self, session_id: str):
+        self._queue.put(("delete", session_id, "", "", 0, 0.0))
+
+    def has_pending(self, session_id: str) -> bool:
+        with self._state_lock:
+            return self._pending.get(session_id, 0) > 0
+
+    def last_written(self, session_id: str) -> int:
+        with self._state_lock:
+            return self._written.get(session_id, 0)
+
+    def _write_loop(self):
+        conn = self._connect()
+        last_purge = time.monotonic()
+        running = True
+        while running:
+            item = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if item is None:
+                running = False
+
+            # The thread must outlive any error: pending counts only drop when it writes
+            try:
+                if batch:
+                    self._write_batch(conn, batch)
+                if time.monotonic() - last_purge > self.purge_interval:
+                    last_purge = time.monotonic()
+                    self._purge(conn)
+            except Exception as e:
+                logger.error("Session writer error: %s", e)
+        conn.close()
+
+    def _purge(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM session_turns WHERE created_at < ?", (time.time() - self.retention,))
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[str, str, str, str, int, float]]):
+        written: Dict[str, int] = {}
+        appended: Dict[str, int] = {}
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op, session_id, role, content, turn, created_at in batch:
+                if op == "delete":
+                    conn.execute("DELETE FROM session_turns WHERE session_id = ?", (session_id,))
+                    continue
+                cursor = conn.execute(
+                    "INSERT INTO session_turns (session_id, role, content, created_at, turn) VALUES (?, ?, ?, ?, ?)",
+                    (session_id, role, content, created_at, turn)
+                )
+                written[session_id] = cursor.lastrowid
+                appended[session_id] = appended.get(session_id, 0) + 1
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.error("Session store write error: %s", e)
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            written = {}
+        finally:
+            with self._state_lock:
+                self._written.update(written)
+                for session_id, count in appended.items():
+                    remaining = self._pending.get(session_id, 0) - count
+                    if remaining > 0:
+                        self._pending[session_id] = remaining
+                    else:
+                        self._pending.pop(session_id, None)
+
+    def close(self):
+        """Flush queued writes and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=5.0)
+
+
+class SessionStore:
+    """
+    In-memory conversation store with LRU and idle-TTL eviction under a global memory cap.
+
+    Sessions are kept in an OrderedDict in access order, so the least recently used
+    (and therefore the idlest) session is always at the front and eviction is O(1)
+    per session removed. Sessions whose lock is held by an in-flight request are
+    never evicted.
+
+    With a persistent backend the store acts as a read-through cache: evicted
+    sessions are reloaded on demand and `refresh` picks up turns written by other
+    worker processes.
+    """
+
+    def __init__(self, backend: Optional[SessionBackend] = None):
+        self.backend = backend
+        self.max_turns = int(os.getenv("SESSION_MAX_TURNS", "20"))  # 10 exchanges
+        self.max_sessions = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+        self.idle_ttl = float(os.getenv("SESSION_IDLE_TTL", "1800"))  # seconds
+        self.max_bytes = int(float(os.getenv("SESSION_MAX_MEMORY_MB", "64")) * 1024 * 1024)
+
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def start(self):
+        """Attach the persistent backend chosen by SESSION_BACKEND (blocking: opens the database)"""
+        if self.backend is None:
+            self.backend = _build_backend()
+
+    def stop(self):
+        """Flush and close the persistent backend (blocking)"""
+        if self.backend is not None:
+            self.backend.close()
+
+    def get(self, session_id: str) -> Session:
+        """Return the session, creating it if needed, and mark it most recently used"""
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = Session(session_id, self.max_turns)
+            self._sessions[session_id] = session
+            self._evict_to_limits()
+        else:
+            self._sessions.move_to_end(session_id)
+        session.last_access = now
+        return session
+
+    def peek(self, session_id: str) -> Optional[Session]:
+        """Return the cached session without creating it or changing its LRU position"""
+        return self._sessions.get(session_id)
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        """Per-session lock serializing concurrent requests in one conversation"""
+        return self.get(session_id).lock
+
+    async def refresh(self, session_id: str):
+        """Bring the cached session up to date with the backend (call while holding its lock)"""
+        if self.backend is None:
+            return
+        session = self.get(session_id)
+        if self.backend.has_pending(session_id):
+            if session.appended:
+                # This process wrote last and has not flushed yet, so the cache is newest
+                return
+            # Evicted while its writes were still queued; let them land before reloading
+            for _ in range(50):
+                await asyncio.sleep(0.02)
+                if not self.backend.has_pending(session_id):
+                    break
+        stored_version = await asyncio.to_thread(self.backend.version, session_id)
+        known_version = session.version
+        if session.appended:
+            # This copy holds the turns this process wrote; a copy recreated after
+            # eviction does not, however recently this process wrote them
+            known_version = max(known_version, self.backend.last_written(session_id))
+        if stored_version == known_version:
+            session.version = stored_version
+            return
+        
+        turns, version, turn_count = await asyncio.to_thread(self.backend.load, session_id, self.max_turns)
+        self._account(session, -session.size_bytes)
+        session.turns.clear()
+        for role, content in turns:
+            session.turns.append((role, content))
+            self._account(session, len(content) + _TURN_OVERHEAD)
+        session.version = version
+        session.appended = False
+        session.turn_count = turn_count
+        # Summaries are per-process; rebuild from the reloaded turns
+        session.summary = ""
+        session.summary_upto = 0
+        self._evict_to_limits()
+
+    def recent_turns(self, session_id: str, count: int) -> List[Dict[str, str]]:
+        """Return up to `count` most recent turns as role/content dicts"""
+        session = self._sessions.get(session_id)
+        if session is None or count <= 0:
+            return []
+        turns = list(session.turns)[-count:]
+        return [{"role": role, "content": content} for role, content in turns]
+
+    def append(self, session_id: str, role: str, content: str):
+        """Append a turn, dropping the oldest turn once the session is full"""
+        session = self.get(session_id)
+        if len(session.turns) == session.turns.maxlen:
+            _, dropped = session.turns.popleft()
+            self._account(session, -(len(dropped) + _TURN_OVERHEAD))
+        session.turns.append((role, content))
+        session.turn_count += 1
+        session.appended = True
+        self._account(session, len(content) + _TURN_OVERHEAD)
+        if self.backend is not None:
+            self.backend.append(session_id, role, content, session.turn_count - 1)
+        self._evict_to_limits()
+
+    def set_summary(self, session_id: str, summary: str, upto: int):
+        """Store the rolling summary covering turns [0, upto) if the session is still cached"""
+        session = self._sessions.get(session_id)
+        if session is None or upto <= session.summary_upto:
+            return
+        self._account(session, len(summary) - len(session.summary))
+        session.summary = summary
+        session.summary_upto = upto
+
+    def set_query_vector(self, session_id: str, vector: Optional[List[float]]):
+        """Remember the last retrieval vector compactly (float32) for follow-up blending"""
+        session = self._sessions.get(session_id)
+        if session is None or vector is None:
+            return
+        previous = len(session.query_vector) * 4 if session.query_vector is not None else 0
+        session.query_vector = array("f", vector)
+        self._account(session, len(vector) * 4 - previous)
+
+    def clear(self, session_id: str):
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self.total_bytes -= session.size_bytes
+        if self.backend is not None:
+            self.backend.delete(session_id)
+
+    def _account(self, session: Session, delta: int):
+        session.size_bytes += delta
+        self.total_bytes += delta
+
+    def _evict_idle(self, now: float):
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_access < self.idle_ttl or session.lock.locked():
+                break
+            self._remove_oldest()
+
+    def _evict_to_limits(self):
+        # Skip over busy sessions at most once each so a fully locked store cannot spin
+        budget = len(self._sessions)
+        while budget > 0 and (len(self._sessions) > self.max_sessions or self.total_bytes > self.max_bytes):
+            budget -= 1
+            session_id, session = next(iter(self._sessions.items()))
+            if session.lock.locked():
+                self._sessions.move_to_end(session_id)
+                continue
+            self._remove_oldest()
+
+    def _remove_oldest(self):
+        _, session = self._sessions.popitem(last=False)
+        self.total_bytes -= session.size_bytes
+        self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "backend": type(self.backend).__name__ if self.backend else "memory",
+            "sessions": len(self._sessions),
+            "memory_bytes": self.total_bytes,
+            "evictions": self.evictions,
+        }
+
+
+def _build_backend() -> Optional[SessionBackend]:
+    """Select the session backend from SESSION_BACKEND ("memory" or "sqlite")"""
+    backend = os.getenv("SESSION_BACKEND", "memory").lower()
+    if backend == "sqlite":
+        return SQLiteSessionBackend(
+            path=backend_path(os.getenv("SESSION_DB_PATH", "data/sessions.db")),
+            flush_interval=float(os.getenv("SESSION_FLUSH_INTERVAL_MS", "20")) / 1000,
+            batch_size=int(os.getenv("SESSION_FLUSH_BATCH", "256")),
+            retention=float(os.getenv("SESSION_RETENTION_DAYS", "7")) * 24 * 3600
+        )
+    return None
+
+
+# Global instance; the backend is attached by start() during app startup, not at import
+session_store = SessionStore()
@@ -1,27 +1,89 @@
 import os
 import uuid
+import asyncio
+import threading
+import time
 from typing import List, Dict, Any, Optional, Tuple
-from pinecone import Pinecone, ServerlessSpec
 from dotenv import load_dotenv
+from app.core.resilience import pinecone_index
+from app.core.executors import vector_executor
+from app.core.tracing import tracer
+from app.core.log import get_logger
+from app.services.local_vector_index import LocalVectorIndex
+from app.services.retrieval_cache import RetrievalCache
+from app.services.corpus_version import corpus_version_store
 
 load_dotenv()
 
+logger = get_logger("vector")
+
 class VectorService:
     def __init__(self):
         self.api_key = os.getenv("PINECONE_API_KEY")
         self.environment = os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
         self.index_name = os.getenv("PINECONE_INDEX_NAME", "privategpt-embeddings")
+        # Data-plane host; also how a local stand-in is selected (python -m emulators.pinecone_server)
         self.host = os.getenv("PINECONE_HOST")
+        # "pinecone" (default) or "local" (in-process index, no network)
+        self.backend = os.getenv("VECTOR_BACKEND", "pinecone").lower()
+        
+        self.local_index = LocalVectorIndex(dimension=1024) if self.backend == "local" else None
+        self.test_mode = not self.api_key and not self.host and self.local_index is None
         
-        self.test_mode = not self.api_key
+        # Shared with other workers; bumped on every write so caches and in-flight
+        # queries never mix corpora
+        self.versions = corpus_version_store
         
-        if not self.test_mode:
-            self.pc = Pinecone(api_key=self.api_key)
-            self.index = None
-            self._connect_to_index()
-        else:
-            self.pc = None
-            self.index = None
+        # Repeated questions skip the search round trip (and Pinecone read units)
+        self.retrieval_cache = None
+        if os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true" and not self.test_mode:
+            self.retrieval_cache = RetrievalCache()
+        
+        # Pinecone is connected by connect() during startup warm-up (or on first use),
+        # never at import time
+        self.pc = None
+        self.index = None
+        self._connect_lock = threading.Lock()
+    
+    @property
+    def corpus_version(self) -> int:
+        return self.versions.current
+    
+    @property
+    def uses_pinecone(self) -> bool:
+        return not self.test_mode and self.local_index is None
+    
+    def connect(self):
+        """Create the Pinecone client and open the index (blocking; raises if unavailable)"""
+        if not self.uses_pinecone or self.index is not None:
+            return
+        with self._connect_lock:
+            if self.index is not None:
+                return
+            from pinecone import Pinecone
+            if self.pc is None:
+                self.pc = Pinecone(api_key=self.api_key or "pclocal")
+            if self.host:
+                # Skip the control-plane lookup when the index host is known; one
+                # stats call proves the data plane is reachable
+                index = self.pc.Index(host=self.host)
+                index.describe_index_stats()
+                self.index = index
+                logger.info("Connected to Pinecone index at %s", self.host)
+            else:
+                self._connect_to_index()
+        if self.index is None:
+            raise RuntimeError(f"Pinecone index {self.index_name} is not available")
+    
+    async def _ensure_connected(self):
+        """Connect off the event loop if startup warm-up has not done so yet (raises if unavailable)"""
+        if self.uses_pinecone and self.index is None:
+            try:
+                await vector_executor.run(self.connect)
+            except Exception as e:
+                # Never fall back to canned matches or fake IDs for a misconfigured or down index
+                logger.error("Pinecone connection failed: %s", e)
+                raise
     
     def _connect_to_index(self):
         """Connect to existing Pinecone index"""
@@ -31,17 +93,18 @@ class VectorService:
             
             if self.index_name in existing_indexes:
                 self.index = self.pc.Index(self.index_name)
-                print(f"Connected to existing Pinecone index: {self.index_name}")
+                logger.info("Connected to existing Pinecone index: %s", self.index_name)
             else:
-                print(f"Index {self.index_name} not found. Available indexes: {existing_indexes}")
+                logger.warning("Index %s not found. Available indexes: %s", self.index_name, existing_indexes)
                 # Create index if it doesn't exist
                 self._create_index()
                 
         except Exception as e:
-            print(f"Error connecting to Pinecone: {e}")
+            logger.error("Error connecting to Pinecone: %s", e)
     
     def _create_index(self):
         """Create a new Pinecone index"""
+        from pinecone import ServerlessSpec
         try:
             self.pc.create_index(
                 name=self.index_name,
@@ -53,15 +116,21 @@ class VectorService:
                 )
             )
             self.index = self.pc.Index(self.index_name)
-            print(f"Created new Pinecone index: {self.index_name}")
+            logger.info("Created new Pinecone index: %s", self.index_name)
         except Exception as e:
-            print(f"Error creating Pinecone index: {e}")
+            logger.error("Error creating Pinecone index: %s", e)
     
     async def store_documents(self, texts: List[str], embeddings: List[List[float]], 
                             metadata: List[Dict[str, Any]] = None) -> List[str]:
-        """Store document embeddings in Pinecone"""
-        if self.test_mode or not self.index:
+        """Store document embeddings in Pinecone or the local index"""
+        with tracer.span("vector.upsert", backend=self.backend, vectors=len(texts)):
+            return await self._store_documents(texts, embeddings, metadata)
+    
+    async def _store_documents(self, texts: List[str], embeddings: List[List[float]],
+                               metadata: List[Dict[str, Any]] = None) -> List[str]:
+        if self.test_mode:
             return [f"test-id-{i}" for i in range(len(texts))]
+        await self._ensure_connected()
         
         try:
             # Generate IDs for the documents
@@ -82,33 +151,105 @@ class VectorService:
                 }
                 vectors.append(vector_data)
             
-            # Upsert vectors to Pinecone
-            self.index.upsert(vectors=vectors)
-            print(f"Successfully stored {len(vectors)} documents in Pinecone")
+            if self.local_index is not None:
+                await vector_executor.run(self.local_index.upsert, vectors)
+                logger.info("Stored %d documents in local index", len(vectors))
+            else:
+                # Upsert vectors to Pinecone (IDs are fixed above, so retries are idempotent)
+                await pinecone_index.call(lambda: vector_executor.run(self.index.upsert, vectors=vectors))
+                logger.info("Stored %d documents in Pinecone", len(vectors))
+            await self._bump_version(f"upsert {len(vectors)} vectors")
             return doc_ids
             
         except Exception as e:
-            print(f"Error storing documents in Pinecone: {e}")
-            return []
+            logger.error("Error storing documents: %s", e)
+            raise
+    
+    async def delete_documents(self, ids: Optional[List[str]] = None, delete_all: bool = False):
+        """Delete vectors by ID, or every vector in the index"""
+        with tracer.span("vector.delete", backend=self.backend, delete_all=delete_all):
+            if self.test_mode or (not delete_all and not ids):
+                return
+            await self._ensure_connected()
+            
+            reason = "delete all vectors" if delete_all else f"delete {len(ids)} vectors"
+            if self.local_index is not None:
+                await vector_executor.run(self.local_index.delete, ids, delete_all)
+            elif delete_all:
+                await pinecone_index.call(lambda: vector_executor.run(self.index.delete, delete_all=True))
+            else:
+                await pinecone_index.call(lambda: vector_executor.run(self.index.delete, ids=ids))
+            logger.info("Vector store write: %s", reason)
+            await self._bump_version(reason)
+    
+    async def _bump_version(self, reason: str, attempts: int = 3):
+        """
+        Move the corpus version after a successful write, retrying briefly.
+        
+        The write has already happened, so a failure here is logged rather than
+        raised: the caller must see the write's own outcome. The shared store may
+        wait on another worker's write lock, so it runs off the event loop.
+        """
+        for attempt in range(1, attempts + 1):
+            try:
+                await vector_executor.run(self.versions.bump, reason)
+                return
+            except Exception as e:
+                if attempt == attempts:
+                    logger.error("Corpus version bump failed after %s (%s); caches may serve "
+                                 "pre-write results until their TTL: %s", reason, attempt, e)
+                    return
+                logger.warning("Corpus version bump failed (attempt %d): %s", attempt, e)
+                await asyncio.sleep(0.1 * attempt)
+    
+    def _mock_results(self) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Canned results for test mode"""
+        return [
+            ("test-doc-1", 0.9, {"text": "This is a test document for RAG functionality."}),
+            ("test-doc-2", 0.8, {"text": "Another test document with relevant information."})
+        ]
     
     async def search_similar(self, query_embedding: List[float], 
-                           top_k: int = 5) -> List[Tuple[str, float, Dict[str, Any]]]:
-        """Search for similar documents in Pinecone"""
-        if self.test_mode or not self.index:
-            # Return mock results for testing
-            return [
-                ("test-doc-1", 0.9, {"text": "This is a test document for RAG functionality."}),
-                ("test-doc-2", 0.8, {"text": "Another test document with relevant information."})
-            ]
+                           top_k: int = 5,
+                           filter: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Search for similar documents in Pinecone or the local index, optionally filtered by metadata"""
+        with tracer.span("vector.search", backend=self.backend, top_k=top_k) as span:
+            cache = self.retrieval_cache
+            if cache is None:
+                results = await self._search_similar(query_embedding, top_k, filter)
+            else:
+                corpus_version = self.corpus_version
+                key = cache.key(query_embedding, top_k, filter, corpus_version)
+                results = cache.get(key, corpus_version)
+                if span:
+                    span.set_attribute("cached", results is not None)
+                if results is None:
+                    started = time.perf_counter()
+                    results = await self._search_similar(query_embedding, top_k, filter)
+                    cache.put(key, corpus_version, results, time.perf_counter() - started)
+            if span:
+                span.set_attribute("matches", len(results))
+            return results
+    
+    async def _search_similar(self, query_embedding: List[float], top_k: int,
+                              filter: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+        if self.local_index is not None:
+            return await vector_executor.run(self.local_index.query, query_embedding, top_k, filter)
+        
+        if self.test_mode:
+            return self._mock_results()
+        await self._ensure_connected()
         
         try:
             # Query Pinecone
-            response = self.index.query(
+            response = await pinecone_index.call(lambda: vector_executor.run(
+                self.index.query,
                 vector=query_embedding,
                 top_k=top_k,
+                filter=filter,
                 include_metadata=True,
                 include_values=False
-            )
+            ))
             
             # Extract results
             results = []
@@ -118,27 +259,78 @@ class VectorService:
                 metadata = match.metadata
                 results.append((doc_id, score, metadata))
             
-            print(f"Found {len(results)} similar documents")
+            logger.debug("Found %d similar documents", len(results))
             return results
             
         except Exception as e:
-            print(f"Error searching Pinecone: {e}")
-            return []
+            # Surface the failure: an empty result would read as "not in the knowledge base"
+            logger.error("Error searching Pinecone: %s", e)
+            raise
+    
+    async def search_similar_batch(self, query_embeddings: List[List[float]], top_k: int = 5,
+                                   filter: Optional[Dict[str, Any]] = None,
+                                   return_exceptions: bool = False) -> List[List[Tuple[str, float, Dict[str, Any]]]]:
+        """
+        Search for several query vectors at once, returning one result list per query.
+        
+        With `return_exceptions`, a query whose search fails yields its exception in
+        place of a result list instead of failing the whole batch.
+        """
+        with tracer.span("vector.search_batch", backend=self.backend, queries=len(query_embeddings)):
+            cache = self.retrieval_cache
+            if cache is None:
+                return await self._search_similar_batch(query_embeddings, top_k, filter, return_exceptions)
+            
+            corpus_version = self.corpus_version
+            keys = [cache.key(embedding, top_k, filter, corpus_version) for embedding in query_embeddings]
+            results = [cache.get(key, corpus_version) for key in keys]
+            misses = [i for i, cached in enumerate(results) if cached is None]
+            if misses:
+                started = time.perf_counter()
+                searched = await self._search_similar_batch([query_embeddings[i] for i in misses], top_k, filter,
+                                                            return_exceptions)
+                # Each miss is credited with the whole batch round's duration
+                duration = time.perf_counter() - started
+                for i, found in zip(misses, searched):
+                    results[i] = found
+                    if not isinstance(found, BaseException):
+                        cache.put(keys[i], corpus_version, found, duration)
+            return results
+    
+    async def _search_similar_batch(self, query_embeddings: List[List[float]], top_k: int,
+                                    filter: Optional[Dict[str, Any]] = None,
+                                    return_exceptions: bool = False) -> List[List[Tuple[str, float, Dict[str, Any]]]]:
+        if self.local_index is not None:
+            # One matrix-matrix product for the whole batch
+            return await vector_executor.run(self.local_index.query_batch, query_embeddings, top_k, filter)
+        
+        if self.test_mode:
+            return [self._mock_results() for _ in query_embeddings]
+        await self._ensure_connected()
+        
+        # The Pinecone data plane has no multi-vector query; issue them concurrently
+        return list(await asyncio.gather(*[
+            self._search_similar(embedding, top_k, filter) for embedding in query_embeddings
+        ], return_exceptions=return_exceptions))
     
     async def get_index_stats(self) -> Dict[str, Any]:
         """Get index statistics"""
-        if self.test_mode or not self.index:
+        if self.local_index is not None:
+            return self.local_index.describe_index_stats()
+        
+        if self.test_mode:
             return {"total_vectors": 0, "status": "test_mode"}
         
         try:
-            stats = self.index.describe_index_stats()
+            await self._ensure_connected()
+            stats = await pinecone_index.call(lambda: vector_executor.run(self.index.describe_index_stats))
             return {
                 "total_vectors": stats.total_vector_count,
                 "dimension": stats.dimension,
                 "index_fullness": stats.index_fullness
             }
         except Exception as e:
-            print(f"Error getting index stats: {e}")
+            logger.error("Error getting index stats: %s", e)
             return {"error": str(e)}
 
 # Global instance
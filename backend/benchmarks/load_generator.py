@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Open-loop load generator for the chat API.
+
+Requests are issued on a fixed schedule (constant or Poisson arrivals at the
+target rate) regardless of how quickly earlier requests complete, so a slow
+server builds a queue instead of quietly throttling the client. Latency is
+measured from each request's *intended* start time, which corrects for
+coordinated omission: time spent waiting behind a stalled client or a full
+in-flight limit counts against the server. The service time measured from the
+actual send is reported alongside for comparison.
+
+    # Against a running server, stepping through three rates
+    python benchmarks/load_generator.py --base-url http://localhost:8000 --rate 5,10,20 --duration 30
+
+    # Against the in-process ASGI app (no server needed)
+    python benchmarks/load_generator.py --asgi app.main:app --rate 50 --duration 10
+
+    # Compare with a previous run
+    python benchmarks/load_generator.py --base-url http://localhost:8000 --rate 10 --compare previous.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import importlib
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+
+DEFAULT_QUERIES = [
+    "What are the billing rates for partners?",
+    "How do I request PTO?",
+    "What's the remote work policy?",
+    "Tell me about criminal case procedures",
+    "What are associate billing rates?",
+    "Who approves time off requests?",
+    "Explain the jurisdiction for federal cases",
+    "What's the policy on working from home?",
+    "How are legal fees structured?",
+    "What are the firm's HR policies?",
+]
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9, 100.0)
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram: log-spaced buckets with bounded relative error.
+
+    Values (in microseconds) are recorded into buckets whose width is `precision`
+    of their magnitude, so percentiles are accurate to about 0.1% across the full
+    range from microseconds to minutes with a few thousand buckets at most.
+    Buckets serialize to JSON and merge exactly across runs.
+    """
+
+    def __init__(self, precision: float = 0.001):
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.counts: Counter = Counter()
+        self.total = 0
+        self.min = math.inf
+        self.max = 0.0
+        self.sum = 0.0
+
+    def record(self, value_us: float):
+        value_us = max(value_us, 1.0)
+        self.counts[int(math.log(value_us) / self._log_base)] += 1
+        self.total += 1
+        self.sum += value_us
+        self.min = min(self.min, value_us)
+        self.max = max(self.max, value_us)
+
+    def _bucket_value(self, index: int) -> float:
+        # Upper edge of the bucket, so percentiles never under-report
+        return math.exp((index + 1) * self._log_base)
+
+    def percentile(self, p: float) -> float:
+        if not self.total:
+            return math.nan
+        if p >= 100.0:
+            return self.max
+        rank = max(1, math.ceil(p / 100.0 * self.total))
+        cumulative = 0
+        for index in sorted(self.counts):
+            cumulative += self.counts[index]
+            if cumulative >= rank:
+                return min(self._bucket_value(index), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Percentiles in milliseconds"""
+        if not self.total:
+            return {"count": 0}
+        result = {"count": self.total, "mean_ms": self.sum / self.total / 1000, "min_ms": self.min / 1000}
+        for p in PERCENTILES:
+            key = "max_ms" if p == 100.0 else f"p{p:g}_ms"
+            result[key] = self.percentile(p) / 1000
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "precision": self.precision,
+            "summary": self.summary(),
+            "buckets": {str(index): count for index, count in sorted(self.counts.items())},
+        }
+
+
+class OpenLoopRun:
+    """One fixed-rate step: schedules arrivals, records latencies and outcomes"""
+
+    def __init__(self, client: httpx.AsyncClient, path: str, queries: List[str], rate: float,
+                 duration: float, warmup: float, arrival: str, max_inflight: int, timeout: float,
+                 sessions: int, seed: int):
+        self.client = client
+        self.path = path
+        self.queries = queries
+        self.rate = rate
+        self.duration = duration
+        self.warmup = warmup
+        self.arrival = arrival
+        self.timeout = timeout
+        self.sessions = sessions
+        self.rng = random.Random(seed)
+        self.slots = asyncio.Semaphore(max_inflight)
+
+        self.response_time = LatencyHistogram()  # From intended start (corrected)
+        self.service_time = LatencyHistogram()   # From actual send (uncorrected)
+        self.ttfb = LatencyHistogram()           # First response byte, from intended start
+        self.outcomes: Counter = Counter()
+        self.scheduled = 0
+        self.max_send_delay = 0.0
+        self.max_inflight_seen = 0
+        self._inflight = 0
+
+    def _arrival_times(self):
+        t = 0.0
+        end = self.warmup + self.duration
+        while t < end:
+            yield t
+            t += self.rng.expovariate(self.rate) if self.arrival == "poisson" else 1.0 / self.rate
+
+    async def _request(self, index: int, intended: float, measured: bool):
+        async with self.slots:
+            sent = time.perf_counter()
+            self.max_send_delay = max(self.max_send_delay, sent - intended)
+            self._inflight += 1
+            self.max_inflight_seen = max(self.max_inflight_seen, self._inflight)
+            payload: Dict[str, Any] = {"message": self.queries[index % len(self.queries)]}
+            if self.sessions:
+                payload["session_id"] = f"load-{index % self.sessions}"
+            first_byte = None
+            try:
+                async with self.client.stream("POST", self.path, json=payload, timeout=self.timeout) as response:
+                    async for chunk in response.aiter_bytes():
+                        if first_byte is None and chunk:
+                            first_byte = time.perf_counter()
+                    outcome = str(response.status_code)
+            except httpx.TimeoutException:
+                outcome = "timeout"
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            finally:
+                self._inflight -= 1
+            done = time.perf_counter()
+
+        if not measured:
+            return
+        self.outcomes[outcome] += 1
+        self.response_time.record((done - intended) * 1e6)
+        self.service_time.record((done - sent) * 1e6)
+        if first_byte is not None:
+            self.ttfb.record((first_byte - intended) * 1e6)
+
+    async def run(self) -> Dict[str, Any]:
+        tasks = []
+        started = time.perf_counter()
+        for index, offset in enumerate(self._arrival_times()):
+            intended = started + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self._request(index, intended, measured=offset >= self.warmup)))
+            self.scheduled += 1
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        completed = sum(self.outcomes.values())
+        succeeded = sum(count for outcome, count in self.outcomes.items() if outcome.startswith("2"))
+        return {
+            "target_rate": self.rate,
+            "arrival": self.arrival,
+            "duration_s": self.duration,
+            "warmup_s": self.warmup,
+            "scheduled": self.scheduled,
+            "completed": completed,
+            "success_rate": succeeded / completed if completed else 0.0,
+            "achieved_rate": completed / max(elapsed - self.warmup, 1e-9),
+            "outcomes": dict(self.outcomes),
+            "max_inflight": self.max_inflight_seen,
+            "max_send_delay_ms": self.max_send_delay * 1000,
+            "response_time": self.response_time.to_dict(),
+            "service_time": self.service_time.to_dict(),
+            "time_to_first_byte": self.ttfb.to_dict(),
+        }
+
+
+def load_asgi_app(spec: str):
+    module_name, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attribute or "app")
+
+
+def build_client(args) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    if args.asgi:
+        transport = httpx.ASGITransport(app=load_asgi_app(args.asgi))
+        return httpx.AsyncClient(transport=transport, base_url="http://loadgen", limits=limits)
+    return httpx.AsyncClient(base_url=args.base_url, verify=not args.insecure, limits=limits)
+
+
+def print_step(step: Dict[str, Any]):
+    rt = step["response_time"]["summary"]
+    st = step["service_time"]["summary"]
+    print(f"\nrate {step['target_rate']:g}/s ({step['arrival']}): {step['completed']} requests, "
+          f"achieved {step['achieved_rate']:.1f}/s, success {step['success_rate']:.1%}, "
+          f"max in-flight {step['max_inflight']}, outcomes {step['outcomes']}")
+    if not rt.get("count"):
+        return
+    print(f"  {'':<22}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}  (ms)")
+    for label, summary in (("response (corrected)", rt), ("service (uncorrected)", st),
+                           ("first byte", step["time_to_first_byte"]["summary"])):
+        if summary.get("count"):
+            print(f"  {label:<22}" + "".join(f"{summary[k]:>10.1f}" for k in
+                                               ("p50_ms", "p90_ms", "p99_ms", "p99.9_ms", "max_ms")))
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Compare corrected response-time percentiles step by step (matched on target rate)"""
+    regressions = []
+    previous = {step["target_rate"]: step for step in baseline.get("steps", [])}
+    print(f"\n{'rate':>8} {'percentile':>10} {'baseline':>10} {'current':>10} {'change':>9}")
+    for step in current["steps"]:
+        base = previous.get(step["target_rate"])
+        if base is None:
+            continue
+        for key in ("p50_ms", "p99_ms", "p99.9_ms"):
+            old = base["response_time"]["summary"].get(key)
+            new = step["response_time"]["summary"].get(key)
+            if not old or new is None:
+                continue
+            change = new / old - 1.0
+            flag = ""
+            if change > threshold:
+                regressions.append(f"{step['target_rate']:g}/s {key}")
+                flag = "  REGRESSION"
+            print(f"{step['target_rate']:>8g} {key:>10} {old:>10.1f} {new:>10.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+async def run(args) -> Dict[str, Any]:
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    steps = []
+    async with build_client(args) as client:
+        for rate in args.rates:
+            load_run = OpenLoopRun(client, args.path, queries, rate, args.duration, args.warmup, args.arrival,
+                                   args.max_inflight, args.timeout, args.sessions, args.seed)
+            step = await load_run.run()
+            print_step(step)
+            steps.append(step)
+
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "target": args.asgi and f"asgi:{args.asgi}" or args.base_url,
+        "path": args.path,
+        "steps": steps,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url", help="server base URL, e.g. http://localhost:8000")
+    target.add_argument("--asgi", help="in-process ASGI app as module:attribute, e.g. app.main:app")
+    parser.add_argument("--path", default="/api/chat/", help="endpoint to POST to (default /api/chat/)")
+    parser.add_argument("--rate", default="5", help="target arrivals per second; comma-separate to step through rates")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds per rate step")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before each step")
+    parser.add_argument("--arrival", choices=("constant", "poisson"), default="poisson")
+    parser.add_argument("--max-inflight", type=int, default=512, help="client-side concurrency limit")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--sessions", type=int, default=0, help="spread requests over this many chat sessions")
+    parser.add_argument("--queries", help="file with one query per line (default: built-in HR/legal queries)")
+    parser.add_argument("--insecure", action="store_true", help="skip TLS verification")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results", "load.json"))
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="percentile slowdown that counts as a regression (default 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+    args.rates = [float(rate) for rate in args.rate.split(",")]
+
+    current = asyncio.run(run(args))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"\nNo regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Replay captured chat traffic (QUERY_LOG_ENABLED=true) against the API.
+
+Requests are sent open-loop at their recorded arrival offsets, divided by
+--speed, so the replay has the same shape as production: bursts, idle gaps,
+repeated questions and multi-turn sessions. Each recorded session is mapped to
+its own replay session and its turns are sent in order. Ordering is
+deterministic (records sorted by timestamp), so two replays of the same log
+differ only in how the server behaved. Latency is measured from the intended
+send time, as in load_generator.py, and reported next to the recorded latency.
+
+    # Original timing against a running server
+    python benchmarks/replay.py data/query_log.jsonl --base-url http://localhost:8000
+
+    # Ten times faster, idle gaps capped at 2s, in-process app
+    python benchmarks/replay.py "data/query_log*.jsonl*" --asgi app.main:app --speed 10 --max-gap 2
+
+    # Compare with an earlier replay of the same log
+    python benchmarks/replay.py data/query_log.jsonl --base-url http://localhost:8000 --compare before.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from load_generator import BENCH_DIR, LatencyHistogram, build_client
+
+
+def load_records(patterns: List[str]) -> List[Dict[str, Any]]:
+    """Records from every matching log file (rotated files included), oldest first"""
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+    records.sort(key=lambda record: (record["ts"], record.get("session_id") or "", record.get("turn", 0)))
+    return records
+
+
+def schedule(records: List[Dict[str, Any]], speed: float, max_gap: Optional[float]) -> List[float]:
+    """Send offsets in seconds from the start of the replay"""
+    offsets = []
+    offset = 0.0
+    for previous, record in zip([None] + records[:-1], records):
+        if previous is not None:
+            gap = max(0.0, record["ts"] - previous["ts"])
+            if max_gap is not None:
+                gap = min(gap, max_gap)
+            offset += gap / speed
+        offsets.append(offset)
+    return offsets
+
+
+class Replay:
+    """Sends recorded requests at their scheduled offsets and records latency and outcomes"""
+
+    def __init__(self, client: httpx.AsyncClient, path: str, records: List[Dict[str, Any]],
+                 offsets: List[float], timeout: float, run_id: str):
+        self.client = client
+        self.path = path
+        self.records = records
+        self.offsets = offsets
+        self.timeout = timeout
+        self.run_id = run_id
+
+        self.response_time = LatencyHistogram()  # From intended send (corrected)
+        self.service_time = LatencyHistogram()   # From actual send
+        self.recorded_time = LatencyHistogram()  # total_ms in the log, for reference
+        self.outcomes: Counter = Counter()
+        self.max_send_delay = 0.0
+        # Turns of one session go out in order, each after the previous has finished
+        self._session_turns: Dict[str, asyncio.Lock] = {}
+
+    def _session(self, record: Dict[str, Any]) -> Optional[str]:
+        session_id = record.get("session_id")
+        return f"replay-{self.run_id}-{session_id}" if session_id else None
+
+    async def _request(self, record: Dict[str, Any], intended: float):
+        session_id = self._session(record)
+        lock = self._session_turns.setdefault(session_id, asyncio.Lock()) if session_id else None
+        payload: Dict[str, Any] = {"message": record["question"]}
+        if session_id:
+            payload["session_id"] = session_id
+        if lock is not None:
+            await lock.acquire()
+        try:
+            sent = time.perf_counter()
+            self.max_send_delay = max(self.max_send_delay, sent - intended)
+            try:
+                response = await self.client.post(self.path, json=payload, timeout=self.timeout)
+                outcome = str(response.status_code)
+            except httpx.TimeoutException:
+                outcome = "timeout"
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            done = time.perf_counter()
+        finally:
+            if lock is not None:
+                lock.release()
+
+        self.outcomes[outcome] += 1
+        self.response_time.record((done - intended) * 1e6)
+        self.service_time.record((done - sent) * 1e6)
+        if record.get("total_ms") is not None:
+            self.recorded_time.record(record["total_ms"] * 1000)
+
+    async def run(self) -> Dict[str, Any]:
+        tasks = []
+        started = time.perf_counter()
+        for record, offset in zip(self.records, self.offsets):
+            intended = started + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self._request(record, intended)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        completed = sum(self.outcomes.values())
+        succeeded = sum(count for outcome, count in self.outcomes.items() if outcome.startswith("2"))
+        return {
+            "requests": completed,
+            "sessions": len({record.get("session_id") for record in self.records}),
+            "elapsed_s": elapsed,
+            "scheduled_span_s": self.offsets[-1] if self.offsets else 0.0,
+            "success_rate": succeeded / completed if completed else 0.0,
+            "outcomes": dict(self.outcomes),
+            "max_send_delay_ms": self.max_send_delay * 1000,
+            "response_time": self.response_time.to_dict(),
+            "service_time": self.service_time.to_dict(),
+            "recorded_time": self.recorded_time.to_dict(),
+        }
+
+
+def describe_log(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """What the captured traffic looked like: cache outcomes and repeat rate"""
+    answer_cache = Counter((record.get("cache") or {}).get("answer") or "none" for record in records)
+    retrieval_cache = Counter((record.get("cache") or {}).get("retrieval") or "none" for record in records)
+    questions = Counter(" ".join(record["question"].lower().split()) for record in records)
+    return {
+        "records": len(records),
+        "distinct_questions": len(questions),
+        "answer_cache": dict(answer_cache),
+        "retrieval_cache": dict(retrieval_cache),
+        "top_questions": questions.most_common(10),
+    }
+
+
+def print_result(result: Dict[str, Any]):
+    print(f"\n{result['requests']} requests over {result['elapsed_s']:.1f}s "
+          f"(scheduled {result['scheduled_span_s']:.1f}s), success {result['success_rate']:.1%}, "
+          f"outcomes {result['outcomes']}, max send delay {result['max_send_delay_ms']:.1f} ms")
+    print(f"  {'':<22}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}  (ms)")
+    for label, key in (("replay (corrected)", "response_time"), ("replay (service)", "service_time"),
+                       ("recorded", "recorded_time")):
+        summary = result[key]["summary"]
+        if summary.get("count"):
+            print(f"  {label:<22}" + "".join(f"{summary[k]:>10.1f}" for k in
+                                               ("p50_ms", "p90_ms", "p99_ms", "p99.9_ms", "max_ms")))
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Compare corrected replay percentiles with an earlier replay"""
+    regressions = []
+    print(f"\n{'percentile':>10} {'baseline':>10} {'current':>10} {'change':>9}")
+    for key in ("p50_ms", "p90_ms", "p99_ms", "p99.9_ms"):
+        old = baseline["result"]["response_time"]["summary"].get(key)
+        new = current["result"]["response_time"]["summary"].get(key)
+        if not old or new is None:
+            continue
+        change = new / old - 1.0
+        flag = ""
+        if change > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:>10} {old:>10.1f} {new:>10.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+async def run(args, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    offsets = schedule(records, args.speed, args.max_gap)
+    run_id = args.run_id or datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+    async with build_client(args) as client:
+        result = await Replay(client, args.path, records, offsets, args.timeout, run_id).run()
+    print_result(result)
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "target": args.asgi and f"asgi:{args.asgi}" or args.base_url,
+        "logs": args.logs,
+        "speed": args.speed,
+        "max_gap": args.max_gap,
+        "captured": describe_log(records),
+        "result": result,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="+", help="query log files or glob patterns")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url", help="server base URL, e.g. http://localhost:8000")
+    target.add_argument("--asgi", help="in-process ASGI app as module:attribute, e.g. app.main:app")
+    parser.add_argument("--path", default="/api/chat/", help="endpoint to POST to (default /api/chat/)")
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale: 2 replays twice as fast (default 1)")
+    parser.add_argument("--max-gap", type=float, help="cap idle gaps between recorded requests at this many seconds")
+    parser.add_argument("--limit", type=int, help="replay only the first N records")
+    parser.add_argument("--max-inflight", type=int, default=512, help="connection pool size")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--insecure", action="store_true", help="skip TLS verification")
+    parser.add_argument("--run-id", help="suffix for replay session IDs (default: current time)")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results", "replay.json"))
+    parser.add_argument("--compare", help="previous replay results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="percentile slowdown that counts as a regression (default 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    records = load_records(args.logs)
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print("No records found", file=sys.stderr)
+        return 2
+    print(f"Replaying {len(records)} requests at {args.speed:g}x")
+
+    current = asyncio.run(run(args, records))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"\nNo regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Offline micro-benchmarks for the CPU-side hot paths of the RAG pipeline.
+
+Runs without network access: embeddings use the local hashing engine, the
+vector store is the in-process LocalVectorIndex and AWS/Pinecone credentials are
+cleared. Results are written as JSON and can be compared against a saved
+baseline; any benchmark whose median slows down by more than the threshold is
+reported as a regression and the script exits non-zero.
+
+    python benchmarks/run_benchmarks.py                      # run and write results
+    python benchmarks/run_benchmarks.py --save-baseline      # refresh the baseline
+    python benchmarks/run_benchmarks.py --compare            # run and compare with the baseline
+    python benchmarks/run_benchmarks.py -k chunk --compare   # only benchmarks matching "chunk"
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Force every provider offline before the services are imported
+for var in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "PINECONE_API_KEY"):
+    os.environ.pop(var, None)
+os.environ["EMBEDDING_PROVIDER"] = "local"
+os.environ["VECTOR_BACKEND"] = "local"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+
+from app.services.ai_service import ai_service  # noqa: E402
+from app.services.chunking_service import chunking_service  # noqa: E402
+from app.services.embedding_service import HashingEmbedder  # noqa: E402
+from app.services.local_vector_index import LocalVectorIndex  # noqa: E402
+from app.services.rag_service import rag_service  # noqa: E402
+
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "results", "latest.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+VOCABULARY = (
+    "employee employees policy remote work leave vacation benefits manager approval "
+    "contract agreement termination notice period salary compensation insurance health "
+    "dental retirement eligibility probationary performance review confidential data "
+    "security incident report company shall must may within days written request "
+    "the a of to and in for with on by is are be this that each any all"
+).split()
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    """Register a setup function that returns the zero-argument callable to time"""
+    def register(setup: Callable[[], Callable[[], Any]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def make_document(chars: int, seed: int = 0) -> str:
+    """Deterministic policy-like text with headings, sentences and paragraphs"""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    size = 0
+    section = 0
+    while size < chars:
+        if rng.random() < 0.08:
+            section += 1
+            paragraph = f"\n\n{section}. {' '.join(rng.choices(VOCABULARY, k=3)).upper()}\n"
+        else:
+            sentence = " ".join(rng.choices(VOCABULARY, k=rng.randint(8, 24)))
+            paragraph = sentence[0].upper() + sentence[1:] + rng.choice([". ", ". ", "? ", "! ", ".\n\n"])
+        parts.append(paragraph)
+        size += len(paragraph)
+    return "".join(parts)[:chars]
+
+
+def make_vectors(count: int, dimension: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {"id": f"doc-{i}", "values": [rng.gauss(0.0, 1.0) for _ in range(dimension)],
+         "metadata": {"text": f"chunk {i}"}}
+        for i in range(count)
+    ]
+
+
+# --- Chunking ---------------------------------------------------------------
+
+for _label, _chars in (("1k", 1_000), ("10k", 10_000), ("100k", 100_000), ("500k", 500_000)):
+    @benchmark(f"chunk_text[{_label}]")
+    def _setup_chunk(chars=_chars):
+        text = make_document(chars, seed=chars)
+        return lambda: chunking_service.chunk_text(text, {"source": "bench"})
+
+
+@benchmark("split_into_sentences[100k]")
+def _setup_split():
+    text = make_document(100_000, seed=1)
+    return lambda: chunking_service._split_into_sentences(text)
+
+
+# --- Prompt assembly and post-processing -----------------------------------
+
+for _k in (3, 5):
+    @benchmark(f"build_enhanced_question[k={_k}]")
+    def _setup_prompt(k=_k):
+        contexts = [make_document(1_200, seed=i) for i in range(k)]
+        history = "Summary of earlier conversation: remote work eligibility.\nUser: what about leave?\nAssistant: Employees accrue leave monthly."
+        return lambda: rag_service._build_enhanced_question(contexts, "How many vacation days do new employees get?", history)
+
+
+@benchmark("post_process[titan]")
+def _setup_post_process():
+    answer = make_document(1_500, seed=7)
+    body = {"results": [{"outputText": f"Based on the context provided, here is the answer.\n\n{answer}\n\nUser: next question?\n\nAssistant: ignored"}]}
+    return lambda: ai_service._post_process(body)
+
+
+# --- Embedding and local vector search --------------------------------------
+
+@benchmark("hashing_embed[1 chunk]")
+def _setup_embed():
+    embedder = HashingEmbedder(1024)
+    text = make_document(1_000, seed=3)
+    return lambda: embedder.embed(text)
+
+
+for _count in (1_000, 10_000):
+    @benchmark(f"local_vector_query[n={_count},d=1024]")
+    def _setup_query(count=_count):
+        index = LocalVectorIndex(1024)
+        index.upsert(make_vectors(count, 1024, seed=count))
+        query = make_vectors(1, 1024, seed=-1)[0]["values"]
+        return lambda: index.query(query, top_k=5)
+
+    @benchmark(f"local_vector_query_batch[n={_count},d=1024,q=16]")
+    def _setup_query_batch(count=_count):
+        index = LocalVectorIndex(1024)
+        index.upsert(make_vectors(count, 1024, seed=count))
+        queries = [v["values"] for v in make_vectors(16, 1024, seed=-2)]
+        return lambda: index.query_batch(queries, top_k=5)
+
+
+# --- Harness ----------------------------------------------------------------
+
+def measure(operation: Callable[[], Any], repeats: int, min_time: float) -> Dict[str, Any]:
+    """timeit-style measurement: calibrate loops per repeat, report per-call times in microseconds"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for _ in range(loops):
+                operation()
+            timings.append((time.perf_counter() - started) / loops * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "median_us": statistics.median(timings),
+        "min_us": min(timings),
+        "mean_us": statistics.fmean(timings),
+        "stdev_us": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "loops": loops,
+        "repeats": repeats,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        import numpy
+        numpy_version: Optional[str] = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": numpy_version,
+    }
+
+
+def run(pattern: Optional[str], repeats: int, min_time: float) -> Dict[str, Any]:
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        operation = setup()
+        operation()  # Warm up caches and lazy initialisation
+        results[name] = measure(operation, repeats, min_time)
+        print(f"{name:<48} {results[name]['median_us']:>12.1f} us  (±{results[name]['stdev_us']:.1f}, {results[name]['loops']} loops)")
+    return {"environment": environment(), "results": results}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed benchmarks"""
+    regressions = []
+    print(f"\n{'benchmark':<48} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<48} {'-':>12} {result['median_us']:>12.1f} {'new':>9}")
+            continue
+        change = result["median_us"] / base["median_us"] - 1.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<48} {base['median_us']:>12.1f} {result['median_us']:>12.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose name contains this substring")
+    parser.add_argument("--repeats", type=int, default=7, help="timed repeats per benchmark (default 7)")
+    parser.add_argument("--min-time", type=float, default=0.1, help="minimum seconds per repeat (default 0.1)")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="where to write the JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against or save to")
+    parser.add_argument("--compare", action="store_true", help="compare the run against the baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="median slowdown that counts as a regression (default 0.10 = 10%%)")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    current = run(args.pattern, args.repeats, args.min_time)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            return 2
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"\nNo regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Build the FAQ answer index by running the full RAG pipeline for a question set
+
+Run after ingesting documents (the API also rebuilds it after each ingest when
+FAQ_REBUILD_ON_INGEST=true). Running servers pick up the new index file within
+FAQ_RELOAD_INTERVAL seconds and serve it until the corpus version changes.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.faq_index import load_questions
+from app.services.rag_service import normalize_question, rag_service
+from app.core.executors import shutdown_executors
+
+
+def most_frequent_questions(patterns, top):
+    """The `top` most frequent standalone questions in captured query logs (QUERY_LOG_ENABLED)"""
+    counts = Counter()
+    first_seen = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    # Follow-ups depend on their conversation, so only first turns qualify
+                    if record.get("history_chars"):
+                        continue
+                    normalized = normalize_question(record["question"])
+                    counts[normalized] += 1
+                    first_seen.setdefault(normalized, record["question"])
+    return [first_seen[normalized] for normalized, _ in counts.most_common(top)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", default=rag_service.faq_questions_path,
+                        help="Question file, one per line (default: %(default)s)")
+    parser.add_argument("--from-log", nargs="+", metavar="LOG",
+                        help="Also take the most frequent questions from these query logs or globs")
+    parser.add_argument("--top", type=int, default=50, help="Questions to take from the logs (default: %(default)s)")
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions)
+    if args.from_log:
+        curated = {normalize_question(question) for question in questions}
+        questions += [question for question in most_frequent_questions(args.from_log, args.top)
+                      if normalize_question(question) not in curated]
+    print(f"Answering {len(questions)} questions...")
+    try:
+        result = asyncio.run(rag_service.rebuild_faq_index(questions))
+    finally:
+        shutdown_executors()
+    print(json.dumps(result, indent=2))
+    if rag_service.faq_index is not None:
+        print(f"Index: {rag_service.faq_index.path}")
+
+
+if __name__ == "__main__":
+    main()
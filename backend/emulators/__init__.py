@@ -0,0 +1 @@
+"""Local stand-ins for external services, used for offline performance and chaos testing"""
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Bedrock runtime `InvokeModel` and `InvokeModelWithResponseStream` APIs.
+
+Point the backend at it with BEDROCK_ENDPOINT_URL and every Titan text and
+embedding call is served locally with a configurable latency distribution,
+token-rate streaming and injected throttles and errors:
+
+    python -m emulators.bedrock --port 8001
+    BEDROCK_ENDPOINT_URL=http://127.0.0.1:8001 uvicorn app.main:app
+
+Knobs come from BEDROCK_EMULATOR_* environment variables (see EmulatorConfig)
+and can be changed while running with `POST /emulator/config`; counters are
+served from `GET /emulator/stats`. Runs are reproducible for a given
+BEDROCK_EMULATOR_SEED and request order.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import random
+import re
+import struct
+import sys
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.embedding_service import HashingEmbedder  # noqa: E402
+
+EVENT_STREAM_CONTENT_TYPE = "application/vnd.amazon.eventstream"
+
+FILLER = (
+    "According to the firm's policy documents the request must be submitted in writing to the "
+    "responsible manager who reviews it within five business days and confirms the outcome"
+).split()
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(f"BEDROCK_EMULATOR_{name}", str(default)))
+
+
+class EmulatorConfig:
+    """Latency, throughput and fault-injection settings"""
+
+    def __init__(self):
+        # Time to first token: lognormal around the median
+        self.latency_ms = _env_float("LATENCY_MS", 300)
+        self.latency_sigma = _env_float("LATENCY_SIGMA", 0.4)
+        self.embed_latency_ms = _env_float("EMBED_LATENCY_MS", 25)
+        self.tokens_per_second = _env_float("TOKENS_PER_SECOND", 80)
+        self.output_tokens = int(_env_float("OUTPUT_TOKENS", 120))
+        self.stream_chunk_tokens = int(_env_float("STREAM_CHUNK_TOKENS", 4))
+        # Fault injection: probabilities per request
+        self.throttle_rate = _env_float("THROTTLE_RATE", 0.0)
+        self.error_rate = _env_float("ERROR_RATE", 0.0)
+        self.timeout_rate = _env_float("TIMEOUT_RATE", 0.0)
+        self.stream_error_rate = _env_float("STREAM_ERROR_RATE", 0.0)
+        # Quotas: throttle beyond this many concurrent requests / requests per second (0 = unlimited)
+        self.max_concurrency = int(_env_float("MAX_CONCURRENCY", 0))
+        self.requests_per_second = _env_float("REQUESTS_PER_SECOND", 0)
+        self.embedding_dimension = int(_env_float("EMBEDDING_DIMENSION", 1024))
+        self.seed = int(_env_float("SEED", 42))
+
+    def update(self, values: Dict[str, Any]) -> List[str]:
+        unknown = [key for key in values if not hasattr(self, key)]
+        for key, value in values.items():
+            if key not in unknown:
+                setattr(self, key, type(getattr(self, key))(value))
+        return unknown
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+class BedrockError(Exception):
+    """An error response in Bedrock's REST-JSON shape"""
+
+    def __init__(self, code: str, status: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+        self.message = message
+
+    def response(self) -> JSONResponse:
+        return JSONResponse(
+            status_code=self.status,
+            content={"message": self.message},
+            headers={"x-amzn-ErrorType": f"{self.code}:http://internal.amazon.com/coral/com.amazon.bedrock/"},
+        )
+
+
+def encode_event(headers: Dict[str, str], payload: bytes) -> bytes:
+    """Encode one message in the AWS event-stream binary format (string headers only)"""
+    encoded_headers = b""
+    for name, value in headers.items():
+        name_bytes, value_bytes = name.encode("utf-8"), value.encode("utf-8")
+        encoded_headers += struct.pack("!B", len(name_bytes)) + name_bytes
+        encoded_headers += struct.pack("!BH", 7, len(value_bytes)) + value_bytes
+
+    total_length = 12 + len(encoded_headers) + len(payload) + 4
+    prelude = struct.pack("!II", total_length, len(encoded_headers))
+    prelude += struct.pack("!I", zlib.crc32(prelude))
+    message = prelude + encoded_headers + payload
+    return message + struct.pack("!I", zlib.crc32(message))
+
+
+def chunk_event(chunk: Dict[str, Any]) -> bytes:
+    payload = json.dumps({"bytes": base64.b64encode(json.dumps(chunk).encode("utf-8")).decode("ascii")})
+    return encode_event(
+        {":event-type": "chunk", ":content-type": "application/json", ":message-type": "event"},
+        payload.encode("utf-8"),
+    )
+
+
+def exception_event(exception_type: str, message: str) -> bytes:
+    return encode_event(
+        {":exception-type": exception_type, ":content-type": "application/json", ":message-type": "exception"},
+        json.dumps({"message": message}).encode("utf-8"),
+    )
+
+
+class BedrockEmulator:
+    """Request handling, latency model and counters behind the HTTP routes"""
+
+    def __init__(self, config: Optional[EmulatorConfig] = None):
+        self.config = config or EmulatorConfig()
+        self.rng = random.Random(self.config.seed)
+        self.embedder = HashingEmbedder(self.config.embedding_dimension)
+        self.inflight = 0
+        self.stats: Dict[str, int] = {}
+        self._bucket_tokens = math.inf  # Starts full; capped at the rate on first use
+        self._bucket_updated = time.monotonic()
+
+    def count(self, key: str):
+        self.stats[key] = self.stats.get(key, 0) + 1
+
+    def ttft(self) -> float:
+        median = self.config.latency_ms / 1000
+        return median * math.exp(self.rng.gauss(0.0, self.config.latency_sigma)) if median > 0 else 0.0
+
+    def _rate_limited(self) -> bool:
+        rate = self.config.requests_per_second
+        if rate <= 0:
+            return False
+        now = time.monotonic()
+        self._bucket_tokens = min(rate, self._bucket_tokens + (now - self._bucket_updated) * rate)
+        self._bucket_updated = now
+        if self._bucket_tokens < 1.0:
+            return True
+        self._bucket_tokens -= 1.0
+        return False
+
+    def admit(self):
+        """Apply quotas and injected faults; raises BedrockError to reject the request"""
+        config = self.config
+        if config.max_concurrency and self.inflight >= config.max_concurrency:
+            raise BedrockError("ThrottlingException", 429, "Too many concurrent requests, please wait before trying again.")
+        if self._rate_limited() or self.rng.random() < config.throttle_rate:
+            raise BedrockError("ThrottlingException", 429, "Too many requests, please wait before trying again.")
+        if self.rng.random() < config.error_rate:
+            raise BedrockError("InternalServerException", 500, "The server encountered an internal error.")
+        if self.rng.random() < config.timeout_rate:
+            raise BedrockError("ModelTimeoutException", 408, "The request took too long to process.")
+
+    def generate_tokens(self, prompt: str, max_tokens: int) -> List[str]:
+        """Deterministic answer text: words drawn from the prompt's context, else filler"""
+        context = prompt.split("Context from knowledge base:", 1)[-1].split("Based on the context above", 1)[0]
+        words = re.findall(r"[A-Za-z][A-Za-z'-]*[.,]?", context)[:400] or FILLER
+        rng = random.Random(zlib.crc32(prompt.encode("utf-8")) ^ self.config.seed)
+        count = max(1, min(max_tokens, int(self.config.output_tokens * rng.uniform(0.7, 1.3))))
+        start = rng.randrange(len(words))
+        tokens = [words[(start + i) % len(words)] for i in range(count)]
+        tokens[-1] = tokens[-1].rstrip(".,") + "."
+        return tokens
+
+    @staticmethod
+    def parse_text_request(body: Dict[str, Any]) -> Tuple[str, int]:
+        config = body.get("textGenerationConfig") or {}
+        return body.get("inputText", ""), int(config.get("maxTokenCount", 512))
+
+    async def invoke(self, model_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        if "embed" in model_id:
+            self.count("embed")
+            if self.config.embed_latency_ms > 0:
+                await asyncio.sleep(self.config.embed_latency_ms / 1000 * math.exp(self.rng.gauss(0.0, 0.2)))
+            text = body.get("inputText", "")
+            dimension = int(body.get("dimensions", self.config.embedding_dimension))
+            embedder = self.embedder if dimension == self.embedder.dimension else HashingEmbedder(dimension)
+            return {"embedding": embedder.embed(text), "inputTextTokenCount": len(text.split())}
+
+        self.count("invoke")
+        prompt, max_tokens = self.parse_text_request(body)
+        tokens = self.generate_tokens(prompt, max_tokens)
+        await asyncio.sleep(self.ttft() + len(tokens) / max(self.config.tokens_per_second, 1e-6))
+        return {
+            "inputTextTokenCount": len(prompt.split()),
+            "results": [{
+                "tokenCount": len(tokens),
+                "outputText": " ".join(tokens),
+                "completionReason": "FINISH" if len(tokens) < max_tokens else "LENGTH",
+            }],
+        }
+
+    async def stream(self, body: Dict[str, Any]) -> AsyncIterator[bytes]:
+        self.count("stream")
+        prompt, max_tokens = self.parse_text_request(body)
+        tokens = self.generate_tokens(prompt, max_tokens)
+        chunk_size = max(1, self.config.stream_chunk_tokens)
+        chunk_delay = chunk_size / max(self.config.tokens_per_second, 1e-6)
+        fail_at = len(tokens) // 2 if self.rng.random() < self.config.stream_error_rate else None
+        started = time.monotonic()
+        first_byte = self.ttft()
+        await asyncio.sleep(first_byte)
+
+        for offset in range(0, len(tokens), chunk_size):
+            if fail_at is not None and offset >= fail_at:
+                self.count("stream_errors")
+                yield exception_event("modelStreamErrorException", "The model stream was interrupted.")
+                return
+            if offset:
+                await asyncio.sleep(chunk_delay)
+            last = offset + chunk_size >= len(tokens)
+            chunk: Dict[str, Any] = {
+                "outputText": (" " if offset else "") + " ".join(tokens[offset:offset + chunk_size]),
+                "index": 0,
+                "totalOutputTextTokenCount": min(offset + chunk_size, len(tokens)),
+                "completionReason": ("FINISH" if len(tokens) < max_tokens else "LENGTH") if last else None,
+                "inputTextTokenCount": len(prompt.split()) if offset == 0 else None,
+            }
+            if last:
+                chunk["amazon-bedrock-invocationMetrics"] = {
+                    "inputTokenCount": len(prompt.split()),
+                    "outputTokenCount": len(tokens),
+                    "invocationLatency": int((time.monotonic() - started) * 1000),
+                    "firstByteLatency": int(first_byte * 1000),
+                }
+            yield chunk_event(chunk)
+
+
+def create_app(config: Optional[EmulatorConfig] = None) -> FastAPI:
+    emulator = BedrockEmulator(config)
+    app = FastAPI(title="Bedrock runtime emulator")
+    app.state.emulator = emulator
+
+    async def read_body(request: Request) -> Dict[str, Any]:
+        try:
+            return json.loads(await request.body() or b"{}")
+        except ValueError:
+            raise BedrockError("ValidationException", 400, "Malformed input request, please reformat your input and try again.")
+
+    @app.post("/model/{model_id:path}/invoke")
+    async def invoke_model(model_id: str, request: Request):
+        emulator.count("requests")
+        try:
+            body = await read_body(request)
+            emulator.admit()
+        except BedrockError as e:
+            emulator.count(e.code)
+            return e.response()
+        emulator.inflight += 1
+        try:
+            return JSONResponse(await emulator.invoke(model_id, body))
+        finally:
+            emulator.inflight -= 1
+
+    @app.post("/model/{model_id:path}/invoke-with-response-stream")
+    async def invoke_model_with_response_stream(model_id: str, request: Request):
+        emulator.count("requests")
+        try:
+            body = await read_body(request)
+            emulator.admit()
+        except BedrockError as e:
+            emulator.count(e.code)
+            return e.response()
+
+        async def events() -> AsyncIterator[bytes]:
+            emulator.inflight += 1
+            try:
+                async for event in emulator.stream(body):
+                    yield event
+            finally:
+                emulator.inflight -= 1
+
+        return StreamingResponse(events(), media_type=EVENT_STREAM_CONTENT_TYPE,
+                                 headers={"x-amzn-bedrock-content-type": "application/json"})
+
+    @app.get("/emulator/config")
+    async def get_config():
+        return emulator.config.to_dict()
+
+    @app.post("/emulator/config")
+    async def update_config(request: Request):
+        unknown = emulator.config.update(await request.json())
+        if unknown:
+            return JSONResponse(status_code=400, content={"unknown": unknown})
+        return emulator.config.to_dict()
+
+    @app.get("/emulator/stats")
+    async def get_stats():
+        return {"inflight": emulator.inflight, **emulator.stats}
+
+    @app.post("/emulator/reset")
+    async def reset():
+        emulator.stats.clear()
+        emulator.rng.seed(emulator.config.seed)
+        return {"status": "reset"}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Bedrock runtime emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the subset of the Pinecone data-plane API that VectorService uses.
+
+Serves upsert, query (with metadata filters), fetch, delete and
+describe_index_stats over HTTP, backed by LocalVectorIndex, so the real Pinecone
+SDK code paths run offline. Point the backend at it with PINECONE_HOST:
+
+    python -m emulators.pinecone_server --port 5081
+    PINECONE_HOST=http://127.0.0.1:5081 uvicorn app.main:app
+
+Latency and faults come from PINECONE_EMULATOR_* environment variables (see
+EmulatorConfig) and can be changed while running with `POST /emulator/config`;
+counters are served from `GET /emulator/stats`.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.local_vector_index import LocalVectorIndex  # noqa: E402
+
+MAX_UPSERT_VECTORS = 1000
+MAX_TOP_K = 10000
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(f"PINECONE_EMULATOR_{name}", str(default)))
+
+
+class EmulatorConfig:
+    """Latency and fault-injection settings"""
+
+    def __init__(self):
+        # Per-request latency: lognormal around the median, plus per-vector write cost
+        self.latency_ms = _env_float("LATENCY_MS", 15)
+        self.latency_sigma = _env_float("LATENCY_SIGMA", 0.3)
+        self.upsert_ms_per_vector = _env_float("UPSERT_MS_PER_VECTOR", 0.05)
+        # Fault injection: probabilities per request
+        self.throttle_rate = _env_float("THROTTLE_RATE", 0.0)
+        self.error_rate = _env_float("ERROR_RATE", 0.0)
+        # Throttle beyond this many concurrent requests (0 = unlimited)
+        self.max_concurrency = int(_env_float("MAX_CONCURRENCY", 0))
+        self.dimension = int(_env_float("DIMENSION", 1024))
+        self.seed = int(_env_float("SEED", 42))
+
+    def update(self, values: Dict[str, Any]) -> List[str]:
+        unknown = [key for key in values if not hasattr(self, key)]
+        for key, value in values.items():
+            if key not in unknown:
+                setattr(self, key, type(getattr(self, key))(value))
+        return unknown
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+class PineconeError(Exception):
+    """An error response in Pinecone's JSON shape (gRPC status code plus message)"""
+
+    def __init__(self, status: int, code: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+    def response(self) -> JSONResponse:
+        return JSONResponse(status_code=self.status, content={"code": self.code, "message": self.message, "details": []})
+
+
+class PineconeEmulator:
+    """Namespaced local indexes plus the latency model and counters"""
+
+    def __init__(self, config: Optional[EmulatorConfig] = None):
+        self.config = config or EmulatorConfig()
+        self.rng = random.Random(self.config.seed)
+        self.namespaces: Dict[str, LocalVectorIndex] = {}
+        self.inflight = 0
+        self.stats: Dict[str, int] = {}
+
+    def count(self, key: str):
+        self.stats[key] = self.stats.get(key, 0) + 1
+
+    def namespace(self, name: str) -> LocalVectorIndex:
+        index = self.namespaces.get(name)
+        if index is None:
+            index = self.namespaces[name] = LocalVectorIndex(self.config.dimension)
+        return index
+
+    def admit(self):
+        config = self.config
+        if config.max_concurrency and self.inflight >= config.max_concurrency:
+            raise PineconeError(429, 8, "Request failed. You've reached the max concurrent requests for this index.")
+        if self.rng.random() < config.throttle_rate:
+            raise PineconeError(429, 8, "Request failed. You've exceeded your read or write units limit.")
+        if self.rng.random() < config.error_rate:
+            raise PineconeError(503, 14, "Service Unavailable")
+
+    async def delay(self, vectors: int = 0):
+        median = self.config.latency_ms / 1000
+        seconds = median * math.exp(self.rng.gauss(0.0, self.config.latency_sigma)) if median > 0 else 0.0
+        seconds += vectors * self.config.upsert_ms_per_vector / 1000
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    def describe_index_stats(self) -> Dict[str, Any]:
+        namespaces = {name: {"vectorCount": len(index)} for name, index in self.namespaces.items() if len(index)}
+        return {
+            "namespaces": namespaces,
+            "dimension": self.config.dimension,
+            "indexFullness": 0.0,
+            "totalVectorCount": sum(ns["vectorCount"] for ns in namespaces.values()),
+        }
+
+
+def create_app(config: Optional[EmulatorConfig] = None) -> FastAPI:
+    emulator = PineconeEmulator(config)
+    app = FastAPI(title="Pinecone data-plane emulator")
+    app.state.emulator = emulator
+
+    @app.middleware("http")
+    async def apply_faults(request: Request, call_next):
+        if request.url.path.startswith("/emulator/"):
+            return await call_next(request)
+        emulator.count("requests")
+        try:
+            emulator.admit()
+        except PineconeError as e:
+            emulator.count(f"http_{e.status}")
+            return e.response()
+        emulator.inflight += 1
+        try:
+            return await call_next(request)
+        finally:
+            emulator.inflight -= 1
+
+    @app.exception_handler(PineconeError)
+    async def pinecone_error(request: Request, error: PineconeError):
+        return error.response()
+
+    async def read_body(request: Request) -> Dict[str, Any]:
+        try:
+            return json.loads(await request.body() or b"{}")
+        except ValueError:
+            raise PineconeError(400, 3, "Invalid request body")
+
+    @app.post("/vectors/upsert")
+    async def upsert(request: Request):
+        body = await read_body(request)
+        vectors = body.get("vectors") or []
+        if len(vectors) > MAX_UPSERT_VECTORS:
+            return PineconeError(400, 3, f"Upsert batch exceeds {MAX_UPSERT_VECTORS} vectors").response()
+        emulator.count("upsert")
+        await emulator.delay(len(vectors))
+        try:
+            await asyncio.to_thread(emulator.namespace(body.get("namespace", "")).upsert, vectors)
+        except (KeyError, ValueError) as e:
+            return PineconeError(400, 3, str(e)).response()
+        return {"upsertedCount": len(vectors)}
+
+    @app.post("/query")
+    async def query(request: Request):
+        body = await read_body(request)
+        top_k = int(body.get("topK", 10))
+        if not 1 <= top_k <= MAX_TOP_K:
+            return PineconeError(400, 3, f"topK must be between 1 and {MAX_TOP_K}").response()
+        index = emulator.namespace(body.get("namespace", ""))
+        vector = body.get("vector")
+        if vector is None and body.get("id") is not None:
+            fetched = index.fetch([body["id"]]).get(body["id"])
+            vector = fetched["values"] if fetched else None
+        if vector is None:
+            return PineconeError(400, 3, "Either vector or id must be provided").response()
+        if len(vector) != emulator.config.dimension:
+            return PineconeError(400, 3, f"Vector dimension {len(vector)} does not match the dimension of the index {emulator.config.dimension}").response()
+
+        emulator.count("query")
+        await emulator.delay()
+        try:
+            results = await asyncio.to_thread(index.query, vector, top_k, body.get("filter"))
+        except ValueError as e:
+            return PineconeError(400, 3, str(e)).response()
+
+        include_values = body.get("includeValues", False)
+        values = index.fetch([doc_id for doc_id, _, _ in results]) if include_values else {}
+        matches = []
+        for doc_id, score, metadata in results:
+            match: Dict[str, Any] = {"id": doc_id, "score": score, "values": values[doc_id]["values"] if include_values else []}
+            if body.get("includeMetadata", False):
+                match["metadata"] = metadata
+            matches.append(match)
+        return {"matches": matches, "namespace": body.get("namespace", ""), "usage": {"readUnits": 5}}
+
+    @app.get("/vectors/fetch")
+    async def fetch(request: Request):
+        ids = request.query_params.getlist("ids")
+        namespace = request.query_params.get("namespace", "")
+        emulator.count("fetch")
+        await emulator.delay()
+        return {"vectors": emulator.namespace(namespace).fetch(ids), "namespace": namespace, "usage": {"readUnits": 1}}
+
+    @app.post("/vectors/delete")
+    async def delete(request: Request):
+        body = await read_body(request)
+        emulator.count("delete")
+        await emulator.delay()
+        index = emulator.namespace(body.get("namespace", ""))
+        await asyncio.to_thread(index.delete, body.get("ids"), bool(body.get("deleteAll")))
+        return {}
+
+    @app.post("/describe_index_stats")
+    @app.get("/describe_index_stats")
+    async def describe_index_stats():
+        emulator.count("describe_index_stats")
+        await emulator.delay()
+        return emulator.describe_index_stats()
+
+    @app.get("/emulator/config")
+    async def get_config():
+        return emulator.config.to_dict()
+
+    @app.post("/emulator/config")
+    async def update_config(request: Request):
+        unknown = emulator.config.update(await request.json())
+        if unknown:
+            return JSONResponse(status_code=400, content={"unknown": unknown})
+        return emulator.config.to_dict()
+
+    @app.get("/emulator/stats")
+    async def get_stats():
+        return {"inflight": emulator.inflight, **emulator.stats, **emulator.describe_index_stats()}
+
+    @app.post("/emulator/reset")
+    async def reset():
+        emulator.stats.clear()
+        emulator.namespaces.clear()
+        emulator.rng.seed(emulator.config.seed)
+        return {"status": "reset"}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Pinecone data-plane emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5081)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Reset Pinecone vector database by clearing all vectors
 import os
 from pinecone import Pinecone
 from dotenv import load_dotenv
+from app.services.corpus_version import corpus_version_store
 
 load_dotenv()
 
@@ -40,6 +41,10 @@ def reset_pinecone():
             index.delete(delete_all=True)
             print("✅ All vectors deleted")
             
+            # Running workers drop cached searches and answers on their next query
+            version = corpus_version_store.bump("reset_vector_db.py")
+            print(f"Corpus version bumped to {version}")
+            
             # Verify deletion
             stats = index.describe_index_stats()
             new_count = stats.get('total_vector_count', 0)
@@ -2,17 +2,22 @@
 """
 Load Testing Script for Private GPT
 Tests system performance under concurrent user load
+
+Closed-loop: each simulated user waits for a reply before sending the next query.
+For fixed arrival rates and latency percentiles corrected for coordinated omission,
+use benchmarks/load_generator.py.
 """
 
 import asyncio
 import aiohttp
+import os
 import time
 import statistics
 from typing import List, Dict
 import json
 from datetime import datetime
 
-API_URL = "https://44.202.131.48/api"
+API_URL = os.getenv("LOAD_TEST_API_URL", "https://44.202.131.48/api")
 
 # Test scenarios
 TEST_QUERIES = [
@@ -0,0 +1,22 @@
+# backend/tests/unit/conftest.py
+
+import os
+import sys
+
+# add backend/ (two levels up) to Python’s import path so `app` is importable
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            os.pardir,
+            os.pardir,
+        )
+    ),
+)
+
+# Keep module-level singletons in memory and off the network
+os.environ.setdefault("CORPUS_VERSION_BACKEND", "memory")
+os.environ.setdefault("SESSION_BACKEND", "memory")
+os.environ.setdefault("VECTOR_BACKEND", "local")
+os.environ.setdefault("EMBEDDING_PROVIDER", "local")
@@ -0,0 +1,38 @@
+from app.services.answer_cache import AnswerCache, CachedAnswer
+
+
+def answer(question: str, embedding=None) -> CachedAnswer:
+    return CachedAnswer(
+        question, f"answer to {question}", {"sources": []}, embedding
+    )
+
+
+def test_answer_cache_drops_entries_on_newer_corpus_version():
+    cache = AnswerCache()
+    cache.put("what is x", True, 1, answer("what is x"))
+    assert cache.get("what is x", True, 1) is not None
+
+    assert cache.get("what is x", True, 2) is None
+    assert len(cache) == 0
+    assert cache.corpus_version == 2 and cache.invalidations == 1
+
+
+def test_answer_cache_ignores_results_from_a_stale_version():
+    cache = AnswerCache()
+    cache.get("anything", True, 5)
+    cache.put(
+        "what is x", True, 4, answer("what is x")
+    )  # Generated before the corpus moved
+    assert len(cache) == 0
+    assert cache.get("what is x", True, 4) is None
+
+
+def test_answer_cache_semantic_lookup_respects_threshold():
+    cache = AnswerCache()
+    cache.similarity_threshold = 0.9
+    cache.semantic_enabled = True
+    cache.put("what is x", True, 1, answer("what is x", [1.0, 0.0, 0.0]))
+
+    assert cache.get_similar([0.99, 0.1, 0.0], 1).question == "what is x"
+    assert cache.get_similar([0.0, 1.0, 0.0], 1) is None
+    assert cache.get_similar([0.99, 0.1, 0.0], 2) is None  # Corpus moved on
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.core import aws
+from app.core.executors import embedding_executor, generation_executor
+from app.services.ai_service import AIService
+from app.services.embedding_service import EmbeddingService
+
+EMULATOR = "http://127.0.0.1:8001"
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients(monkeypatch):
+    monkeypatch.setattr(aws, "_clients", {})
+    monkeypatch.setattr(aws, "_async_clients", {})
+
+
+def test_client_config_defaults_to_executor_sized_pool():
+    config = aws.bedrock_client_config()
+    assert config.max_pool_connections == (
+        generation_executor.max_workers + embedding_executor.max_workers
+    )
+    # Retries are app.core.resilience's job
+    assert config.retries == {"mode": "adaptive", "total_max_attempts": 1}
+    assert config.tcp_keepalive is True
+
+
+def test_client_config_reads_overrides(monkeypatch):
+    monkeypatch.setenv("BEDROCK_MAX_POOL_CONNECTIONS", "64")
+    monkeypatch.setenv("BEDROCK_READ_TIMEOUT", "12.5")
+    monkeypatch.setenv("BEDROCK_RETRY_MODE", "standard")
+    config = aws.bedrock_client_config()
+    assert config.max_pool_connections == 64
+    assert config.read_timeout == 12.5
+    assert config.retries["mode"] == "standard"
+
+
+def test_clients_are_shared_per_region_endpoint_and_key():
+    client = aws.get_bedrock_client("us-east-1", EMULATOR)
+    assert aws.get_bedrock_client("us-east-1", EMULATOR) is client
+    assert aws.get_bedrock_client("us-west-2", EMULATOR) is not client
+    assert client.meta.endpoint_url == EMULATOR
+    assert client.meta.config.max_pool_connections == (
+        aws.bedrock_client_config().max_pool_connections
+    )
+
+
+def test_generation_and_embeddings_share_one_client(monkeypatch):
+    monkeypatch.setenv("BEDROCK_ENDPOINT_URL", EMULATOR)
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "bedrock")
+    generation, embeddings = AIService(), EmbeddingService()
+    assert generation.bedrock_client is embeddings.bedrock_client
+    assert len(aws._clients) == 1
+
+
+def test_async_clients_are_shared_and_closed():
+    async def scenario():
+        client = aws.get_async_bedrock_client("us-east-1", EMULATOR)
+        assert aws.get_async_bedrock_client("us-east-1", EMULATOR) is client
+        await aws.close_async_clients()
+        return client
+
+    asyncio.run(scenario())
+    assert aws._async_clients == {}
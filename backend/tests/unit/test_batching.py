@@ -0,0 +1,110 @@
+import asyncio
+import gc
+
+import pytest
+
+from app.core.batching import MicroBatcher
+
+
+def test_concurrent_items_share_one_handler_call():
+    calls = []
+
+    async def handler(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(handler, window=0.01, max_batch_size=16)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert asyncio.run(scenario()) == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+
+
+def test_full_batch_flushes_before_the_window_closes():
+    async def handler(items):
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(handler, window=60.0, max_batch_size=2)
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.submit("a"), batcher.submit("b")), timeout=1
+        )
+        return results, batcher.batches
+
+    assert asyncio.run(scenario()) == (["a", "b"], 1)
+
+
+def test_failed_item_does_not_fail_its_batch():
+    async def handler(items):
+        return [
+            ValueError(item) if item == "bad" else item.upper()
+            for item in items
+        ]
+
+    async def scenario():
+        batcher = MicroBatcher(handler, window=0.01)
+        return await asyncio.gather(
+            batcher.submit("ok"),
+            batcher.submit("bad"),
+            batcher.submit("fine"),
+            return_exceptions=True,
+        )
+
+    ok, bad, fine = asyncio.run(scenario())
+    assert (ok, fine) == ("OK", "FINE")
+    assert isinstance(bad, ValueError)
+
+
+def test_handler_error_fails_every_item():
+    async def handler(items):
+        raise RuntimeError("backend down")
+
+    async def scenario():
+        batcher = MicroBatcher(handler, window=0.01)
+        return await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+
+    assert all(
+        isinstance(result, RuntimeError) for result in asyncio.run(scenario())
+    )
+
+
+def test_running_batch_survives_garbage_collection():
+    release = None
+
+    async def handler(items):
+        await release.wait()
+        return items
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        batcher = MicroBatcher(handler, window=0.0)
+        submitted = asyncio.ensure_future(batcher.submit("item"))
+        await asyncio.sleep(0.01)
+        assert len(batcher._running) == 1
+        gc.collect()
+        release.set()
+        result = await asyncio.wait_for(submitted, timeout=1)
+        await asyncio.sleep(0)
+        return result, len(batcher._running)
+
+    assert asyncio.run(scenario()) == ("item", 0)
+
+
+def test_cancelled_batch_cancels_waiting_submitters():
+    async def handler(items):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        batcher = MicroBatcher(handler, window=0.0)
+        submitted = asyncio.ensure_future(batcher.submit("item"))
+        await asyncio.sleep(0.01)
+        for task in list(batcher._running):
+            task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await submitted
+
+    asyncio.run(scenario())
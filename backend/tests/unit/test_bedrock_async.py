@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from botocore.credentials import Credentials
+from botocore.exceptions import ClientError
+
+from app.core.bedrock_async import AsyncBedrockRuntime
+from emulators.bedrock import EmulatorConfig, create_app
+
+TEXT_MODEL = "amazon.titan-text-express-v1"
+BODY = json.dumps(
+    {
+        "inputText": "Context from knowledge base: Leave is paid.",
+        "textGenerationConfig": {"maxTokenCount": 512},
+    }
+)
+
+
+def runtime(transport):
+    client = AsyncBedrockRuntime(
+        "us-east-1", Credentials("AKIDEXAMPLE", "secret"), "http://bedrock"
+    )
+    client._client = httpx.AsyncClient(transport=transport)
+    return client
+
+
+def emulated(**settings):
+    config = EmulatorConfig()
+    config.update(
+        {"latency_ms": 0, "tokens_per_second": 1e6, "output_tokens": 12}
+    )
+    config.update(settings)
+    return runtime(httpx.ASGITransport(app=create_app(config)))
+
+
+def test_requests_are_sigv4_signed_for_bedrock():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    client = runtime(httpx.MockTransport(handler))
+    result = asyncio.run(
+        client.invoke_model(modelId="amazon.titan-embed-text-v2:0", body="{}")
+    )
+    assert result == {"ok": True}
+    request = seen[0]
+    assert request.url.raw_path == (
+        b"/model/amazon.titan-embed-text-v2%3A0/invoke"
+    )
+    authorization = request.headers["authorization"]
+    assert authorization.startswith("AWS4-HMAC-SHA256 Credential=AKIDEXAMPLE/")
+    assert "/us-east-1/bedrock/aws4_request" in authorization
+    assert "x-amz-date" in request.headers
+
+
+def test_invoke_model_against_emulator():
+    result = asyncio.run(
+        emulated().invoke_model(modelId=TEXT_MODEL, body=BODY)
+    )
+    assert result["results"][0]["completionReason"] == "FINISH"
+
+
+def test_stream_yields_decoded_chunks():
+    async def scenario():
+        client = emulated(stream_chunk_tokens=3)
+        return [
+            chunk
+            async for chunk in client.invoke_model_with_response_stream(
+                modelId=TEXT_MODEL, body=BODY
+            )
+        ]
+
+    chunks = asyncio.run(scenario())
+    assert len(chunks) > 1
+    assert chunks[-1]["completionReason"] == "FINISH"
+    assert all("outputText" in chunk for chunk in chunks)
+
+
+def test_http_errors_become_client_errors():
+    client = emulated(throttle_rate=1.0)
+    with pytest.raises(ClientError) as error:
+        asyncio.run(client.invoke_model(modelId=TEXT_MODEL, body=BODY))
+    assert error.value.response["Error"]["Code"] == "ThrottlingException"
+    assert error.value.response["ResponseMetadata"]["HTTPStatusCode"] == 429
+
+
+def test_stream_exceptions_become_client_errors():
+    async def scenario():
+        client = emulated(stream_error_rate=1.0)
+        async for _ in client.invoke_model_with_response_stream(
+            modelId=TEXT_MODEL, body=BODY
+        ):
+            pass
+
+    with pytest.raises(ClientError) as error:
+        asyncio.run(scenario())
+    assert error.value.response["Error"]["Code"] == (
+        "ModelStreamErrorException"
+    )
+
+
+@pytest.mark.parametrize(
+    "failure, expected",
+    [
+        (httpx.ConnectError("refused"), ConnectionError),
+        (httpx.ReadTimeout("slow"), TimeoutError),
+    ],
+)
+def test_transport_failures_map_to_builtin_errors(failure, expected):
+    def handler(request):
+        raise failure
+
+    client = runtime(httpx.MockTransport(handler))
+    with pytest.raises(expected):
+        asyncio.run(client.invoke_model(modelId=TEXT_MODEL, body=BODY))
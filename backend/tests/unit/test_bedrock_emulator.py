@@ -0,0 +1,128 @@
+import base64
+import json
+
+from botocore.eventstream import EventStreamBuffer
+from fastapi.testclient import TestClient
+
+from emulators.bedrock import EmulatorConfig, create_app
+
+TEXT_MODEL = "/model/amazon.titan-text-express-v1"
+EMBED_MODEL = "/model/amazon.titan-embed-text-v2:0"
+
+
+def emulator(**settings):
+    config = EmulatorConfig()
+    config.update(
+        {
+            "latency_ms": 0,
+            "embed_latency_ms": 0,
+            "tokens_per_second": 1e6,
+            "output_tokens": 20,
+            **settings,
+        }
+    )
+    return TestClient(create_app(config))
+
+
+def text_request(prompt="Context from knowledge base: Leave is paid."):
+    return {
+        "inputText": prompt,
+        "textGenerationConfig": {"maxTokenCount": 512},
+    }
+
+
+def test_invoke_returns_titan_shaped_deterministic_text():
+    client = emulator()
+    first = client.post(f"{TEXT_MODEL}/invoke", json=text_request())
+    second = client.post(f"{TEXT_MODEL}/invoke", json=text_request())
+    assert first.status_code == 200
+    result = first.json()["results"][0]
+    assert result["completionReason"] == "FINISH"
+    assert result["outputText"].endswith(".")
+    assert set(result["outputText"].rstrip(".").split()) <= {
+        "Leave",
+        "is",
+        "paid",
+        "paid.",
+    }
+    assert first.json() == second.json()
+
+
+def test_embeddings_use_requested_dimension():
+    client = emulator()
+    response = client.post(
+        f"{EMBED_MODEL}/invoke", json={"inputText": "hello", "dimensions": 256}
+    )
+    assert len(response.json()["embedding"]) == 256
+    assert client.get("/emulator/stats").json()["embed"] == 1
+
+
+def test_stream_is_valid_event_stream():
+    client = emulator(stream_chunk_tokens=5)
+    response = client.post(
+        f"{TEXT_MODEL}/invoke-with-response-stream", json=text_request()
+    )
+    buffer = EventStreamBuffer()
+    buffer.add_data(response.content)
+    chunks = []
+    for message in buffer:
+        assert message.headers[":message-type"] == "event"
+        payload = json.loads(message.payload)
+        chunks.append(json.loads(base64.b64decode(payload["bytes"])))
+
+    assert len(chunks) > 1
+    assert chunks[-1]["completionReason"] == "FINISH"
+    assert "amazon-bedrock-invocationMetrics" in chunks[-1]
+    text = "".join(chunk["outputText"] for chunk in chunks)
+    assert len(text.split()) == chunks[-1]["totalOutputTextTokenCount"]
+
+
+def test_stream_errors_are_exception_events():
+    client = emulator(stream_error_rate=1.0)
+    response = client.post(
+        f"{TEXT_MODEL}/invoke-with-response-stream", json=text_request()
+    )
+    buffer = EventStreamBuffer()
+    buffer.add_data(response.content)
+    last = list(buffer)[-1]
+    assert last.headers[":exception-type"] == "modelStreamErrorException"
+
+
+def test_injected_faults_use_bedrock_error_shapes():
+    client = emulator(throttle_rate=1.0)
+    response = client.post(f"{TEXT_MODEL}/invoke", json=text_request())
+    assert response.status_code == 429
+    assert response.headers["x-amzn-ErrorType"].startswith(
+        "ThrottlingException:"
+    )
+
+    client = emulator(error_rate=1.0)
+    response = client.post(f"{TEXT_MODEL}/invoke", json=text_request())
+    assert response.status_code == 500
+    assert client.get("/emulator/stats").json()["InternalServerException"]
+
+
+def test_requests_per_second_quota_throttles():
+    client = emulator(requests_per_second=2)
+    codes = [
+        client.post(f"{TEXT_MODEL}/invoke", json=text_request()).status_code
+        for _ in range(4)
+    ]
+    assert codes[:2] == [200, 200] and 429 in codes[2:]
+
+
+def test_malformed_body_is_a_validation_error():
+    response = emulator().post(f"{TEXT_MODEL}/invoke", content=b"{not json")
+    assert response.status_code == 400
+    assert response.headers["x-amzn-ErrorType"].startswith(
+        "ValidationException:"
+    )
+
+
+def test_config_updates_at_runtime():
+    client = emulator()
+    response = client.post("/emulator/config", json={"throttle_rate": "0.5"})
+    assert response.json()["throttle_rate"] == 0.5
+    response = client.post("/emulator/config", json={"bogus": 1})
+    assert response.status_code == 400
+    assert response.json() == {"unknown": ["bogus"]}
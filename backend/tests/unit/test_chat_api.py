@@ -0,0 +1,30 @@
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.main import app
+from app.models.chat import ChatRequest
+
+
+def test_session_id_accepts_uuids_and_generated_ids():
+    for session_id in (
+        "3f2b8c1e-9a4d-4e2f-8b1a-2c3d4e5f6a7b",
+        "replay-20240101120000-load-3",
+        "test_1717171717.123",
+    ):
+        assert ChatRequest(message="hi", session_id=session_id).session_id
+
+
+@pytest.mark.parametrize(
+    "session_id", ["", "x" * 129, "../etc/passwd", "a b", "id\n"]
+)
+def test_session_id_rejects_unsafe_values(session_id):
+    with pytest.raises(ValidationError):
+        ChatRequest(message="hi", session_id=session_id)
+
+
+def test_chat_rejects_invalid_session_id():
+    response = TestClient(app).post(
+        "/api/chat/", json={"message": "hi", "session_id": "x" * 1000}
+    )
+    assert response.status_code == 422
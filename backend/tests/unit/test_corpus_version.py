@@ -0,0 +1,87 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+from app.core.paths import BACKEND_DIR
+from app.services.corpus_version import (
+    CorpusVersionStore,
+    SQLiteCorpusVersionStore,
+)
+
+
+def test_memory_store_versions_increase():
+    store = CorpusVersionStore()
+    first = store.bump("first")
+    second = store.bump("second")
+    assert second > first
+    assert store.current == second
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "corpus.db")
+    ours, theirs = SQLiteCorpusVersionStore(path), SQLiteCorpusVersionStore(
+        path
+    )
+    assert ours.current == theirs.current == 0
+    version = theirs.bump("ingest")
+    assert ours.current == version
+    assert ours.stats()["last_change"] == "ingest"
+
+
+def test_sqlite_store_opens_database_on_first_use(tmp_path):
+    path = tmp_path / "nested" / "corpus.db"
+    store = SQLiteCorpusVersionStore(str(path))
+    assert not path.exists()
+    store.bump("first write")
+    assert path.exists()
+
+
+def test_relative_path_is_anchored_at_backend_dir():
+    store = SQLiteCorpusVersionStore(os.path.join("data", "corpus.db"))
+    assert store.path == os.path.join(BACKEND_DIR, "data", "corpus.db")
+    assert os.path.isfile(os.path.join(BACKEND_DIR, "app", "main.py"))
+
+
+def test_reads_do_not_wait_for_a_blocked_bump(tmp_path):
+    path = str(tmp_path / "corpus.db")
+    store = SQLiteCorpusVersionStore(path, timeout=2.0)
+    assert store.current == 0
+
+    # Another process holds the write lock
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    bumped = []
+    writer = threading.Thread(target=lambda: bumped.append(store.bump("x")))
+    writer.start()
+    time.sleep(0.1)
+
+    started = time.monotonic()
+    assert store.current == 0
+    assert store.stats()["version"] == 0
+    assert time.monotonic() - started < 0.5
+
+    other.execute("COMMIT")
+    writer.join(timeout=5)
+    assert bumped and store.current == bumped[0]
+
+
+def test_started_store_polls_for_other_workers_bumps(tmp_path, monkeypatch):
+    monkeypatch.setenv("CORPUS_VERSION_POLL_MS", "10")
+    path = str(tmp_path / "corpus.db")
+    ours, theirs = SQLiteCorpusVersionStore(path), SQLiteCorpusVersionStore(
+        path
+    )
+
+    async def scenario():
+        await ours.start()
+        try:
+            version = theirs.bump("other worker")
+            await asyncio.sleep(0.1)
+            return version, ours.current
+        finally:
+            await ours.stop()
+
+    version, seen = asyncio.run(scenario())
+    assert seen == version
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.resilience import CircuitBreaker, CircuitOpenError
+from app.core.resilience import bedrock_embedding
+from app.services.embedding_service import embedding_service
+from app.services.rag_service import RAGService
+
+
+@pytest.fixture
+def open_embedding_circuit(monkeypatch):
+    """Bedrock embeddings configured, with their circuit open"""
+    monkeypatch.setattr(embedding_service, "local_engine", None)
+    monkeypatch.setattr(embedding_service, "test_mode", False)
+    monkeypatch.setattr(
+        bedrock_embedding.breaker, "state", CircuitBreaker.OPEN
+    )
+    monkeypatch.setattr(
+        bedrock_embedding.breaker, "opened_at", time.monotonic()
+    )
+
+
+def test_open_circuit_is_raised_unwrapped(open_embedding_circuit):
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(embedding_service.generate_single_embedding("question"))
+
+
+def test_rag_answers_open_embedding_circuit_with_friendly_message(
+    open_embedding_circuit,
+):
+    service = RAGService()
+    result = asyncio.run(service.query_with_rag("What is the leave policy?"))
+    assert "temporarily unavailable" in result["response"]
+    assert "Circuit" not in result["response"]
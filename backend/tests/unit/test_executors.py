@@ -0,0 +1,108 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from app.core.executors import BoundedExecutor, ExecutorSaturatedError
+
+request_var = contextvars.ContextVar("request_var", default=None)
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+def test_full_queue_rejects_calls():
+    executor = BoundedExecutor("test-bounded", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        await wait_for(lambda: executor.active == 1)
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await wait_for(lambda: executor.queued == 1)
+
+        with pytest.raises(ExecutorSaturatedError) as rejected:
+            await executor.run(lambda: "rejected")
+        assert rejected.value.name == "test-bounded"
+
+        release.set()
+        return await asyncio.gather(running, queued)
+
+    try:
+        assert asyncio.run(scenario()) == [True, "queued"]
+        assert executor.stats() == {"workers": 1, "active": 0, "queued": 0}
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_unbounded_queue_never_rejects():
+    executor = BoundedExecutor("test-unbounded", max_workers=2)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(executor.run(time.sleep, 0.01) for _ in range(20))
+        )
+
+    try:
+        assert asyncio.run(scenario()) == [None] * 20
+        assert executor.queued == 0 and executor.active == 0
+    finally:
+        executor.shutdown()
+
+
+def test_calls_run_on_named_threads_with_callers_context():
+    executor = BoundedExecutor("test-context", max_workers=1)
+
+    def work(suffix):
+        return threading.current_thread().name, request_var.get() + suffix
+
+    async def scenario():
+        request_var.set("req")
+        return await executor.run(work, suffix="-1")
+
+    try:
+        thread_name, value = asyncio.run(scenario())
+        assert thread_name.startswith("executor-test-context")
+        assert value == "req-1"
+    finally:
+        executor.shutdown()
+
+
+def test_cancelled_queued_call_is_not_counted():
+    executor = BoundedExecutor("test-cancel", max_workers=1, max_queue=2)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        await wait_for(lambda: executor.active == 1)
+        queued = asyncio.ensure_future(executor.run(lambda: None))
+        await wait_for(lambda: executor.queued == 1)
+        queued.cancel()
+        await wait_for(lambda: executor.queued == 0)
+        release.set()
+        await running
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_from_env_reads_sizes(monkeypatch):
+    monkeypatch.setenv("EXECUTOR_TEST_WORKERS", "3")
+    monkeypatch.setenv("EXECUTOR_TEST_MAX_QUEUE", "7")
+    executor = BoundedExecutor.from_env(
+        "test-env", "EXECUTOR_TEST", max_workers=1
+    )
+    try:
+        assert (executor.max_workers, executor.max_queue) == (3, 7)
+    finally:
+        executor.shutdown()
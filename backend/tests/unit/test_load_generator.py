@@ -0,0 +1,91 @@
+import asyncio
+import math
+
+import httpx
+import pytest
+
+from benchmarks.load_generator import LatencyHistogram, OpenLoopRun, compare
+
+
+def test_histogram_percentiles_are_within_precision():
+    histogram = LatencyHistogram(precision=0.001)
+    for value in range(1, 10_001):
+        histogram.record(value * 100.0)
+
+    assert histogram.total == 10_000
+    assert histogram.percentile(50) == pytest.approx(500_000, rel=0.002)
+    assert histogram.percentile(99) == pytest.approx(990_000, rel=0.002)
+    assert histogram.percentile(100) == 1_000_000
+    summary = histogram.summary()
+    assert summary["count"] == 10_000
+    assert summary["p50_ms"] == pytest.approx(500, rel=0.002)
+    assert summary["max_ms"] == 1_000
+
+
+def test_histogram_percentiles_never_exceed_max_or_underreport():
+    histogram = LatencyHistogram()
+    histogram.record(0.2)  # Clamped to 1 us
+    histogram.record(1234.0)
+    assert histogram.min == 1.0
+    assert histogram.percentile(99.9) == 1234.0
+    assert histogram.percentile(50) >= 1.0
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert math.isnan(histogram.percentile(50))
+    assert histogram.summary() == {"count": 0}
+    assert histogram.to_dict()["buckets"] == {}
+
+
+async def slow_app(scope, receive, send):
+    await asyncio.sleep(0.1)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/plain")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def test_latency_is_corrected_for_coordinated_omission():
+    async def scenario():
+        transport = httpx.ASGITransport(app=slow_app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadgen"
+        ) as client:
+            load_run = OpenLoopRun(
+                client,
+                "/",
+                ["q"],
+                rate=20,
+                duration=0.25,
+                warmup=0,
+                arrival="constant",
+                max_inflight=1,
+                timeout=5,
+                sessions=0,
+                seed=1,
+            )
+            return await load_run.run()
+
+    step = asyncio.run(scenario())
+    assert step["scheduled"] == 5 and step["outcomes"] == {"200": 5}
+    assert step["max_inflight"] == 1
+    # Requests queued behind the single slot are charged for the wait
+    corrected = step["response_time"]["summary"]["max_ms"]
+    uncorrected = step["service_time"]["summary"]["max_ms"]
+    assert uncorrected < 200
+    assert corrected > uncorrected + 150
+
+
+def test_compare_matches_steps_by_rate():
+    def step(rate, p99):
+        summary = {"p50_ms": 10.0, "p99_ms": p99, "p99.9_ms": p99}
+        return {"target_rate": rate, "response_time": {"summary": summary}}
+
+    baseline = {"steps": [step(5, 100.0), step(10, 100.0)]}
+    current = {"steps": [step(5, 105.0), step(10, 150.0), step(20, 500.0)]}
+    assert compare(current, baseline, 0.10) == ["10/s p99_ms", "10/s p99.9_ms"]
@@ -0,0 +1,92 @@
+import pytest
+
+from app.services import local_vector_index
+from app.services.local_vector_index import LocalVectorIndex, matches_filter
+
+
+def test_bad_dimension_leaves_index_untouched():
+    index = LocalVectorIndex(dimension=2)
+    index.upsert([{"id": "a", "values": [1.0, 0.0]}])
+    assert index.query([1.0, 0.0], top_k=5)[0][0] == "a"
+
+    with pytest.raises(ValueError):
+        index.upsert(
+            [
+                {"id": "b", "values": [0.0, 1.0]},
+                {"id": "a", "values": [0.0, 1.0]},
+                {"id": "c", "values": [1.0, 0.0, 0.0]},
+            ]
+        )
+
+    assert len(index) == 1
+    assert index.fetch(["a"])["a"]["values"] == [1.0, 0.0]
+    assert [match[0] for match in index.query([0.0, 1.0], top_k=5)] == ["a"]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def index(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(local_vector_index, "np", None)
+    index = LocalVectorIndex(dimension=3)
+    index.upsert(
+        [
+            {"id": "x", "values": [1.0, 0.0, 0.0], "metadata": {"n": 1}},
+            {"id": "y", "values": [0.0, 2.0, 0.0], "metadata": {"n": 2}},
+            {"id": "xy", "values": [1.0, 1.0, 0.0], "metadata": {"n": 3}},
+        ]
+    )
+    return index
+
+
+def test_query_ranks_by_cosine_similarity(index):
+    matches = index.query([3.0, 0.1, 0.0], top_k=2)
+    assert [doc_id for doc_id, _, _ in matches] == ["x", "xy"]
+    assert matches[0][1] == pytest.approx(0.9994, abs=1e-3)
+    assert matches[0][2] == {"n": 1}
+    assert len(index.query([1.0, 0.0, 0.0], top_k=10)) == 3
+
+
+def test_query_batch_scores_each_query(index):
+    batch = index.query_batch([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], top_k=1)
+    assert [[match[0] for match in matches] for matches in batch] == [
+        ["x"],
+        ["y"],
+    ]
+
+
+def test_query_applies_metadata_filter(index):
+    matches = index.query([1.0, 0.0, 0.0], top_k=5, filter={"n": {"$gte": 2}})
+    assert [doc_id for doc_id, _, _ in matches] == ["xy", "y"]
+    assert index.query([1.0, 0.0, 0.0], filter={"n": {"$gt": 5}}) == []
+
+
+def test_upsert_replaces_and_delete_removes(index):
+    index.upsert([{"id": "x", "values": [0.0, 0.0, 1.0]}])
+    assert index.query([0.0, 0.0, 1.0], top_k=1)[0][0] == "x"
+    assert index.fetch(["x"])["x"]["metadata"] == {}
+
+    index.delete(["x", "missing"])
+    assert len(index) == 2 and index.fetch(["x"]) == {}
+    assert index.query([0.0, 1.0, 0.0], top_k=1)[0][0] == "y"
+    index.delete(delete_all=True)
+    assert len(index) == 0
+    assert index.query([1.0, 0.0, 0.0]) == []
+
+
+def test_matches_filter_operators():
+    metadata = {"type": "policy", "year": 2023, "tags": "hr"}
+    assert matches_filter(metadata, None)
+    assert matches_filter(metadata, {"type": "policy"})
+    assert matches_filter(metadata, {"year": {"$gte": 2023, "$lt": 2024}})
+    assert matches_filter(metadata, {"tags": {"$in": ["hr", "legal"]}})
+    assert matches_filter(metadata, {"tags": {"$nin": ["legal"]}})
+    assert matches_filter(metadata, {"missing": {"$exists": False}})
+    assert not matches_filter(metadata, {"missing": {"$gt": 1}})
+    assert matches_filter(
+        metadata, {"$or": [{"type": "memo"}, {"year": {"$ne": 2020}}]}
+    )
+    assert not matches_filter(
+        metadata, {"$and": [{"type": "policy"}, {"year": 2020}]}
+    )
+    with pytest.raises(ValueError):
+        matches_filter(metadata, {"year": {"$regex": "20"}})
@@ -0,0 +1,86 @@
+import json
+import logging
+import queue
+
+from app.core.log import (
+    JSONFormatter,
+    RequestContextFilter,
+    SamplingFilter,
+    _DroppingQueueHandler,
+    _parse_rates,
+)
+from app.core.tracing import tracer
+
+
+def record(name="app.rag", level=logging.INFO, msg="hello %s", args=("x",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_json_formatter_emits_category_request_id_and_fields():
+    entry = record()
+    entry.request_id = "req-1"
+    entry.fields = {"stage": "embed", "ms": 1.5}
+    line = json.loads(JSONFormatter().format(entry))
+    assert line["level"] == "info"
+    assert line["category"] == "rag"
+    assert line["msg"] == "hello x"
+    assert line["request_id"] == "req-1"
+    assert line["stage"] == "embed" and line["ms"] == 1.5
+    assert line["ts"].endswith("+00:00")
+
+
+def test_json_formatter_omits_missing_request_id():
+    line = json.loads(JSONFormatter().format(record(name="uvicorn")))
+    assert line["category"] == "uvicorn"
+    assert "request_id" not in line
+
+
+def test_parse_rates_clamps_and_skips_invalid_entries():
+    assert _parse_rates(" rag.debug=0.01, vector=2 ,bad=x,,cache=-1") == {
+        "rag.debug": 0.01,
+        "vector": 1.0,
+        "cache": 0.0,
+    }
+
+
+def test_sampling_uses_most_specific_category(monkeypatch):
+    sampling = SamplingFilter({"rag": 1.0, "rag.debug": 0.0})
+    assert sampling.filter(record("app.rag"))
+    assert sampling.filter(record("app.rag.timing"))
+    assert not sampling.filter(record("app.rag.debug"))
+    assert not sampling.filter(record("app.rag.debug.detail"))
+
+    monkeypatch.setattr("app.core.log.random.random", lambda: 0.5)
+    partial = SamplingFilter({"vector": 0.4})
+    assert not partial.filter(record("app.vector"))
+    partial.rates["vector"] = 0.6
+    partial._cache.clear()
+    assert partial.filter(record("app.vector"))
+
+
+def test_warnings_are_never_sampled():
+    sampling = SamplingFilter({"rag": 0.0})
+    assert sampling.filter(record(level=logging.WARNING))
+    assert sampling.filter(record(level=logging.ERROR))
+
+
+def test_request_context_filter_stamps_current_request():
+    context = RequestContextFilter()
+    outside = record()
+    context.filter(outside)
+    assert outside.request_id is None
+
+    with tracer.request("req-2"):
+        inside = record()
+        context.filter(inside)
+    assert inside.request_id == "req-2"
+
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = _DroppingQueueHandler(queue.Queue(maxsize=1))
+    before = _DroppingQueueHandler.dropped
+    handler.handle(record())
+    handler.handle(record())
+    assert _DroppingQueueHandler.dropped == before + 1
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "hello x" and queued.args is None
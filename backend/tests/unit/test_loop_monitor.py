@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from app.core.loop_monitor import LAG_QUANTILES, LoopLagMonitor
+from app.core.metrics import LOOP_LAG_QUANTILE
+
+
+def monitor(monkeypatch, **settings):
+    for name, value in settings.items():
+        monkeypatch.setenv(name, str(value))
+    # Keep the global monitor's lag gauges once this test's monitor is gone
+    for q in LAG_QUANTILES:
+        child = LOOP_LAG_QUANTILE.labels(str(q))
+        monkeypatch.setattr(child, "function", child.function)
+    return LoopLagMonitor()
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+def test_blocking_call_is_caught_with_its_stack(monkeypatch):
+    lag_monitor = monitor(
+        monkeypatch, LOOP_MONITOR_INTERVAL_MS=10, LOOP_BLOCK_THRESHOLD_MS=50
+    )
+
+    async def scenario():
+        lag_monitor.start()
+        assert lag_monitor.running
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.1)
+        await lag_monitor.stop()
+
+    asyncio.run(scenario())
+    assert not lag_monitor.running
+    status = lag_monitor.status()
+    event = status["blocked_events"][0]
+    assert event["blocked_ms"] >= 50
+    assert any(
+        ":block_the_loop:" in sample["stack"] for sample in event["stacks"]
+    )
+    assert status["lag_ms"]["max"] >= 200
+
+
+def test_lag_quantiles_come_from_the_recent_window(monkeypatch):
+    lag_monitor = monitor(monkeypatch, LOOP_LAG_WINDOW=4)
+    assert lag_monitor.lag_quantile(0.5) == 0.0
+    for lag in (0.5, 0.001, 0.002, 0.003, 0.004):
+        lag_monitor._lags.append(lag)
+    assert lag_monitor.lag_quantile(0.5) == 0.003
+    assert lag_monitor.lag_quantile(1.0) == 0.004
+    assert lag_monitor.status()["lag_ms"] == {
+        "p50": 3.0,
+        "p90": 4.0,
+        "p99": 4.0,
+        "max": 4.0,
+    }
+
+
+def test_disabled_monitor_does_not_start(monkeypatch):
+    lag_monitor = monitor(monkeypatch, LOOP_MONITOR_ENABLED="false")
+
+    async def scenario():
+        lag_monitor.start()
+        return lag_monitor.running
+
+    assert asyncio.run(scenario()) is False
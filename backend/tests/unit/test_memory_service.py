@@ -0,0 +1,89 @@
+import asyncio
+
+from app.services.memory_service import ConversationMemory, estimate_tokens
+from app.services.session_service import SessionStore
+
+
+def memory(monkeypatch, **settings):
+    monkeypatch.setenv("MEMORY_SUMMARIZER", "extractive")
+    for name, value in settings.items():
+        monkeypatch.setenv(name, str(value))
+    conversation = ConversationMemory()
+    conversation.session_store = SessionStore()
+    return conversation
+
+
+def add_exchange(conversation, question, answer):
+    conversation.session_store.append("s", "user", question)
+    conversation.session_store.append("s", "assistant", answer)
+
+
+def test_new_conversation_has_no_history(monkeypatch):
+    assert memory(monkeypatch).build_history("s") == ""
+
+
+def test_history_keeps_only_recent_turns_verbatim(monkeypatch):
+    conversation = memory(monkeypatch, MEMORY_RECENT_TURNS=2)
+    add_exchange(conversation, "First question?", "First answer.")
+    add_exchange(conversation, "Second question?", "Second answer.")
+    assert conversation.build_history("s") == (
+        "User: Second question?\nAssistant: Second answer."
+    )
+
+
+def test_history_respects_recent_token_budget(monkeypatch):
+    conversation = memory(monkeypatch, MEMORY_RECENT_TOKENS=50)
+    add_exchange(conversation, "Short question?", "word " * 400)
+    history = conversation.build_history("s")
+    # The newest turn is truncated to the budget and the older one dropped
+    assert history.startswith("Assistant: word")
+    assert history.endswith("...")
+    assert "Short question?" not in history
+    assert estimate_tokens(history) <= 51
+
+
+def test_refresh_folds_older_turns_into_summary(monkeypatch):
+    conversation = memory(monkeypatch, MEMORY_RECENT_TURNS=2)
+    add_exchange(conversation, "What is GDPR?", "A regulation. It is long.")
+    add_exchange(conversation, "Who enforces it?", "Regulators.")
+
+    async def scenario():
+        conversation.schedule_refresh("s")
+        await asyncio.gather(*conversation._refresh_tasks.values())
+
+    asyncio.run(scenario())
+    session = conversation.session_store.peek("s")
+    assert session.summary_upto == 2
+    assert session.summary == (
+        "User asked: What is GDPR? Assistant said: A regulation."
+    )
+    assert conversation.build_history("s") == (
+        "Summary of earlier conversation: " + session.summary + "\n"
+        "User: Who enforces it?\nAssistant: Regulators."
+    )
+
+
+def test_summary_is_truncated_to_its_budget(monkeypatch):
+    conversation = memory(
+        monkeypatch, MEMORY_RECENT_TURNS=2, MEMORY_SUMMARY_TOKENS=10
+    )
+    for i in range(5):
+        add_exchange(conversation, f"Question number {i}?", f"Answer {i}.")
+
+    asyncio.run(conversation._refresh_summary("s"))
+    session = conversation.session_store.peek("s")
+    assert session.summary_upto == 8
+    assert session.summary.startswith("...")
+    assert session.summary.endswith("Assistant said: Answer 3.")
+    assert len(session.summary) <= 3 + 10 * 4
+
+
+def test_refresh_is_not_scheduled_while_turns_fit(monkeypatch):
+    conversation = memory(monkeypatch, MEMORY_RECENT_TURNS=4)
+    add_exchange(conversation, "Question?", "Answer.")
+
+    async def scenario():
+        conversation.schedule_refresh("s")
+        return dict(conversation._refresh_tasks)
+
+    assert asyncio.run(scenario()) == {}
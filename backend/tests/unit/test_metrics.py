@@ -0,0 +1,105 @@
+import math
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.metrics import (
+    CONTENT_TYPE,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    stage_timer,
+)
+from app.main import app
+
+
+def test_counter_and_gauge_render_text_format():
+    registry = Registry()
+    requests = Counter(
+        "requests_total", "Requests", labels=("outcome",), registry=registry
+    )
+    requests.labels("ok").inc()
+    requests.labels(outcome="ok").inc(2)
+    requests.labels("error").inc()
+    depth = Gauge("queue_depth", "Queue depth", registry=registry)
+    depth.set_function(lambda: 7)
+
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{outcome="error"} 1\n'
+        'requests_total{outcome="ok"} 3\n'
+        "# HELP queue_depth Queue depth\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 7\n"
+    )
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = Counter("c", "doc", labels=("path",), registry=registry)
+    counter.labels('a"b\\c\nd').inc()
+    assert 'c{path="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+def test_failing_gauge_function_renders_nan():
+    registry = Registry()
+    gauge = Gauge("g", "doc", registry=registry)
+    gauge.set_function(lambda: 1 / 0)
+    assert "g NaN" in registry.render()
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = Histogram(
+        "latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry
+    )
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 3.65",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    registry = Registry()
+    histogram = Histogram(
+        "h", "doc", buckets=(1.0, 2.0, 4.0), registry=registry
+    )
+    child = histogram.labels()
+    assert math.isnan(child.quantile(0.5))
+
+    for value in (0.5, 0.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert child.quantile(0.5) == pytest.approx(1.0)
+    assert child.quantile(0.75) == pytest.approx(2.0)
+    assert child.quantile(0.875) == pytest.approx(3.0)
+
+    histogram.observe(10.0)
+    # Values past the last finite bucket report that bucket's bound
+    assert child.quantile(1.0) == 4.0
+
+
+def test_duplicate_metric_names_are_rejected():
+    registry = Registry()
+    Counter("dup", "doc", registry=registry)
+    with pytest.raises(ValueError):
+        Gauge("dup", "doc", registry=registry)
+
+
+def test_stage_timer_records_stage_duration():
+    with stage_timer("test_pipeline", "stage"):
+        pass
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    assert (
+        'rag_stage_duration_seconds_count{pipeline="test_pipeline",'
+        'stage="stage"} 1' in response.text
+    )
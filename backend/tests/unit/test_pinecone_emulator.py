@@ -0,0 +1,96 @@
+from fastapi.testclient import TestClient
+
+from emulators.pinecone_server import EmulatorConfig, create_app
+
+
+def emulator(**settings):
+    config = EmulatorConfig()
+    config.update({"latency_ms": 0, "upsert_ms_per_vector": 0, "dimension": 2})
+    config.update(settings)
+    return TestClient(create_app(config))
+
+
+def upsert(client, vectors, namespace=""):
+    return client.post(
+        "/vectors/upsert", json={"vectors": vectors, "namespace": namespace}
+    )
+
+
+VECTORS = [
+    {"id": "a", "values": [1.0, 0.0], "metadata": {"type": "policy"}},
+    {"id": "b", "values": [0.0, 1.0], "metadata": {"type": "memo"}},
+]
+
+
+def test_upsert_query_fetch_delete_round_trip():
+    client = emulator()
+    assert upsert(client, VECTORS).json() == {"upsertedCount": 2}
+
+    response = client.post(
+        "/query",
+        json={
+            "vector": [1.0, 0.1],
+            "topK": 2,
+            "includeMetadata": True,
+            "filter": {"type": {"$eq": "policy"}},
+        },
+    )
+    matches = response.json()["matches"]
+    assert [match["id"] for match in matches] == ["a"]
+    assert matches[0]["metadata"] == {"type": "policy"}
+    assert matches[0]["values"] == []
+
+    by_id = client.post(
+        "/query", json={"id": "b", "topK": 1, "includeValues": True}
+    )
+    assert by_id.json()["matches"][0]["values"] == [0.0, 1.0]
+
+    fetched = client.get("/vectors/fetch", params={"ids": ["a", "zzz"]})
+    assert list(fetched.json()["vectors"]) == ["a"]
+
+    client.post("/vectors/delete", json={"ids": ["a"]})
+    stats = client.get("/describe_index_stats").json()
+    assert stats["totalVectorCount"] == 1
+    assert stats["namespaces"] == {"": {"vectorCount": 1}}
+
+
+def test_namespaces_are_separate():
+    client = emulator()
+    upsert(client, VECTORS[:1], namespace="one")
+    upsert(client, VECTORS, namespace="two")
+    response = client.post(
+        "/query", json={"vector": [1.0, 0.0], "topK": 5, "namespace": "one"}
+    )
+    assert [match["id"] for match in response.json()["matches"]] == ["a"]
+    assert client.get("/describe_index_stats").json()["namespaces"] == {
+        "one": {"vectorCount": 1},
+        "two": {"vectorCount": 2},
+    }
+
+
+def test_invalid_requests_get_pinecone_errors():
+    client = emulator()
+    bad = upsert(client, VECTORS + [{"id": "c", "values": [1.0]}])
+    assert bad.status_code == 400 and bad.json()["code"] == 3
+    assert client.get("/describe_index_stats").json()["totalVectorCount"] == 0
+
+    assert (
+        client.post("/query", json={"vector": [1.0], "topK": 1}).status_code
+        == 400
+    )
+    assert (
+        client.post("/query", json={"vector": [1.0, 0.0], "topK": 0})
+        .json()["message"]
+        .startswith("topK")
+    )
+    assert client.post("/query", json={"topK": 1}).status_code == 400
+
+
+def test_injected_faults():
+    client = emulator(throttle_rate=1.0)
+    response = upsert(client, VECTORS)
+    assert response.status_code == 429 and response.json()["code"] == 8
+    assert client.get("/emulator/stats").json()["http_429"] == 1
+
+    client = emulator(error_rate=1.0)
+    assert client.get("/describe_index_stats").status_code == 503
@@ -0,0 +1,110 @@
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import admin
+from app.core.profiling import (
+    MemoryTracker,
+    ProfileStore,
+    SamplingProfiler,
+    format_stack,
+)
+from app.main import app
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_format_stack_lists_outermost_caller_first():
+    def inner():
+        return format_stack(sys._getframe())
+
+    stack = inner()
+    assert stack[-1].startswith("test_profiling.py:inner:")
+    assert stack[-2].startswith(
+        "test_profiling.py:test_format_stack_lists_outermost_caller_first:"
+    )
+    assert len(format_stack(sys._getframe(), max_depth=2)) == 2
+
+
+def test_sampling_profiler_collapses_target_thread_stacks():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    busy_wait(0.1)
+    profiler.stop()
+
+    assert profiler.samples > 0 and profiler.duration >= 0.1
+    # Idle executor threads left by other tests are sampled too
+    loop_stacks = [
+        line
+        for line in profiler.collapsed().splitlines()
+        if line.startswith("event-loop;")
+    ]
+    assert loop_stacks
+    assert ":busy_wait:" in loop_stacks[0]
+
+
+def test_profile_store_keeps_most_recent():
+    store = ProfileStore(max_profiles=2)
+    for profile_id in ("a", "b", "c"):
+        store.add(profile_id, SamplingProfiler())
+    assert store.get("a") is None
+    assert [profile["id"] for profile in store.list()] == ["b", "c"]
+
+
+def test_memory_tracker_diff_finds_allocation_site():
+    tracker = MemoryTracker(max_snapshots=3)
+    with pytest.raises(RuntimeError):
+        tracker.snapshot()
+    tracker.start()
+    try:
+        base = tracker.snapshot()
+        retained = [bytearray(1024) for _ in range(200)]
+        stats = tracker.diff(base, limit=5)
+        assert retained
+        assert any(
+            "test_profiling.py" in stat["site"]
+            and stat["size_diff_bytes"] >= 200 * 1024
+            for stat in stats
+        )
+        with pytest.raises(KeyError):
+            tracker.diff("missing")
+        tracker.snapshot()
+        tracker.snapshot()
+        assert base not in tracker.snapshot_ids()
+    finally:
+        tracker.stop()
+    assert tracker.status()["snapshots"] == []
+
+
+def test_admin_hooks_are_hidden_without_a_token(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+    response = TestClient(app).get("/admin/profiles")
+    assert response.status_code == 404
+
+
+def test_admin_hooks_require_the_token(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    client = TestClient(app)
+    assert (
+        client.get(
+            "/admin/profiles", headers={"X-Admin-Token": "wrong"}
+        ).status_code
+        == 403
+    )
+    response = client.get(
+        "/admin/profiles", headers={"X-Admin-Token": "secret"}
+    )
+    assert response.status_code == 200
+    assert "profiles" in response.json()
+    assert (
+        client.get(
+            "/admin/profiles/missing", headers={"X-Admin-Token": "secret"}
+        ).status_code
+        == 404
+    )
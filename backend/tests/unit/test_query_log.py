@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import time
+
+from app.api.chat import _query_record
+from app.core.paths import BACKEND_DIR
+from app.core.query_log import QueryLog
+from app.core.tracing import tracer
+
+
+def query_log(monkeypatch, path, **settings):
+    monkeypatch.setenv("QUERY_LOG_ENABLED", "true")
+    monkeypatch.setenv("QUERY_LOG_PATH", str(path))
+    for key, value in settings.items():
+        monkeypatch.setenv(f"QUERY_LOG_{key.upper()}", str(value))
+    return QueryLog()
+
+
+def test_relative_path_is_anchored_at_backend_dir(monkeypatch):
+    log = query_log(monkeypatch, "data/query_log.{pid}.jsonl")
+    assert log.path == os.path.join(
+        BACKEND_DIR, "data", f"query_log.{os.getpid()}.jsonl"
+    )
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_disabled_log_records_nothing(monkeypatch, tmp_path):
+    log = query_log(monkeypatch, tmp_path / "q.jsonl", enabled="false")
+    log.record({"question": "hi"})
+    assert log.stats()["recorded"] == 0 and log.stats()["buffered"] == 0
+
+
+def test_full_buffer_drops_oldest_records(monkeypatch, tmp_path):
+    path = tmp_path / "q.jsonl"
+    log = query_log(monkeypatch, path, buffer=2)
+    for i in range(3):
+        log.record({"i": i})
+    asyncio.run(log.flush())
+    assert read_lines(path) == [{"i": 1}, {"i": 2}]
+    assert (log.recorded, log.dropped, log.written) == (3, 1, 2)
+
+
+def test_flush_appends_and_rotates(monkeypatch, tmp_path):
+    path = tmp_path / "q.jsonl"
+    # ~100 bytes per file, room for two backups
+    log = query_log(monkeypatch, path, max_mb=0.0001, backups=2)
+
+    async def write(i):
+        log.record({"i": i, "padding": "x" * 60})
+        await log.flush()
+
+    async def scenario():
+        for i in range(4):
+            await write(i)
+
+    asyncio.run(scenario())
+    assert log.rotations == 3
+    assert [line["i"] for line in read_lines(path)] == [3]
+    assert [line["i"] for line in read_lines(tmp_path / "q.jsonl.1")] == [2]
+    assert [line["i"] for line in read_lines(tmp_path / "q.jsonl.2")] == [1]
+    assert not (tmp_path / "q.jsonl.3").exists()
+
+
+def test_stop_flushes_the_background_writer(monkeypatch, tmp_path):
+    path = tmp_path / "logs" / "q.jsonl"
+    log = query_log(monkeypatch, path, flush_ms=60000)
+
+    async def scenario():
+        log.start()
+        log.record({"i": 0})
+        await log.stop()
+
+    asyncio.run(scenario())
+    assert read_lines(path) == [{"i": 0}]
+
+
+def test_query_record_shape():
+    rag_result = {
+        "context_info": {
+            "sources": [{"doc_id": "a"}, {"doc_id": "b"}],
+            "cache": "miss",
+        }
+    }
+    started = time.time()
+    with tracer.request("req-1"):
+        with tracer.span("rag.query", server_timing="query", coalesced=False):
+            with tracer.span("vector.search", cached=True):
+                pass
+            with tracer.span("vector.search", cached=False):
+                pass
+        record = _query_record(
+            started, "s", 2, "What is PTO?", "User: hi", rag_result
+        )
+
+    assert set(record) == {
+        "ts",
+        "request_id",
+        "session_id",
+        "turn",
+        "question",
+        "history_chars",
+        "total_ms",
+        "stages_ms",
+        "retrieved_ids",
+        "cache",
+        "error",
+    }
+    assert record["ts"] == started and record["request_id"] == "req-1"
+    assert (record["session_id"], record["turn"]) == ("s", 2)
+    assert record["history_chars"] == len("User: hi")
+    assert list(record["stages_ms"]) == ["query"]
+    assert record["retrieved_ids"] == ["a", "b"]
+    assert record["cache"] == {
+        "answer": "miss",
+        "retrieval": "miss",
+        "coalesced": False,
+    }
+    assert record["error"] is None
+    json.dumps(record)
+
+
+def test_query_record_outside_a_trace():
+    record = _query_record(
+        time.time(), "s", 0, "q", "", {"context_info": {"error": "boom"}}
+    )
+    assert record["request_id"] is None and record["stages_ms"] == {}
+    assert record["retrieved_ids"] == [] and record["error"] == "boom"
+    assert record["cache"]["retrieval"] is None
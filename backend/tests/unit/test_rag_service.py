@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import os
+
+from app.core.paths import BACKEND_DIR
+from app.services.embedding_service import embedding_service
+from app.services.rag_service import RAGService
+
+
+def test_semantic_answer_cache_enabled_with_local_embeddings(monkeypatch):
+    # No AWS credentials (test mode), but the hashing engine still gives
+    # real embeddings
+    monkeypatch.setattr(embedding_service, "test_mode", True)
+    assert embedding_service.local_engine is not None
+    service = RAGService()
+    assert service.answer_cache.semantic_enabled
+    assert service.faq_index.semantic_enabled
+
+
+def test_semantic_answer_cache_disabled_with_mock_embeddings(monkeypatch):
+    monkeypatch.setattr(embedding_service, "local_engine", None)
+    monkeypatch.setattr(embedding_service, "test_mode", True)
+    service = RAGService()
+    assert not service.answer_cache.semantic_enabled
+    assert not service.faq_index.semantic_enabled
+
+
+def test_retrieve_batch_isolates_failed_questions(monkeypatch):
+    service = RAGService()
+    real_embed = embedding_service.generate_embeddings
+
+    async def generate_embeddings(texts, return_exceptions=False):
+        embedded = await real_embed(texts)
+        return [
+            ValueError("input too long") if text == "bad" else vector
+            for text, vector in zip(texts, embedded)
+        ]
+
+    monkeypatch.setattr(
+        service.embedding_service, "generate_embeddings", generate_embeddings
+    )
+    results = asyncio.run(
+        service._retrieve_batch(
+            [("good question", None), ("bad", None), ("other", None)]
+        )
+    )
+
+    assert isinstance(results[1], ValueError)
+    for result in (results[0], results[2]):
+        search_results, query_embedding = result
+        assert (
+            isinstance(search_results, list) and len(query_embedding) == 1024
+        )
+
+
+def test_faq_paths_are_anchored_at_backend_dir(monkeypatch):
+    monkeypatch.setenv("FAQ_INDEX_PATH", "data/faq_index.json")
+    monkeypatch.setenv("FAQ_QUESTIONS_PATH", "faq_questions.txt")
+    service = RAGService()
+    assert service.faq_index.path == os.path.join(
+        BACKEND_DIR, "data", "faq_index.json"
+    )
+    assert os.path.isfile(service.faq_questions_path)
+
+
+def test_missing_faq_questions_file_is_reported(monkeypatch, tmp_path, caplog):
+    monkeypatch.setenv("FAQ_QUESTIONS_PATH", str(tmp_path / "missing.txt"))
+    service = RAGService()
+    with caplog.at_level(logging.WARNING, logger="rag"):
+        service._schedule_faq_rebuild()
+    assert service._faq_rebuild is None
+    assert "missing.txt" in caplog.text
@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.core.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Dependency,
+    RetryBudget,
+    RetryPolicy,
+    is_retryable,
+)
+
+
+def client_error(code: str, status: int = 400) -> ClientError:
+    return ClientError(
+        {
+            "Error": {"Code": code},
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        },
+        "InvokeModel",
+    )
+
+
+def dependency(
+    name: str,
+    max_attempts: int = 1,
+    attempt_timeout=None,
+    reset_timeout: float = 0.05,
+    budget=None,
+) -> Dependency:
+    policy = RetryPolicy(
+        max_attempts=max_attempts,
+        base_delay=0.0,
+        max_delay=0.0,
+        attempt_timeout=attempt_timeout,
+        budget=budget,
+    )
+    return Dependency(
+        name,
+        policy,
+        CircuitBreaker(name, failure_threshold=1, reset_timeout=reset_timeout),
+    )
+
+
+async def fail():
+    raise ConnectionError("down")
+
+
+async def succeed():
+    return "ok"
+
+
+def test_is_retryable_classification():
+    assert is_retryable(client_error("ThrottlingException"))
+    assert is_retryable(client_error("Unknown", status=503))
+    assert not is_retryable(client_error("ValidationException"))
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(ValueError("bad input"))
+
+
+def test_retry_budget_caps_retries():
+    budget = RetryBudget(ratio=0.5, min_tokens=1.0)
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_withdraw()
+
+
+def test_retries_transient_errors_until_success():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("blip")
+        return "ok"
+
+    guard = dependency("retry-success", max_attempts=3)
+    guard.breaker.failure_threshold = 5
+    assert asyncio.run(guard.call(flaky)) == "ok"
+    assert len(calls) == 3
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_permanent_errors_are_not_retried():
+    calls = []
+
+    async def invalid():
+        calls.append(1)
+        raise client_error("ValidationException")
+
+    guard = dependency("retry-permanent", max_attempts=3)
+    with pytest.raises(ClientError):
+        asyncio.run(guard.call(invalid))
+    assert len(calls) == 1
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_fails_fast_then_probe_closes_it():
+    async def scenario():
+        guard = dependency("breaker-cycle")
+        with pytest.raises(ConnectionError):
+            await guard.call(fail)
+        assert guard.breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            await guard.call(succeed)
+        await asyncio.sleep(0.06)
+        assert await guard.call(succeed) == "ok"
+        return guard.breaker.state
+
+    assert asyncio.run(scenario()) == CircuitBreaker.CLOSED
+
+
+def test_cancelled_probe_releases_half_open_slot():
+    async def scenario():
+        guard = dependency("breaker-cancel")
+        with pytest.raises(ConnectionError):
+            await guard.call(fail)
+        await asyncio.sleep(0.06)
+
+        probe = asyncio.ensure_future(guard.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        return await guard.call(succeed), guard.breaker.state
+
+    assert asyncio.run(scenario()) == ("ok", CircuitBreaker.CLOSED)
+
+
+def test_timed_out_probe_reopens_circuit():
+    async def scenario():
+        guard = dependency("breaker-timeout", attempt_timeout=0.01)
+        with pytest.raises(ConnectionError):
+            await guard.call(fail)
+        await asyncio.sleep(0.06)
+        with pytest.raises(asyncio.TimeoutError):
+            await guard.call(lambda: asyncio.sleep(10))
+        assert guard.breaker.state == CircuitBreaker.OPEN
+        await asyncio.sleep(0.06)
+        return await guard.call(succeed)
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_hung_probe_without_timeout_reopens_after_reset_period():
+    async def scenario():
+        guard = dependency("breaker-hung")
+        with pytest.raises(ConnectionError):
+            await guard.call(fail)
+        await asyncio.sleep(0.06)
+
+        hung = asyncio.ensure_future(guard.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await guard.call(succeed)
+        await asyncio.sleep(0.06)
+        with pytest.raises(CircuitOpenError):
+            await guard.call(succeed)  # Probe hung a full period: reopened
+        assert guard.breaker.state == CircuitBreaker.OPEN
+        await asyncio.sleep(0.06)
+        result = await guard.call(succeed)
+        hung.cancel()
+        return result
+
+    assert asyncio.run(scenario()) == "ok"
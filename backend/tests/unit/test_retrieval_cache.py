@@ -0,0 +1,29 @@
+from app.services.retrieval_cache import RetrievalCache
+
+
+def test_retrieval_cache_key_tolerates_float_noise():
+    cache = RetrievalCache()
+    vector = [0.123456, -0.5, 0.25]
+    noisy = [v + 1e-7 for v in vector]
+    assert cache.key(vector, 5, None, 1) == cache.key(noisy, 5, None, 1)
+    assert cache.key(vector, 5, None, 1) != cache.key(vector, 5, None, 2)
+    assert cache.key(vector, 5, None, 1) != cache.key(
+        vector, 5, {"type": "memo"}, 1
+    )
+
+
+def test_retrieval_cache_version_sync():
+    cache = RetrievalCache()
+    results = [("doc-1", 0.9, {"text": "x"})]
+    cache.put("key", 1, results, 0.05)
+    assert cache.get("key", 1) == results
+    assert cache.saved_seconds == 0.05
+
+    cache.put("stale", 0, results, 0.05)
+    assert cache.get("stale", 1) is None
+
+    assert cache.get("key", 2) is None
+    assert len(cache) == 0 and cache.corpus_version == 2
+    assert (
+        cache.get("key", 1) is None
+    )  # An older version never repopulates or reads
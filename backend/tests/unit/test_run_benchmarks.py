@@ -0,0 +1,70 @@
+import json
+
+from benchmarks import run_benchmarks
+
+
+def test_make_document_is_deterministic():
+    document = run_benchmarks.make_document(2_000, seed=3)
+    assert len(document) == 2_000
+    assert document == run_benchmarks.make_document(2_000, seed=3)
+    assert document != run_benchmarks.make_document(2_000, seed=4)
+
+
+def test_cpu_benchmarks_run():
+    # The vector index benchmarks take seconds to build; the rest are cheap
+    for name, setup in run_benchmarks.BENCHMARKS.items():
+        if not name.startswith("local_vector"):
+            setup()()
+
+
+def test_measure_reports_per_call_microseconds():
+    result = run_benchmarks.measure(lambda: None, repeats=3, min_time=0.001)
+    assert result["repeats"] == 3 and result["loops"] >= 1
+    assert 0 <= result["min_us"] <= result["median_us"]
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {
+        "results": {
+            "slower": {"median_us": 100.0},
+            "steady": {"median_us": 100.0},
+            "faster": {"median_us": 100.0},
+        }
+    }
+    current = {
+        "results": {
+            "slower": {"median_us": 120.0},
+            "steady": {"median_us": 105.0},
+            "faster": {"median_us": 50.0},
+            "new": {"median_us": 1.0},
+        }
+    }
+    assert run_benchmarks.compare(current, baseline, 0.10) == ["slower"]
+
+
+def test_main_saves_and_compares_against_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    output = tmp_path / "latest.json"
+    args = [
+        "-k",
+        "post_process",
+        "--repeats",
+        "2",
+        "--min-time",
+        "0.001",
+        "--output",
+        str(output),
+        "--baseline",
+        str(baseline),
+    ]
+    assert run_benchmarks.main(args + ["--compare"]) == 2
+    assert run_benchmarks.main(args + ["--save-baseline"]) == 0
+    assert list(json.loads(baseline.read_text())["results"]) == [
+        "post_process[titan]"
+    ]
+
+    # A baseline far faster than any real run must report a regression
+    saved = json.loads(baseline.read_text())
+    saved["results"]["post_process[titan]"]["median_us"] = 1e-6
+    baseline.write_text(json.dumps(saved))
+    assert run_benchmarks.main(args + ["--compare", "--threshold", "0.5"]) == 1
@@ -0,0 +1,227 @@
+import asyncio
+import os
+import sqlite3
+import time
+
+import pytest
+
+from app.core.paths import BACKEND_DIR
+from app.services import session_service
+from app.services.session_service import SessionStore, SQLiteSessionBackend
+
+
+def wait_flushed(backend, session_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while backend.has_pending(session_id):
+        assert time.monotonic() < deadline, "session writes were not flushed"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteSessionBackend(
+        str(tmp_path / "sessions.db"), flush_interval=0.005
+    )
+    yield backend
+    backend.close()
+
+
+def test_lru_eviction_drops_least_recently_used():
+    store = SessionStore()
+    store.max_sessions = 2
+    store.append("a", "user", "one")
+    store.append("b", "user", "two")
+    store.get("a")
+    store.append("c", "user", "three")
+
+    assert store.peek("b") is None
+    assert store.peek("a") is not None and store.peek("c") is not None
+    assert store.evictions == 1
+
+
+def test_locked_session_is_not_evicted():
+    async def scenario():
+        store = SessionStore()
+        store.max_sessions = 1
+        async with store.lock("busy"):
+            store.append("busy", "user", "hello")
+            store.append("other", "user", "hi")
+            assert store.peek("busy") is not None
+            assert store.peek("other") is None
+
+    asyncio.run(scenario())
+
+
+def test_idle_sessions_expire():
+    store = SessionStore()
+    store.idle_ttl = 0.0
+    store.append("old", "user", "hello")
+    store.get("new")
+    assert store.peek("old") is None
+
+
+def test_memory_accounting_follows_turns():
+    store = SessionStore()
+    store.max_turns = 2
+    store.append("s", "user", "a" * 10)
+    store.append("s", "assistant", "b" * 10)
+    before = store.total_bytes
+    store.append("s", "user", "c" * 10)
+    assert store.total_bytes == before
+    store.clear("s")
+    assert store.total_bytes == 0
+
+
+def test_refresh_reloads_session_evicted_after_own_writes(backend):
+    async def scenario():
+        store = SessionStore(backend)
+        async with store.lock("s"):
+            await store.refresh("s")
+            store.append("s", "user", "question")
+            store.append("s", "assistant", "answer")
+        wait_flushed(backend, "s")
+
+        store._remove_oldest()
+        assert store.peek("s") is None
+
+        async with store.lock("s"):
+            await store.refresh("s")
+        return store.recent_turns("s", 10)
+
+    assert asyncio.run(scenario()) == [
+        {"role": "user", "content": "question"},
+        {"role": "assistant", "content": "answer"},
+    ]
+
+
+def test_turn_count_survives_reload(backend, monkeypatch):
+    monkeypatch.setenv("SESSION_MAX_TURNS", "4")
+
+    async def scenario():
+        store = SessionStore(backend)
+        async with store.lock("s"):
+            await store.refresh("s")
+            for i in range(6):
+                store.append("s", "user", f"turn {i}")
+        wait_flushed(backend, "s")
+        store._remove_oldest()
+
+        async with store.lock("s"):
+            await store.refresh("s")
+        return store.peek("s")
+
+    session = asyncio.run(scenario())
+    assert len(session.turns) == 4
+    assert session.turn_count == 6
+
+
+def test_turn_column_is_added_to_existing_database(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE session_turns (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        INSERT INTO session_turns (session_id, role, content, created_at)
+        VALUES ('s', 'user', 'old', 0);
+        """)
+    conn.close()
+
+    backend = SQLiteSessionBackend(path, flush_interval=0.005)
+    try:
+        assert backend.load("s", 10)[2] == 1
+        backend.append("s", "assistant", "new", 5)
+        wait_flushed(backend, "s")
+        assert backend.load("s", 10)[2] == 6
+    finally:
+        backend.close()
+
+
+def test_refresh_waits_for_queued_writes_of_evicted_session(backend):
+    async def scenario():
+        store = SessionStore(backend)
+        store.append("s", "user", "question")
+        store._remove_oldest()
+        async with store.lock("s"):
+            await store.refresh("s")
+        return store.recent_turns("s", 10)
+
+    assert asyncio.run(scenario()) == [{"role": "user", "content": "question"}]
+
+
+def test_refresh_keeps_own_writes_without_reloading(backend):
+    async def scenario():
+        store = SessionStore(backend)
+        store.append("s", "user", "question")
+        store.set_summary("s", "summary", 1)
+        wait_flushed(backend, "s")
+        async with store.lock("s"):
+            await store.refresh("s")
+        return store.peek("s")
+
+    session = asyncio.run(scenario())
+    assert session.summary == "summary"
+    assert session.version == backend.version("s")
+
+
+def test_refresh_picks_up_turns_from_another_worker(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    ours, theirs = SQLiteSessionBackend(
+        path, flush_interval=0.005
+    ), SQLiteSessionBackend(path, flush_interval=0.005)
+    try:
+
+        async def scenario():
+            store = SessionStore(ours)
+            store.append("s", "user", "first")
+            wait_flushed(ours, "s")
+            theirs.append("s", "user", "second", 1)
+            wait_flushed(theirs, "s")
+            async with store.lock("s"):
+                await store.refresh("s")
+            return store.recent_turns("s", 10)
+
+        assert [turn["content"] for turn in asyncio.run(scenario())] == [
+            "first",
+            "second",
+        ]
+    finally:
+        ours.close()
+        theirs.close()
+
+
+def test_writer_survives_purge_errors(backend, monkeypatch):
+    def purge(conn):
+        raise sqlite3.OperationalError("database is locked")
+
+    backend.purge_interval = 0.0
+    monkeypatch.setattr(backend, "_purge", purge)
+    backend.append("s", "user", "first", 0)
+    wait_flushed(backend, "s")
+    backend.append("s", "user", "second", 1)
+    wait_flushed(backend, "s")
+    assert backend._writer.is_alive()
+    assert [turn for _, turn in backend.load("s", 10)[0]] == [
+        "first",
+        "second",
+    ]
+
+
+def test_sqlite_backend_is_attached_on_start(monkeypatch):
+    monkeypatch.setenv("SESSION_BACKEND", "sqlite")
+    monkeypatch.setenv("SESSION_DB_PATH", "data/sessions.db")
+    opened = []
+    monkeypatch.setattr(
+        session_service,
+        "SQLiteSessionBackend",
+        lambda path, **settings: opened.append(path) or "backend",
+    )
+    store = SessionStore()
+    assert store.backend is None and not opened
+    store.start()
+    assert store.backend == "backend"
+    assert opened == [os.path.join(BACKEND_DIR, "data", "sessions.db")]
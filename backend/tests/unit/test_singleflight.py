@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            *(flight.do("key", operation) for _ in range(5))
+        )
+        return results, flight
+
+    results, flight = asyncio.run(scenario())
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    assert flight.coalesced == 4
+    assert len(flight) == 0
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            flight.do("a", lambda: asyncio.sleep(0, "a")),
+            flight.do("b", lambda: asyncio.sleep(0, "b")),
+        )
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+
+
+def test_exception_reaches_every_waiter_and_key_is_released():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.do("key", failing),
+            flight.do("key", failing),
+            return_exceptions=True,
+        )
+        return results, "key" in flight
+
+    results, still_inflight = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not still_inflight
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(
+            flight.do("key", lambda: asyncio.sleep(0.02, "done"))
+        )
+        second = asyncio.ensure_future(
+            flight.do("key", lambda: asyncio.sleep(0.02, "other"))
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
@@ -0,0 +1,11 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_status_reports_corpus_version():
+    response = TestClient(app).get("/api/status")
+    assert response.status_code == 200
+    corpus_version = response.json()["corpus_version"]
+    assert corpus_version["backend"] == "memory"
+    assert isinstance(corpus_version["version"], int)
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import re
+
+from fastapi.testclient import TestClient
+
+from app.core.tracing import (
+    JSONLSpanExporter,
+    current_request_id,
+    current_trace,
+    start_background_task,
+    tracer,
+)
+from app.main import app
+
+
+def test_background_task_runs_outside_the_request_trace():
+    async def background():
+        with tracer.span("background.work"):
+            await asyncio.sleep(0)
+        return current_trace(), current_request_id()
+
+    async def scenario():
+        with tracer.request("req-1") as trace:
+            task = start_background_task(background())
+        return trace, await task
+
+    trace, (seen_trace, seen_request_id) = asyncio.run(scenario())
+    assert seen_trace is None and seen_request_id is None
+    assert [span.name for span in trace.spans] == ["request"]
+
+
+def test_spans_nest_and_record_errors():
+    with tracer.request("req-2") as trace:
+        with tracer.span("outer", server_timing="stage") as outer:
+            try:
+                with tracer.span("inner"):
+                    raise ValueError("boom")
+            except ValueError:
+                pass
+
+    inner, outer_span, root = trace.spans
+    assert outer_span is outer
+    assert inner.parent_id == outer.span_id
+    assert outer.parent_id == root.span_id and root.parent_id is None
+    assert inner.status == "error"
+    assert inner.attributes["error"] == "ValueError: boom"
+    assert outer.status == "ok"
+
+
+def test_span_outside_a_request_is_a_noop():
+    with tracer.span("orphan") as span:
+        assert span is None
+    assert current_trace() is None
+
+
+def test_concurrent_requests_keep_separate_traces():
+    async def handle(request_id):
+        with tracer.request(request_id) as trace:
+            await asyncio.sleep(0)
+            with tracer.span("work"):
+                await asyncio.sleep(0)
+                assert current_request_id() == request_id
+        return trace
+
+    async def scenario():
+        return await asyncio.gather(handle("a"), handle("b"))
+
+    for trace in asyncio.run(scenario()):
+        assert [span.name for span in trace.spans] == ["work", "request"]
+        assert {span.trace.request_id for span in trace.spans} == {
+            trace.request_id
+        }
+
+
+def test_server_timing_sums_finished_spans_per_stage():
+    with tracer.request("req-3") as trace:
+        for _ in range(2):
+            with tracer.span("embed", server_timing="embedding"):
+                pass
+        with tracer.span("search", server_timing="vector"):
+            pass
+        with tracer.span("untimed"):
+            pass
+
+    assert list(trace.stage_timings()) == ["embedding", "vector"]
+    names = [part.split(";")[0] for part in trace.server_timing().split(", ")]
+    assert names == ["embedding", "vector"]
+
+
+def test_exporter_writes_one_json_line_per_span(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = JSONLSpanExporter(str(path))
+    with tracer.request("req-4") as trace:
+        with tracer.span("child"):
+            pass
+    exporter.export(trace.spans)
+    exporter.close()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [span["name"] for span in spans] == ["child", "request"]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert spans[0]["attributes"]["request.id"] == "req-4"
+
+
+def test_middleware_sets_server_timing_and_request_id():
+    response = TestClient(app).get(
+        "/health", headers={"X-Request-ID": "client-id"}
+    )
+    assert response.headers["X-Request-ID"] == "client-id"
+    assert re.fullmatch(
+        r"total;dur=\d+\.\d", response.headers["Server-Timing"]
+    )
+
+
+def test_middleware_generates_a_request_id():
+    response = TestClient(app).get("/health")
+    assert re.fullmatch(r"[0-9a-f]{32}", response.headers["X-Request-ID"])
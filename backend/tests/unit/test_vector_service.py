@@ -0,0 +1,88 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.services.vector_service import VectorService
+
+
+@pytest.fixture
+def unreachable_pinecone(monkeypatch):
+    """A Pinecone-backed service whose index cannot be reached"""
+    service = VectorService()
+    service.local_index = None
+    service.test_mode = False
+    service.retrieval_cache = None
+
+    def connect():
+        raise ConnectionError("pinecone unreachable")
+
+    monkeypatch.setattr(service, "connect", connect)
+    return service
+
+
+def test_search_raises_instead_of_returning_mock_matches(unreachable_pinecone):
+    with pytest.raises(ConnectionError):
+        asyncio.run(unreachable_pinecone.search_similar([0.1] * 1024))
+    with pytest.raises(ConnectionError):
+        asyncio.run(
+            unreachable_pinecone.search_similar_batch(
+                [[0.1] * 1024, [0.2] * 1024]
+            )
+        )
+
+
+def test_store_raises_instead_of_returning_fake_ids(unreachable_pinecone):
+    with pytest.raises(ConnectionError):
+        asyncio.run(
+            unreachable_pinecone.store_documents(["text"], [[0.1] * 1024])
+        )
+
+
+def test_delete_raises_when_index_unavailable(unreachable_pinecone):
+    with pytest.raises(ConnectionError):
+        asyncio.run(unreachable_pinecone.delete_documents(delete_all=True))
+
+
+def test_index_stats_report_the_connection_error(unreachable_pinecone):
+    stats = asyncio.run(unreachable_pinecone.get_index_stats())
+    assert "pinecone unreachable" in stats["error"]
+
+
+@pytest.fixture
+def local_service():
+    service = VectorService()
+    assert service.local_index is not None
+    return service
+
+
+def test_write_bumps_corpus_version(local_service):
+    before = local_service.corpus_version
+    asyncio.run(local_service.store_documents(["text"], [[0.1] * 1024]))
+    assert local_service.corpus_version > before
+
+
+def test_failed_bump_does_not_hide_a_successful_write(
+    local_service, monkeypatch
+):
+    def bump(reason):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(local_service.versions, "bump", bump)
+    ids = asyncio.run(local_service.store_documents(["text"], [[0.1] * 1024]))
+    assert len(ids) == 1
+    asyncio.run(local_service.delete_documents(ids=ids))
+    assert (
+        local_service.local_index.describe_index_stats()["total_vectors"] == 0
+    )
+
+
+def test_failed_write_does_not_bump(local_service, monkeypatch):
+    def upsert(vectors):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(local_service.local_index, "upsert", upsert)
+    before = local_service.corpus_version
+    with pytest.raises(RuntimeError):
+        asyncio.run(local_service.store_documents(["text"], [[0.1] * 1024]))
+    assert local_service.corpus_version == before
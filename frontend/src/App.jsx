@@ -30,6 +30,7 @@ export default function App() {
   const [darkMode, setDarkMode] = useState(false)
   const endRef = useRef(null)
   const inputRef = useRef(null)
+  const sessionIdRef = useRef(null)  // Conversation ID issued by the backend
 
   // Auto-scroll to bottom
   useEffect(() => {
@@ -64,12 +65,13 @@ const handleSubmit = async (e) => {
       const resp = await fetch(apiUrl, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ message: userMessage.content })
+        body: JSON.stringify({ message: userMessage.content, session_id: sessionIdRef.current })
       })
       console.log('Response status:', resp.status)  // Debug log
       if (!resp.ok) throw new Error(`HTTP ${resp.status}`)
       const data = await resp.json()
       console.log('Response data:', data)  // Debug log
+      if (data.session_id) sessionIdRef.current = data.session_id
       const aiMessage = {
         id: Date.now() + 1,
         role: data.role || 'assistant',
@@ -91,6 +93,7 @@ const handleSubmit = async (e) => {
   }
 
   const clearChat = () => {
+    sessionIdRef.current = null  // Start a fresh conversation on the backend too
     setMessages([{
       id: 1,
       role: 'assistant', 